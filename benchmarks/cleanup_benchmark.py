@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.fasta_utils import read_fasta, write_fasta
+from utils.fasta_index import load_index, copy_records
+from proteome_file_cleanup import LOWER_LENGTH, UPPER_LENGTH, length_mask
+from fasta_benchmark import make_proteomes
+
+def run_parse(paths, out_dir):
+    kept = 0
+    for path in paths:
+        with open(os.path.join(out_dir, os.path.basename(path)), "wb") as fout:
+            kept += write_fasta(fout, (r for r in read_fasta(path) if LOWER_LENGTH <= len(r) <= UPPER_LENGTH))
+    return kept
+
+def run_index(paths, out_dir):
+    kept = 0
+    for path in paths:
+        index = load_index(path)
+        mask = length_mask(index)
+        copy_records(path, index[mask], os.path.join(out_dir, os.path.basename(path)))
+        kept += int(mask.sum())
+    return kept
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare length filtering by parsing and by FASTA index.")
+    parser.add_argument("--size-mb", type=int, default=300, help="Total size of the synthetic proteome set.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generating {args.size_mb} MB of synthetic proteomes...")
+        paths = make_proteomes(tmp, args.size_mb)
+        out_dir = os.path.join(tmp, "out")
+        os.makedirs(out_dir)
+
+        start = time.perf_counter()
+        for path in paths:
+            load_index(path)
+        print(f"{'index build (once)':22s} {time.perf_counter() - start:7.2f} s")
+
+        for name, run in (("parse + filter", run_parse), ("index mask + copy", run_index)):
+            start = time.perf_counter()
+            kept = run(paths, out_dir)
+            print(f"{name:22s} {kept:>10d} kept  {time.perf_counter() - start:7.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import gzip
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import COMPRESSED_PROTEOMES_DIR
+from utils.decompress_utils import available_backends, open_gzip
+from fasta_benchmark import make_proteomes
+
+def decompress(path, backend):
+    size = 0
+    with open_gzip(path, backend) as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            size += len(chunk)
+    return size
+
+def synthetic_archives(out_dir, size_mb, files):
+    paths = []
+    for path in make_proteomes(out_dir, size_mb, files=files):
+        with open(path, "rb") as f_in, gzip.open(f"{path}.gz", "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(path)
+        paths.append(f"{path}.gz")
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gzip decompression throughput per backend.")
+    parser.add_argument("--dir", default=COMPRESSED_PROTEOMES_DIR,
+                        help="Directory of .gz proteome archives (synthetic ones are generated if it has none).")
+    parser.add_argument("--size-mb", type=int, default=300, help="Uncompressed size of the synthetic archives.")
+    parser.add_argument("--files", type=int, default=8, help="Number of synthetic archives.")
+    parser.add_argument("--workers", type=int, default=4, help="Threads for the concurrent run.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sorted(
+            os.path.join(args.dir, f) for f in os.listdir(args.dir) if f.endswith(".gz")
+        ) if os.path.isdir(args.dir) else []
+        if not paths:
+            print(f"Generating {args.size_mb} MB of synthetic proteome archives...")
+            paths = synthetic_archives(tmp, args.size_mb, args.files)
+        compressed_mb = sum(os.path.getsize(p) for p in paths) / (1 << 20)
+        print(f"{len(paths)} archives, {compressed_mb:.0f} MB compressed")
+
+        for backend in available_backends():
+            start = time.perf_counter()
+            total = sum(decompress(path, backend) for path in paths)
+            serial = time.perf_counter() - start
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(decompress, paths, [backend] * len(paths)))
+            threaded = time.perf_counter() - start
+            mb = total / (1 << 20)
+            print(f"{backend:8s} {mb / serial:8.0f} MB/s serial  {mb / threaded:8.0f} MB/s with {args.workers} threads")
+
+if __name__ == "__main__":
+    main()
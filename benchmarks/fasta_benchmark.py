@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from Bio import SeqIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.fasta_utils import read_fasta, write_fasta
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+def make_proteomes(out_dir, total_mb, files=8, seed=0):
+    """
+    Write a synthetic JGI-style proteome set of roughly total_mb megabytes.
+
+    Args:
+        out_dir (str): Directory to write the FASTA files to.
+        total_mb (int): Approximate total size in megabytes.
+        files (int): Number of proteome files.
+        seed (int): Random seed.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    rng = random.Random(seed)
+    # Sample sequences from one long random string to keep generation fast
+    pool = "".join(rng.choice(AMINO_ACIDS) for _ in range(1 << 20))
+    paths = []
+    per_file = total_mb * (1 << 20) // files
+    for f in range(files):
+        path = os.path.join(out_dir, f"Synth{f}.fasta")
+        written = 0
+        with open(path, "w") as handle:
+            i = 0
+            while written < per_file:
+                length = rng.randint(30, 1500)
+                start = rng.randrange(len(pool) - length)
+                seq = pool[start:start + length]
+                record = f">jgi|Synth{f}|{i}|gene_{i}\n" + "\n".join(seq[j:j + 60] for j in range(0, length, 60)) + "\n"
+                handle.write(record)
+                written += len(record)
+                i += 1
+        paths.append(path)
+    return paths
+
+def run_biopython(paths, out_dir):
+    count = 0
+    for path in paths:
+        records = list(SeqIO.parse(path, "fasta"))
+        for record in records:
+            record.id = record.id.replace("|", "-")
+            record.description = record.id
+        with open(os.path.join(out_dir, os.path.basename(path)), "w") as fout:
+            SeqIO.write(records, fout, "fasta")
+        count += len(records)
+    return count
+
+def _renamed(records):
+    for record in records:
+        record.title = record.id.replace(b"|", b"-")
+        yield record
+
+def run_fasta_utils(paths, out_dir, use_mmap=False):
+    count = 0
+    for path in paths:
+        with open(os.path.join(out_dir, os.path.basename(path)), "wb") as fout:
+            count += write_fasta(fout, _renamed(read_fasta(path, use_mmap=use_mmap)))
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FASTA rename throughput of Bio.SeqIO and utils.fasta_utils.")
+    parser.add_argument("--size-mb", type=int, default=300, help="Total size of the synthetic proteome set.")
+    parser.add_argument("--input-dir", help="Benchmark existing .fasta files instead of synthetic ones.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input_dir:
+            paths = [os.path.join(args.input_dir, f) for f in sorted(os.listdir(args.input_dir)) if f.endswith(".fasta")]
+        else:
+            print(f"Generating {args.size_mb} MB of synthetic proteomes...")
+            paths = make_proteomes(tmp, args.size_mb)
+        size_mb = sum(os.path.getsize(p) for p in paths) / (1 << 20)
+        out_dir = os.path.join(tmp, "out")
+        os.makedirs(out_dir)
+
+        results = {}
+        for name, run in (
+            ("Bio.SeqIO", lambda: run_biopython(paths, out_dir)),
+            ("fasta_utils (stream)", lambda: run_fasta_utils(paths, out_dir)),
+            ("fasta_utils (mmap)", lambda: run_fasta_utils(paths, out_dir, use_mmap=True)),
+        ):
+            start = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - start
+            results[name] = elapsed
+            print(f"{name:22s} {count:>10d} records  {elapsed:7.2f} s  {count / elapsed:>12,.0f} records/s  {size_mb / elapsed:7.1f} MB/s")
+
+        baseline = results["Bio.SeqIO"]
+        for name, elapsed in results.items():
+            print(f"{name:22s} speed-up x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+    main()
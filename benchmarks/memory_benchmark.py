@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.fasta_index import iter_index, index_path
+from utils.wrangle_utils import rename_fasta_stream
+from proteome_file_cleanup import clean_proteome
+from fasta_benchmark import make_proteomes
+
+STAGES = ["rename", "reindex", "cleanup"]
+
+def run_stage(stage, work_dir):
+    """
+    Run one streaming stage on the synthetic proteome in work_dir.
+    """
+    source = os.path.join(work_dir, "Synth0.fasta")
+    renamed = os.path.join(work_dir, "renamed", "Synth0.fasta")
+    if stage == "rename":
+        return rename_fasta_stream(source, renamed)["total_sequences"]
+    if stage == "reindex":
+        # Drop the sidecar written by the rename so that it is rebuilt by scanning the file
+        os.remove(index_path(renamed))
+        return sum(len(rows) for rows in iter_index(renamed))
+    return clean_proteome(renamed, os.path.join(work_dir, "clean"))["log"]["kept_sequences"]
+
+def child(stage, work_dir, trace):
+    """
+    Run a stage in this process and print its peak memory as JSON on the last line.
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    count = run_stage(stage, work_dir)
+    result = {
+        "count": count,
+        "seconds": time.perf_counter() - start,
+        "baseline_mb": baseline / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if trace:
+        result["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    print(json.dumps(result))
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the FASTA stages run in bounded memory on a large proteome.")
+    parser.add_argument("--size-mb", type=int, default=2048, help="Size of the synthetic proteome.")
+    parser.add_argument("--max-rss-mb", type=float, default=256, help="Peak RSS allowed for any stage.")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the peak of traced allocations (slower).")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, args.tracemalloc)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Generating a {args.size_mb} MB synthetic proteome...")
+        make_proteomes(tmp, args.size_mb, files=1)
+        os.makedirs(os.path.join(tmp, "renamed"))
+        os.makedirs(os.path.join(tmp, "clean"))
+
+        failed = False
+        for stage in STAGES:
+            # Each stage runs in a fresh interpreter so that its peak RSS is its own
+            command = [sys.executable, __file__, "--child", stage, tmp] + (["--tracemalloc"] if args.tracemalloc else [])
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            ok = result["peak_rss_mb"] <= args.max_rss_mb
+            failed |= not ok
+            traced = f"  traced {result['traced_peak_mb']:7.1f} MB" if "traced_peak_mb" in result else ""
+            print(f"{stage:8s} {result['count']:>10d} records {result['seconds']:7.2f} s  "
+                  f"peak RSS {result['peak_rss_mb']:7.1f} MB (imports {result['baseline_mb']:.1f} MB){traced}  "
+                  f"{'ok' if ok else 'OVER LIMIT'}")
+
+    if failed:
+        sys.exit(f"Peak RSS exceeded {args.max_rss_mb} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+from itertools import islice
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.web_utils import METADATA_FIELDS, EXPORT_BATCH_SIZE
+from utils.metadata_db import FileTableWriter, query_files, open_current, lookup_files
+
+ORDERS = ["Pleosporales", "Agaricales", "Eurotiales", "Helotiales", "Hypocreales", "Polyporales",
+          "Saccharomycetales", "Capnodiales", "Mucorales", "Russulales"]
+FILE_TYPES = ["Proteome", "Assembly", "Annotation", "Transcriptome", "Document"]
+
+def make_rows(n_rows, n_organisms=5000, seed=0):
+    """
+    Yield synthetic listing rows shaped like the MycoCosm file metadata.
+    """
+    rng = random.Random(seed)
+    organisms = [f"Org{i}_{rng.randint(1, 9)}" for i in range(n_organisms)]
+    taxonomy = {}
+    for organism in organisms:
+        order = rng.choice(ORDERS)
+        taxonomy[organism] = {
+            "ncbi_taxon_id": rng.randint(1000, 2000000) if rng.random() > 0.05 else "",
+            "jat_label": "",
+            "ncbi_taxon_class": f"{order[:4]}mycetes",
+            "ncbi_taxon_family": f"{order[:5]}aceae{rng.randint(0, 5)}",
+            "ncbi_taxon_order": order,
+            "ncbi_taxon_genus": organism.split("_")[0],
+            "ncbi_taxon_species": f"{organism.split('_')[0]} sp. {organism}",
+        }
+    for i in range(n_rows):
+        organism = organisms[i * n_organisms // n_rows]
+        file_type = rng.choice(FILE_TYPES)
+        yield {
+            "organism": organism,
+            "file_name": f"{organism}_{file_type}_{i}.fasta.gz",
+            "file_id": f"{i:024x}",
+            "_id": f"{i:024x}",
+            "file_status": "RESTORED",
+            "md5sum": f"{rng.getrandbits(128):032x}",
+            "file_date": f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00",
+            "file_type": file_type,
+            "portal_display_location": "Files/Annotation",
+            **taxonomy[organism],
+        }
+
+def write_listing(rows, csv_path, db_path):
+    """
+    Write rows as parse_and_export does: CSV and database in a single pass.
+    """
+    rows = iter(rows)
+    db_writer = FileTableWriter(METADATA_FIELDS, db_path)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=METADATA_FIELDS)
+        writer.writeheader()
+        for batch in iter(lambda: list(islice(rows, EXPORT_BATCH_SIZE)), []):
+            writer.writerows(batch)
+            db_writer.write(batch)
+    db_writer.commit(csv_path)
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare metadata selections from the CSV and from the SQLite database.")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of synthetic file rows.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the best time is reported.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "all_files_metadata.csv")
+        db_path = os.path.join(tmp, "metadata.sqlite")
+        start = time.perf_counter()
+        write_listing(make_rows(args.rows), csv_path, db_path)
+        print(f"Wrote {args.rows} rows to CSV and SQLite in {time.perf_counter() - start:.2f} s")
+
+        def from_csv():
+            df = pd.read_csv(csv_path)
+            return df[(df["ncbi_taxon_order"] == "Pleosporales") & (df["file_type"] == "Proteome")
+                      & (df["file_date"] >= "2025-03-01")]
+
+        def from_db():
+            return query_files(ncbi_taxon_order="Pleosporales", file_type="Proteome", since="2025-03-01", path=db_path)
+
+        names = pd.read_csv(csv_path, usecols=["file_name"])["file_name"].sample(500, random_state=0)
+
+        def lookup_csv():
+            df = pd.read_csv(csv_path, usecols=["file_name", "file_id", "_id", "md5sum"], dtype=str)
+            return df[df["file_name"].isin(set(names))]
+
+        def lookup_db():
+            conn = open_current("files", csv_path, db_path)
+            try:
+                return lookup_files(conn, names, ["file_id", "_id", "md5sum"])
+            finally:
+                conn.close()
+
+        for label, csv_query, db_query in (("order+type+date", from_csv, from_db),
+                                           ("500 file names", lookup_csv, lookup_db)):
+            csv_time, csv_rows = best_of(csv_query, args.repeat)
+            db_time, db_rows = best_of(db_query, args.repeat)
+            assert len(csv_rows) == len(db_rows), (len(csv_rows), len(db_rows))
+            print(f"{label:16s} {len(db_rows):6d} rows  CSV {csv_time * 1000:8.1f} ms  "
+                  f"SQLite {db_time * 1000:7.2f} ms  ({csv_time / db_time:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import random
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.taxonomy_tree import TaxonomyTree, RANK_COLUMNS
+
+def make_taxonomy(n_portals, seed=0):
+    """
+    Synthetic portal taxonomy with realistic fan-out: ~10 classes, 100 orders, 500 families, 3000 genera.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_portals):
+        genus = rng.randrange(3000)
+        family = genus % 500
+        order = family % 100
+        rows.append({
+            "organism": f"Port{i}",
+            "ncbi_taxon_class": f"Class{order % 10}",
+            "ncbi_taxon_order": f"Order{order}",
+            "ncbi_taxon_family": f"Family{family}" if rng.random() > 0.02 else None,
+            "ncbi_taxon_genus": f"Genus{genus}",
+            "ncbi_taxon_species": f"Genus{genus} sp{rng.randrange(20)}",
+        })
+    return pd.DataFrame(rows)
+
+def pandas_lca(df, portals):
+    """
+    The lowest rank on which a set of portals agrees, by filtering the flat columns.
+    """
+    rows = df[df["organism"].isin(portals)]
+    for column in reversed(RANK_COLUMNS):
+        values = rows[column].unique()
+        if len(values) == 1:
+            return values[0]
+    return None
+
+def timed(label, func, queries):
+    start = time.perf_counter()
+    results = [func(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    print(f"{label:28s} {elapsed / len(queries) * 1e6:10.1f} µs/query")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare taxon selections and LCA queries: pandas filtering vs the taxonomy tree.")
+    parser.add_argument("--portals", type=int, default=20000, help="Number of synthetic portals.")
+    parser.add_argument("--queries", type=int, default=300, help="Number of random queries of each kind.")
+    args = parser.parse_args()
+
+    df = make_taxonomy(args.portals)
+    start = time.perf_counter()
+    tree = TaxonomyTree.from_frame(df)
+    print(f"Built a tree of {len(tree)} nodes for {args.portals} portals in {time.perf_counter() - start:.3f} s")
+
+    rng = random.Random(1)
+    taxa = [(rank, f"{rank.capitalize()}{rng.randrange(n)}")
+            for rank, n in [("order", 100), ("family", 500), ("class", 10)] * (args.queries // 3)]
+    by_pandas = timed("select, pandas", lambda taxon: list(df.loc[df[f"ncbi_taxon_{taxon[0]}"] == taxon[1], "organism"]), taxa)
+    by_tree = timed("select, tree", lambda taxon: tree.select(**{taxon[0]: taxon[1]}), taxa)
+    assert all(sorted(a) == sorted(b) for a, b in zip(by_pandas, by_tree))
+
+    sets = [rng.sample(tree.select(order=f"Order{rng.randrange(100)}"), 5) for _ in range(args.queries)]
+    timed("LCA of 5 portals, pandas", lambda portals: pandas_lca(df, portals), sets)
+    timed("LCA of 5 portals, tree", tree.lca, sets)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.web_utils import METADATA_FIELDS
+from mycocosm_filelist_wrangle import iter_files_metadata, scan_files_metadata, categorize_organisms, check_organism_counts
+
+def make_metadata(path, n_rows, files_per_organism=200, seed=0):
+    """
+    Write a synthetic file metadata CSV with missing, incomplete and doubly classified organisms.
+    """
+    rng = np.random.default_rng(seed)
+    n_organisms = max(1, n_rows // files_per_organism)
+    organisms = np.array([f"Org{i}" for i in range(n_organisms)], dtype=object)
+    orders = rng.integers(0, 100, n_organisms)
+    taxon_ids = rng.integers(1000, 2000000, n_organisms).astype(float)
+    taxon_ids[rng.random(n_organisms) < 0.05] = np.nan  # incomplete
+    owner = np.sort(rng.integers(0, n_organisms, n_rows))
+    df = pd.DataFrame({field: "" for field in METADATA_FIELDS}, index=range(n_rows))
+    df["organism"] = organisms[owner]
+    df["file_name"] = [f"f{i}.fasta.gz" for i in range(n_rows)]
+    df["md5sum"] = "0" * 32
+    df["file_type"] = rng.choice(["Proteome", "Assembly", "Annotation"], n_rows)
+    df["ncbi_taxon_id"] = pd.array(taxon_ids[owner], dtype="Int64")
+    df["ncbi_taxon_class"] = [f"Class{o % 10}" for o in orders[owner]]
+    df["ncbi_taxon_order"] = [f"Order{o}" for o in orders[owner]]
+    df["ncbi_taxon_family"] = [f"Family{o * 3}" for o in orders[owner]]
+    df["ncbi_taxon_genus"] = df["organism"].str.replace("Org", "Genus")
+    df["ncbi_taxon_species"] = df["organism"] + " sp."
+    # A second taxonomy on some files of 2% of the organisms
+    double = np.isin(owner, np.flatnonzero(rng.random(n_organisms) < 0.02)) & (rng.random(n_rows) < 0.3)
+    df.loc[double, "ncbi_taxon_order"] = "OrderX"
+    # 1% of the organisms were listed without files
+    missing = rng.random(n_organisms) < 0.01
+    df = df[~missing[owner]]
+    lost = pd.DataFrame({field: "" for field in METADATA_FIELDS}, index=range(int(missing.sum())))
+    lost["organism"] = organisms[missing]
+    lost["file_name"] = "NO FILES FOUND"
+    pd.concat([df, lost]).to_csv(path, index=False)
+
+def legacy(csv_path):
+    """
+    The previous implementation: whole table in memory, several full passes.
+    """
+    df = pd.read_csv(csv_path)
+    all_organisms = df["organism"].unique()
+    missing_organisms = df[df["file_name"] == "NO FILES FOUND"]["organism"].unique()
+    cols = ["organism"] + [col for col in df.columns if col.startswith("ncbi")]
+    phylogeny_data = df.loc[:, cols].drop_duplicates()
+    missing = phylogeny_data[phylogeny_data["organism"].isin(missing_organisms)]
+    complete = phylogeny_data[phylogeny_data["ncbi_taxon_id"].notna()].drop_duplicates()
+    incomplete = phylogeny_data[
+        ~phylogeny_data["organism"].isin(list(missing_organisms) + list(complete["organism"]))
+    ].drop_duplicates()
+    counts = complete.groupby("organism", observed=True).size().reset_index(name="count")
+    double_organisms = counts[counts["count"] > 1]["organism"]
+    double = complete[complete["organism"].isin(double_organisms)]
+    single = complete[~complete["organism"].isin(double_organisms)]
+    categorized = pd.Series(list(single["organism"]) + list(double["organism"])
+                            + list(missing["organism"]) + list(incomplete["organism"])).unique()
+    assert len(categorized) == len(all_organisms)
+    return {"missing": missing, "incomplete": incomplete, "single": single, "double": double}
+
+def single_pass(csv_path, chunk_rows):
+    all_organisms, missing_organisms, phylogeny_data = scan_files_metadata(
+        iter_files_metadata(chunk_rows, csv_path, parquet_path=None))
+    categories = categorize_organisms(phylogeny_data, missing_organisms)
+    check_organism_counts(categories, all_organisms)
+    return categories
+
+def measure(func, *args):
+    """
+    Time a run, then repeat it under tracemalloc for the peak memory (which it slows down).
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the wrangle categorization with the previous multi-pass version.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 300000, 1000000],
+                        help="Sizes of the synthetic metadata tables.")
+    parser.add_argument("--chunk-rows", type=int, default=200000, help="Rows read at a time by the single pass.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f"metadata_{n_rows}.csv")
+            make_metadata(path, n_rows)
+            old, old_time, old_peak = measure(legacy, path)
+            new, new_time, new_peak = measure(single_pass, path, args.chunk_rows)
+            for category in old:
+                # The four output CSVs must be byte for byte the same
+                assert old[category].to_csv(index=False) == new[category].to_csv(index=False), category
+            sizes = "/".join(str(len(new[category])) for category in new)
+            print(f"{n_rows:>9d} rows  previous {old_time:6.2f} s {old_peak:7.1f} MB peak   "
+                  f"single pass {new_time:6.2f} s {new_peak:7.1f} MB peak   "
+                  f"({old_time / new_time:.1f}x)  missing/incomplete/single/double rows {sizes}")
+
+if __name__ == "__main__":
+    main()
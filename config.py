@@ -8,24 +8,62 @@ MYCOCOSM_FUNGI_URL = "https://mycocosm.jgi.doe.gov/fungi/fungi.info.html"
 ## API configuration
 JGI_API_BASE_URL = "https://files.jgi.doe.gov/mycocosm_file_list/"
 FILES_PER_PAGE = 50  # Set to 50 files per page
-REQUEST_DELAY = 1  # Delay in seconds between requests
+REQUESTS_PER_SECOND = 1  # Sustained request budget shared by all fetch workers
+REQUEST_BURST = 1  # Requests allowed back-to-back before the rate limit kicks in
+FETCH_WORKERS = 4  # Organisms fetched concurrently
+PAGE_WORKERS = 4  # Listing pages of one organism fetched concurrently (1 = sequential)
+PAGE_STORE = "ndjson"  # "ndjson": one gzip store per organism, "json": one indented file per page
+PARSE_WORKERS = 4  # Processes decoding cached listing pages
+CACHE_TTL_DAYS = 7  # Age after which cached listings are revalidated (None = never)
+METADATA_DB = True  # Also load the portal table and file listing into an indexed SQLite database
+
+## Metadata wrangling
+WRANGLE_CHUNK_ROWS = 500000  # File metadata rows read at a time, so listings larger than memory can be wrangled
+
+## Proteome downloads
+JGI_DOWNLOAD_URL = "https://files-download.jgi.doe.gov/download_files/{file_id}/"  # Filled from the listing row
+DOWNLOAD_WORKERS = 4  # Archives downloaded concurrently (they share the request budget above)
+DOWNLOAD_RETRIES = 3  # Attempts per archive when the connection breaks, each resuming the partial file
+
+# ---- Proteome processing ----
+DECOMPRESSION_BACKEND = "auto"  # "auto" (fastest available), "isal", "zlib-ng", "pigz", "igzip" or "gzip"
+VERIFY_WORKERS = 4  # Archives md5-checked concurrently before extraction
+
+# ---- Proteome export ----
+SHARD_COUNT = 8  # Shards the clean proteomes are balanced over for downstream orthology runs
 
 # ---- Paths ----
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'local_data')
 JSON_DIR = os.path.join(DATA_DIR, 'json_files')
+FETCH_MANIFEST_PATH = os.path.join(JSON_DIR, 'manifest.jsonl')
+PIPELINE_STATE_PATH = os.path.join(DATA_DIR, 'pipeline_state.json')
 PORTALS_DIR = os.path.join(DATA_DIR, "portal_phylogeny")
 PROTEOMES_DIR = os.path.join(DATA_DIR, "proteomes")
 COMPRESSED_PROTEOMES_DIR = os.path.join(PROTEOMES_DIR, "compressed")
 EXTRACTED_PROTEOMES_DIR = os.path.join(PROTEOMES_DIR, "extracted")
 RENAMED_PROTEOMES_DIR = os.path.join(PROTEOMES_DIR, "renamed")
 CLEAN_PROTEOMES_DIR = os.path.join(PROTEOMES_DIR, "clean")
+PROTEOME_STORE_DIR = os.path.join(PROTEOMES_DIR, "store")
+DEDUP_PROTEOMES_DIR = os.path.join(PROTEOMES_DIR, "dedup")
+SHARDS_DIR = os.path.join(PROTEOMES_DIR, "shards")
 
 PORTALS_TABLE_PATH = os.path.join(DATA_DIR, 'mycocosm_fungi_data.csv')
 ORGANISM_IDS_PATH = os.path.join(DATA_DIR, 'selected_organism_ids.csv')
 MYCOCOSM_FILELIST_PATH = os.path.join(DATA_DIR, 'mycocosm_data.csv')
 ALL_FILES_METADATA_PATH = os.path.join(DATA_DIR, 'all_files_metadata.csv')
+ALL_FILES_METADATA_PARQUET_PATH = os.path.join(DATA_DIR, 'all_files_metadata.parquet')
+METADATA_DB_PATH = os.path.join(DATA_DIR, 'metadata.sqlite')
+TAXONOMY_TREE_PATH = os.path.join(PORTALS_DIR, "taxonomy_guide_tree.nwk")
+TAXONOMY_LINEAGE_PATH = os.path.join(PORTALS_DIR, "portals_lineage.csv")
 SELECTED_FILES_METADATA_PATH = os.path.join(DATA_DIR, 'proteome_list_orthofinder.csv')
 PROCESSED_PROTEOMES_PATH = os.path.join(PROTEOMES_DIR, "processed_proteomes.csv")
+DOWNLOAD_LOG_PATH = os.path.join(PROTEOMES_DIR, "download_log.csv")
+VERIFY_REPORT_PATH = os.path.join(PROTEOMES_DIR, "md5_verification.csv")
+HASH_CACHE_PATH = os.path.join(PROTEOMES_DIR, "md5_cache.json")
+PROTEOME_STATS_PATH = os.path.join(PROTEOMES_DIR, "proteome_stats.parquet")
 PROTEOME_LOG_PATH = os.path.join(PROTEOMES_DIR, "renaming_summary_log.csv")
-PROTEOME_CUSTOMLOG_PATH = os.path.join(PROTEOMES_DIR, "renaming_custom_summary_log.csv")
\ No newline at end of file
+CLEANUP_LOG_PATH = os.path.join(PROTEOMES_DIR, "cleanup_summary_log.csv")
+RENAME_RULES_PATH = os.path.join(BASE_DIR, "rename_rules.json")
+DEDUP_MAP_PATH = os.path.join(PROTEOMES_DIR, "dedup_map.tsv")
+BUILD_MANIFEST_PATH = os.path.join(PROTEOMES_DIR, "build_manifest.json")
\ No newline at end of file
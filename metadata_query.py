@@ -0,0 +1,46 @@
+import sys
+import argparse
+from config import METADATA_DB_PATH
+from utils.metadata_db import query_files
+
+# Command-line options and the files table columns they filter on
+FILTERS = {
+    "organism": "organism",
+    "file_type": "file_type",
+    "taxon_id": "ncbi_taxon_id",
+    "class": "ncbi_taxon_class",
+    "order": "ncbi_taxon_order",
+    "family": "ncbi_taxon_family",
+    "genus": "ncbi_taxon_genus",
+    "species": "ncbi_taxon_species",
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Select file metadata from the SQLite database, e.g. --order Pleosporales --file-type Proteome --since 2025-03-01.")
+    for option, column in FILTERS.items():
+        parser.add_argument(f"--{option.replace('_', '-')}", dest=option, action="append",
+                            help=f"Keep files with this {column} (repeatable).")
+    parser.add_argument("--since", help="Keep files dated on or after this ISO date.")
+    parser.add_argument("--until", help="Keep files dated before this ISO date.")
+    parser.add_argument("--columns", help="Comma-separated columns to output (all by default).")
+    parser.add_argument("--output", help="CSV to write the selection to (printed otherwise).")
+    return parser.parse_args()
+
+def main(args):
+    filters = {column: getattr(args, option) for option, column in FILTERS.items() if getattr(args, option)}
+    columns = args.columns.split(",") if args.columns else None
+    try:
+        selection = query_files(columns, args.since, args.until, METADATA_DB_PATH, **filters)
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    if args.output:
+        selection.to_csv(args.output, index=False)
+        print(f"📁 {len(selection)} files saved to: {args.output}")
+    else:
+        print(selection.to_string(index=False))
+        print(f"🔎 {len(selection)} files")
+    return selection
+
+if __name__ == "__main__":
+    main(parse_args())
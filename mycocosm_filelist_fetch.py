@@ -1,7 +1,8 @@
 import os
 import csv
-from config import JSON_DIR, ORGANISM_IDS_PATH
-from utils.web_utils import fetch_all_files, parse_and_export
+from config import JSON_DIR, ORGANISM_IDS_PATH, FETCH_WORKERS, CACHE_TTL_DAYS
+from utils.web_utils import fetch_organisms, parse_and_export
+from utils.cache_utils import FetchManifest
 from local_data.credentials import JGI_API_TOKEN
 
 # Authentication headers
@@ -10,10 +11,7 @@ headers = {
     "Authorization": JGI_API_TOKEN
 }    
 
-# -------------------------
-# Main
-# -------------------------
-if __name__ == "__main__":
+def main():
     organism_ids = []
     with open(ORGANISM_IDS_PATH, newline="") as csvfile:
         reader = csv.DictReader(csvfile)
@@ -23,12 +21,25 @@ if __name__ == "__main__":
     print(organism_ids)
 
     os.makedirs(JSON_DIR, exist_ok=True)
+    manifest = FetchManifest()
 
+    to_fetch = []
+    to_revalidate = []
     for organism_id in organism_ids:
-        # Check if any JSON files exist for this organism to avoid re-fetching
-        if not any(f.startswith(f"all_files_{organism_id}_page_") for f in os.listdir(JSON_DIR)):
-            fetch_all_files(organism_id, headers)
+        # Fetch new or interrupted listings, revalidate expired ones, reuse the rest
+        entry = manifest.get(organism_id)
+        if entry is None or not entry["complete"]:
+            to_fetch.append(organism_id)
+        elif manifest.is_stale(organism_id, CACHE_TTL_DAYS):
+            to_revalidate.append(organism_id)
         else:
             print(f"🗂️ Using cached JSON for {organism_id}...")
 
-    parse_and_export(organism_ids)
\ No newline at end of file
+    fetch_organisms(to_fetch + to_revalidate, headers, workers=FETCH_WORKERS,
+                    manifest=manifest, revalidate=to_revalidate)
+    manifest.compact()
+
+    parse_and_export(organism_ids, manifest=manifest)
+
+if __name__ == "__main__":
+    main()
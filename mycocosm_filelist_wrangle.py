@@ -1,41 +1,138 @@
 import os
+import numpy as np
 import pandas as pd
-from config import PORTALS_DIR, ALL_FILES_METADATA_PATH
-
-def get_missing_and_retrieved_organisms(df):
-    retrieved = df[df["file_name"] != "NO FILES FOUND"]["organism"].unique()
-    missing = df[df["file_name"] == "NO FILES FOUND"]["organism"].unique()
-    return retrieved, missing
-
-def build_phylogeny_data(df):
-    cols = ["organism"] + [col for col in df.columns if col.startswith("ncbi")]
-    return df.loc[:, cols].drop_duplicates()
-
-def split_phylogeny_data(phylogeny_data, missing_organisms):
-    missing = phylogeny_data[phylogeny_data["organism"].isin(missing_organisms)]
-    complete = phylogeny_data[phylogeny_data["ncbi_taxon_id"].notna()].drop_duplicates()
-    incomplete = phylogeny_data[
-        ~phylogeny_data["organism"].isin(list(missing_organisms) + list(complete["organism"]))
-    ].drop_duplicates()
-    return missing, complete, incomplete
-
-def find_duplicates(phylogeny_data_complete):
-    counts = phylogeny_data_complete.groupby("organism").size().reset_index(name="count")
-    double_organisms = counts[counts["count"] > 1]["organism"]
-    double_phylogeny = phylogeny_data_complete[phylogeny_data_complete["organism"].isin(double_organisms)]
-    single_phylogeny = phylogeny_data_complete[~phylogeny_data_complete["organism"].isin(double_organisms)]
-    return double_phylogeny, single_phylogeny
-
-def check_organism_counts(single_phylogeny, double_phylogeny, missing, incomplete, all_organisms):
-    all_count = len(
-        pd.unique(
-            list(single_phylogeny["organism"])
-            + list(double_phylogeny["organism"])
-            + list(missing["organism"])
-            + list(incomplete["organism"])
-        )
+from contextlib import closing
+from config import (PORTALS_DIR, ALL_FILES_METADATA_PATH, ALL_FILES_METADATA_PARQUET_PATH,
+                    TAXONOMY_TREE_PATH, TAXONOMY_LINEAGE_PATH, WRANGLE_CHUNK_ROWS)
+from utils.metadata_db import open_current, PHYLOGENY_COLUMNS
+from utils.taxonomy_tree import TaxonomyTree
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+NO_FILES = "NO FILES FOUND"
+
+def iter_files_metadata(chunk_rows=WRANGLE_CHUNK_ROWS, csv_path=ALL_FILES_METADATA_PATH,
+                        parquet_path=ALL_FILES_METADATA_PARQUET_PATH):
+    """
+    Stream the columns the wrangling needs from the file metadata, chunk by chunk.
+
+    The columnar copy is preferred when it is up to date. Taxonomy columns are
+    read as categoricals, so each chunk holds integer codes rather than strings.
+
+    Args:
+        chunk_rows (int): Rows read at a time.
+        csv_path (str): File metadata CSV.
+        parquet_path (str or None): Its columnar copy, if any.
+
+    Yields:
+        pd.DataFrame: organism, file_name and the ncbi_taxon_* columns.
+    """
+    columns = PHYLOGENY_COLUMNS[:1] + ["file_name"] + PHYLOGENY_COLUMNS[1:]
+    parquet_fresh = (
+        pq is not None and parquet_path is not None
+        and os.path.exists(parquet_path)
+        and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
     )
-    assert all_count == len(all_organisms), "Organism count mismatch!"
+    if parquet_fresh:
+        for batch in pq.ParquetFile(parquet_path).iter_batches(chunk_rows, columns=columns):
+            chunk = batch.to_pandas()
+            # Match the numeric type pandas infers from the CSV
+            chunk["ncbi_taxon_id"] = pd.to_numeric(chunk["ncbi_taxon_id"])
+            yield chunk
+        return
+    # file_name is nearly unique per row, so it stays a plain column
+    dtypes = {column: "category" for column in PHYLOGENY_COLUMNS if column != "ncbi_taxon_id"}
+    yield from pd.read_csv(csv_path, usecols=columns, dtype=dtypes, chunksize=chunk_rows)
+
+def scan_files_metadata(chunks):
+    """
+    Reduce the file metadata to its distinct taxonomy rows in a single pass.
+
+    Each chunk is deduplicated on its own and the survivors once more at the
+    end, which keeps the first occurrence of every row as a global
+    drop_duplicates would; memory holds one chunk plus the distinct rows.
+
+    Args:
+        chunks (iterable): DataFrames from iter_files_metadata.
+
+    Returns:
+        tuple: All organisms in order of appearance, organisms without files, and
+            the distinct organism/taxonomy rows in order of appearance.
+    """
+    phylogeny, missing = [], []
+    for chunk in chunks:
+        phylogeny.append(chunk[PHYLOGENY_COLUMNS].drop_duplicates())
+        missing.append(chunk.loc[chunk["file_name"] == NO_FILES, "organism"].astype(object).unique())
+    if not phylogeny:
+        return np.array([], dtype=object), np.array([], dtype=object), pd.DataFrame(columns=PHYLOGENY_COLUMNS)
+    # Chunks with different categories concatenate as plain values
+    phylogeny_data = pd.concat(phylogeny, ignore_index=True).drop_duplicates()
+    for column in PHYLOGENY_COLUMNS:
+        if isinstance(phylogeny_data[column].dtype, pd.CategoricalDtype):
+            phylogeny_data[column] = phylogeny_data[column].astype(object)
+    all_organisms = phylogeny_data["organism"].unique()
+    missing_organisms = pd.unique(np.concatenate(missing))
+    return all_organisms, missing_organisms, phylogeny_data
+
+def load_phylogeny_from_db(conn):
+    """
+    Read what the wrangling needs from the metadata database instead of every file row.
+
+    Args:
+        conn (sqlite3.Connection): Connection from open_current.
+
+    Returns:
+        tuple: Same as scan_files_metadata.
+    """
+    all_organisms = pd.read_sql_query(
+        "SELECT organism FROM files GROUP BY organism ORDER BY MIN(rowid)", conn)["organism"].to_numpy()
+    missing_organisms = pd.read_sql_query(
+        f"SELECT DISTINCT organism FROM files WHERE file_name = '{NO_FILES}'", conn)["organism"].to_numpy()
+    columns = ", ".join(PHYLOGENY_COLUMNS)
+    phylogeny_data = pd.read_sql_query(
+        f"SELECT {columns} FROM files GROUP BY {columns} ORDER BY MIN(rowid)", conn)
+    return all_organisms, missing_organisms, phylogeny_data
+
+def categorize_organisms(phylogeny_data, missing_organisms):
+    """
+    Sort the taxonomy rows into missing, incomplete, single and double in one grouped pass.
+
+    Organisms are factorized into integer codes once; the number of complete
+    rows (with an NCBI taxon ID) of every organism is a single bincount, and
+    each category is a boolean mask gathered back onto the rows:
+
+    - missing: every row of an organism listed without files;
+    - incomplete: rows of other organisms that have no complete row;
+    - single / double: complete rows of organisms with exactly one / several.
+
+    Args:
+        phylogeny_data (pd.DataFrame): Distinct organism/taxonomy rows.
+        missing_organisms (array-like): Organisms listed without files.
+
+    Returns:
+        dict: Category -> rows of phylogeny_data, in their original order.
+    """
+    codes, organisms = pd.factorize(phylogeny_data["organism"], use_na_sentinel=False)
+    complete = phylogeny_data["ncbi_taxon_id"].notna().to_numpy()
+    complete_counts = np.bincount(codes, weights=complete, minlength=len(organisms))[codes]
+    missing = np.asarray(pd.Index(organisms).isin(missing_organisms))[codes]
+    masks = {
+        "missing": missing,
+        "incomplete": ~missing & (complete_counts == 0),
+        "single": complete & (complete_counts == 1),
+        "double": complete & (complete_counts > 1),
+    }
+    return {category: phylogeny_data[mask] for category, mask in masks.items()}
+
+def check_organism_counts(categories, all_organisms):
+    """
+    Check that every organism landed in at least one category.
+    """
+    categorized = pd.concat([rows["organism"] for rows in categories.values()]).unique()
+    assert len(categorized) == len(all_organisms), "Organism count mismatch!"
 
 def write_outputs(out_dir, missing, incomplete, single_phylogeny, double_phylogeny):
     missing.to_csv(os.path.join(out_dir, "missing_portals_phylopgeny.csv"), index=False)
@@ -43,23 +140,38 @@ def write_outputs(out_dir, missing, incomplete, single_phylogeny, double_phyloge
     single_phylogeny.to_csv(os.path.join(out_dir, "portals_single_phylogeny.csv"), index=False)
     double_phylogeny.to_csv(os.path.join(out_dir, "portals_double_phylogeny.csv"), index=False)
 
-def main():
+def write_taxonomy(phylogeny_data_complete, tree_path=TAXONOMY_TREE_PATH, lineage_path=TAXONOMY_LINEAGE_PATH):
+    """
+    Build the taxonomy tree of the portals and save it as a Newick guide tree and a lineage table.
+
+    Portals with two taxonomies keep the first one.
+
+    Returns:
+        TaxonomyTree: The tree.
+    """
+    tree = TaxonomyTree.from_frame(phylogeny_data_complete)
+    with open(tree_path, "w") as f:
+        f.write(tree.to_newick() + "\n")
+    tree.lineage_table().to_csv(lineage_path, index=False)
+    print(f"🌳 Taxonomy of {len(tree.tip_labels)} portals saved to: {tree_path} and {lineage_path}")
+    return tree
+
+def main(chunk_rows=WRANGLE_CHUNK_ROWS):
     os.makedirs(PORTALS_DIR, exist_ok=True)
-    
-    # Load all MycoCosm files metadata
-    all_mycocosm_files = pd.read_csv(ALL_FILES_METADATA_PATH)
-
-    all_organisms = all_mycocosm_files["organism"].unique()
-    retrieved_organisms, missing_organisms = get_missing_and_retrieved_organisms(all_mycocosm_files)
-    
-    phylogeny_data = build_phylogeny_data(all_mycocosm_files)
-    phylogeny_data_missing, phylogeny_data_complete, phylogeny_data_incomplete = split_phylogeny_data(
-        phylogeny_data, missing_organisms
-    )
-    double_phylogeny, single_phylogeny = find_duplicates(phylogeny_data_complete)
 
-    check_organism_counts(single_phylogeny, double_phylogeny, phylogeny_data_missing, phylogeny_data_incomplete, all_organisms)
-    write_outputs(PORTALS_DIR, phylogeny_data_missing, phylogeny_data_incomplete, single_phylogeny, double_phylogeny)
+    conn = open_current("files", ALL_FILES_METADATA_PATH)
+    if conn is not None:
+        # The database answers with the distinct taxonomy rows only
+        with closing(conn):
+            all_organisms, missing_organisms, phylogeny_data = load_phylogeny_from_db(conn)
+    else:
+        # Stream all MycoCosm files metadata, keeping only the distinct taxonomy rows
+        all_organisms, missing_organisms, phylogeny_data = scan_files_metadata(iter_files_metadata(chunk_rows))
+
+    categories = categorize_organisms(phylogeny_data, missing_organisms)
+    check_organism_counts(categories, all_organisms)
+    write_outputs(PORTALS_DIR, categories["missing"], categories["incomplete"], categories["single"], categories["double"])
+    write_taxonomy(phylogeny_data[phylogeny_data["ncbi_taxon_id"].notna()])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import argparse
+from config import (
+    PORTALS_TABLE_PATH, ORGANISM_IDS_PATH, ALL_FILES_METADATA_PATH, PORTALS_DIR,
+    SELECTED_FILES_METADATA_PATH, COMPRESSED_PROTEOMES_DIR, RENAMED_PROTEOMES_DIR,
+    CLEAN_PROTEOMES_DIR, CLEANUP_LOG_PATH, PROCESSED_PROTEOMES_PATH, PROTEOME_LOG_PATH,
+    RENAME_RULES_PATH, PROTEOME_STORE_DIR, DEDUP_PROTEOMES_DIR, DEDUP_MAP_PATH,
+    SHARDS_DIR, SHARD_COUNT, DOWNLOAD_LOG_PATH, VERIFY_REPORT_PATH, PIPELINE_STATE_PATH
+)
+
+# Stage modules are imported when their stage runs: the filelist fetch needs the
+# JGI credentials, which offline stages should not depend on.
+
+def _run_table(results, options):
+    import mycocosm_table_fetch
+    mycocosm_table_fetch.main()
+
+def _run_filelist(results, options):
+    import mycocosm_filelist_fetch
+    mycocosm_filelist_fetch.main()
+
+def _run_wrangle(results, options):
+    import mycocosm_filelist_wrangle
+    mycocosm_filelist_wrangle.main()
+
+def _run_download(results, options):
+    import proteome_file_download
+    proteome_file_download.main()
+
+def _run_verify(results, options):
+    import proteome_file_verify
+    return proteome_file_verify.main()
+
+def _run_process(results, options):
+    import proteome_file_process
+    return proteome_file_process.main(fused=options.fused, workers=options.workers, rebuild=options.rebuild)
+
+def _run_cleanup(results, options):
+    import proteome_file_cleanup
+    proteome_files = None
+    if results.get("process") is not None:
+        proteome_files = [f for f in results["process"]["renamed_file"] if f]
+    proteome_file_cleanup.main(workers=options.workers, rebuild=options.rebuild, proteome_files=proteome_files)
+
+def _run_dedup(results, options):
+    import proteome_dedup
+    proteome_dedup.main()
+
+def _run_store(results, options):
+    import proteome_store
+    proteome_store.build()
+
+def _run_shard(results, options):
+    import proteome_shard
+    proteome_shard.main(shards=options.shards, chunk_residues=options.chunk_residues)
+
+class Stage:
+    """
+    One step of the pipeline and the files it reads and writes.
+
+    Args:
+        name (str): Name used on the command line.
+        run (callable): Called with the results of the stages run so far and the
+            command-line options; its return value is handed to later stages.
+        inputs (list): Files or directories the stage reads.
+        outputs (list): Files or directories the stage writes.
+        optional (bool): Only run when asked for with --with.
+    """
+    def __init__(self, name, run, inputs, outputs, optional=False):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.optional = optional
+
+STAGES = [
+    Stage("table", _run_table, [], [PORTALS_TABLE_PATH]),
+    Stage("filelist", _run_filelist, [ORGANISM_IDS_PATH], [ALL_FILES_METADATA_PATH]),
+    Stage("wrangle", _run_wrangle, [ALL_FILES_METADATA_PATH], [PORTALS_DIR]),
+    Stage("download", _run_download, [SELECTED_FILES_METADATA_PATH, ALL_FILES_METADATA_PATH],
+          [COMPRESSED_PROTEOMES_DIR, DOWNLOAD_LOG_PATH]),
+    Stage("verify", _run_verify, [SELECTED_FILES_METADATA_PATH, ALL_FILES_METADATA_PATH, COMPRESSED_PROTEOMES_DIR],
+          [VERIFY_REPORT_PATH]),
+    Stage("process", _run_process, [SELECTED_FILES_METADATA_PATH, COMPRESSED_PROTEOMES_DIR, RENAME_RULES_PATH,
+                                    VERIFY_REPORT_PATH],
+          [PROCESSED_PROTEOMES_PATH, PROTEOME_LOG_PATH, RENAMED_PROTEOMES_DIR]),
+    Stage("cleanup", _run_cleanup, [RENAMED_PROTEOMES_DIR, PROCESSED_PROTEOMES_PATH],
+          [CLEAN_PROTEOMES_DIR, CLEANUP_LOG_PATH]),
+    Stage("dedup", _run_dedup, [CLEAN_PROTEOMES_DIR], [DEDUP_PROTEOMES_DIR, DEDUP_MAP_PATH], optional=True),
+    Stage("store", _run_store, [CLEAN_PROTEOMES_DIR], [PROTEOME_STORE_DIR]),
+    Stage("shard", _run_shard, [CLEAN_PROTEOMES_DIR], [SHARDS_DIR], optional=True),
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+def load_state(path=PIPELINE_STATE_PATH):
+    """
+    Return the start time of the last successful run of each stage.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=PIPELINE_STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+def _newest_mtime(path):
+    """
+    Modification time of a file, or of the newest entry of a directory (None if missing).
+    """
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if os.path.isdir(path):
+        for entry in os.scandir(path):
+            mtime = max(mtime, entry.stat().st_mtime)
+    return mtime
+
+def is_up_to_date(stage, state):
+    """
+    Check whether a stage's outputs exist and none of its inputs changed since it last ran.
+
+    Args:
+        stage (Stage): Stage to check.
+        state (dict): Start time of the last successful run of each stage.
+
+    Returns:
+        bool: True if the stage can be skipped.
+    """
+    started = state.get(stage.name)
+    if started is None or not all(os.path.exists(path) for path in stage.outputs):
+        return False
+    for path in stage.inputs:
+        mtime = _newest_mtime(path)
+        if mtime is not None and mtime > started:
+            return False
+    return True
+
+def select_stages(first=None, last=None, extra=()):
+    """
+    Return the stages from `first` to `last` inclusive, in pipeline order.
+
+    Optional stages are only included when named in `extra`.
+    """
+    start = STAGE_NAMES.index(first) if first else 0
+    stop = STAGE_NAMES.index(last) + 1 if last else len(STAGES)
+    return [stage for stage in STAGES[start:stop] if not stage.optional or stage.name in extra]
+
+def run(options):
+    """
+    Run the selected stages once each, skipping those whose outputs are up to date.
+
+    Results are handed between stages in memory; a stage that is skipped or
+    not selected leaves later stages to read its outputs from disk.
+
+    Args:
+        options (argparse.Namespace): Parsed command-line options.
+    """
+    state = load_state()
+    results = {}
+    for stage in select_stages(options.first, options.last, options.extra):
+        if not options.force and is_up_to_date(stage, state):
+            print(f"⏭️ Stage {stage.name} is up to date, skipping.")
+            continue
+        print(f"▶️ Running stage: {stage.name}")
+        started = time.time()
+        results[stage.name] = stage.run(results, options)
+        state[stage.name] = started
+        save_state(state)
+    print("✅ Pipeline complete.")
+
+def status(options):
+    state = load_state()
+    for stage in select_stages(options.first, options.last, options.extra):
+        print(f"{stage.name:10} {'up to date' if is_up_to_date(stage, state) else 'pending'}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the genephylogeny pipeline stages in order.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("run", "Run the pipeline."), ("status", "Show which stages would run.")):
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument("--from", dest="first", choices=STAGE_NAMES, help="First stage to consider.")
+        sub.add_argument("--to", dest="last", choices=STAGE_NAMES, help="Last stage to consider.")
+        sub.add_argument("--with", dest="extra", action="append", default=[],
+                         choices=[stage.name for stage in STAGES if stage.optional],
+                         help="Also run an optional stage (repeatable).")
+    run_parser = subparsers.choices["run"]
+    run_parser.add_argument("--force", action="store_true",
+                            help="Run the selected stages even if their outputs are up to date.")
+    run_parser.add_argument("--rebuild", action="store_true",
+                            help="Also ignore the per-proteome build manifest.")
+    run_parser.add_argument("--fused", action="store_true",
+                            help="Rename straight from the compressed files without writing extracted copies.")
+    run_parser.add_argument("--workers", type=int, default=1,
+                            help="Number of proteomes processed in parallel.")
+    run_parser.add_argument("--shards", type=int, default=SHARD_COUNT,
+                            help="Number of shards written by the shard stage.")
+    run_parser.add_argument("--chunk-residues", type=int,
+                            help="Let the shard stage cut proteomes into chunks of about this many residues.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        status(args)
@@ -0,0 +1,26 @@
+import os
+from config import CLEAN_PROTEOMES_DIR, DEDUP_PROTEOMES_DIR, DEDUP_MAP_PATH
+from utils.wrangle_utils import validate_directories
+from utils.dedup_utils import deduplicate
+
+def main():
+    # Validate input directories
+    validate_directories([CLEAN_PROTEOMES_DIR])
+
+    # Create output directory if missing
+    os.makedirs(DEDUP_PROTEOMES_DIR, exist_ok=True)
+
+    # Sorted so that the representative of a group does not depend on listing order
+    proteome_files = sorted(
+        os.path.join(CLEAN_PROTEOMES_DIR, f)
+        for f in os.listdir(CLEAN_PROTEOMES_DIR)
+        if f.endswith(".fasta")
+    )
+    if not proteome_files:
+        raise FileNotFoundError(f"No FASTA files found in {CLEAN_PROTEOMES_DIR}.")
+
+    total, kept = deduplicate(proteome_files, DEDUP_PROTEOMES_DIR, DEDUP_MAP_PATH)
+    print(f"📝 Collapsed {total - kept} identical sequences ({kept}/{total} kept); map saved to: {DEDUP_MAP_PATH}")
+
+if __name__ == "__main__":
+    main()
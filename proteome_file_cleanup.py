@@ -1,48 +1,186 @@
 import os
-from Bio import SeqIO
-from config import RENAMED_PROTEOMES_DIR, CLEAN_PROTEOMES_DIR
-from utils.wrangle_utils import validate_directories
+import argparse
+import numpy as np
+import pandas as pd
+from config import RENAMED_PROTEOMES_DIR, CLEAN_PROTEOMES_DIR, CLEANUP_LOG_PATH, PROTEOME_STATS_PATH
+from utils.wrangle_utils import validate_directories, run_incremental
+from utils.fasta_index import iter_index, index_path, RecordCopier
+from utils.quality_utils import sequence_stats, quality_masks
+from utils.stats_utils import count_lengths, proteome_stats, write_stats_table, LENGTH_BINS
+from utils.build_utils import BuildManifest, build_key, file_fingerprint
 
 # Define length limits
 UPPER_LENGTH = 10000
 LOWER_LENGTH = 50
 
-def main():
+# Define quality limits (None disables a filter; all are off by default, e.g. 0.1, 0 and 3.0)
+MAX_AMBIGUOUS_FRACTION = None  # Share of X/B/Z/J residues
+MAX_INTERNAL_STOPS = None  # "*" anywhere but at the end of the sequence
+MIN_ENTROPY = None  # Shannon entropy of the residue composition, in bits
+
+FILTERS = ["too_short", "too_long", "ambiguous", "internal_stop", "low_complexity"]
+
+def default_filters():
+    return {
+        "max_ambiguous_fraction": MAX_AMBIGUOUS_FRACTION,
+        "max_internal_stops": MAX_INTERNAL_STOPS,
+        "min_entropy": MIN_ENTROPY,
+    }
+
+def length_mask(index):
+    """
+    Select the records whose sequence length lies within LOWER_LENGTH and UPPER_LENGTH.
+
+    Args:
+        index (np.ndarray): FASTA index rows (see utils.fasta_index).
+
+    Returns:
+        np.ndarray: Boolean mask over the rows.
+    """
+    return (index["length"] >= LOWER_LENGTH) & (index["length"] <= UPPER_LENGTH)
+
+def _cleanup_log(file_name, total, kept, rejected):
+    return {
+        "file": os.path.basename(file_name),
+        "total_sequences": total,
+        "kept_sequences": kept,
+        **{name: rejected.get(name, 0) for name in FILTERS}
+    }
+
+def clean_proteome(file_name, output_dir, filters=None):
+    """
+    Write the records of one FASTA file that pass the length and quality filters.
+
+    Lengths come from the index sidecar written by the rename stage and the
+    quality statistics from vectorised byte counts, so no sequence is parsed:
+    the kept records are copied as raw byte ranges. The file and its index are
+    streamed in batches, so memory stays bounded whatever the proteome size.
+
+    Args:
+        file_name (str): Path to the renamed FASTA file.
+        output_dir (str): Directory to save the filtered FASTA file.
+        filters (dict, optional): Quality thresholds, see default_filters.
+
+    Returns:
+        dict: "log": row with the number of sequences read and kept, and the number
+            rejected by each filter (each sequence counted under the first filter it fails);
+            "stats": summary of the input proteome (see utils.stats_utils), computed
+            from the same index and byte counts.
+    """
+    filters = default_filters() if filters is None else filters
+    print(f"Processing file: {os.path.basename(file_name)}")
+    output_file = os.path.join(output_dir, os.path.basename(file_name))
+    total = 0
+    kept_residues = 0
+    counts = dict.fromkeys(FILTERS, 0)
+    composition = np.zeros(256, dtype=np.int64)
+    length_counts = None
+
+    # The index is read a batch of records at a time, so memory does not grow with the file
+    with RecordCopier(file_name, output_file) as copier:
+        for index in iter_index(file_name):
+            masks = [("too_short", index["length"] < LOWER_LENGTH), ("too_long", index["length"] > UPPER_LENGTH)]
+            stats = sequence_stats(file_name, index, composition=composition)
+            masks += quality_masks(index, stats, **filters)
+            rejected = np.zeros(len(index), dtype=bool)
+            for name, mask in masks:
+                counts[name] += int((mask & ~rejected).sum())
+                rejected |= mask
+
+            # Copy the kept records straight from the input
+            copier.copy(index[~rejected])
+            total += len(index)
+            kept_residues += int(index["length"][~rejected].sum())
+            length_counts = count_lengths(index["length"], length_counts)
+
+    if not total:
+        os.remove(output_file)
+        os.remove(index_path(output_file))
+        print(f"Warning: No sequences found in {os.path.basename(file_name)}. Skipping this file.")
+        return {"log": _cleanup_log(file_name, 0, 0, {}), "stats": None}
+    kept = total - sum(counts.values())
+
+    summary = {
+        "portal": os.path.basename(file_name)[:-len(".fasta")],
+        **proteome_stats(length_counts, composition),
+        "kept_sequences": kept,
+        "kept_residues": kept_residues,
+    }
+
+    print(f"Successfully filtered {total} sequences from {os.path.basename(file_name)} into {kept} sequences saved to {output_file}")
+    return {"log": _cleanup_log(file_name, total, kept, counts), "stats": summary}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Filter proteome sequences by length and quality.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of proteomes filtered in parallel.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Ignore the build manifest and filter every proteome.")
+    parser.add_argument("--max-ambiguous-fraction", type=float, default=MAX_AMBIGUOUS_FRACTION,
+                        help="Largest share of X/B/Z/J residues kept (off by default; negative to disable).")
+    parser.add_argument("--max-internal-stops", type=int, default=MAX_INTERNAL_STOPS,
+                        help="Largest number of internal '*' kept (off by default; negative to disable).")
+    parser.add_argument("--min-entropy", type=float, default=MIN_ENTROPY,
+                        help="Smallest residue composition entropy kept, in bits (off by default; negative to disable).")
+    return parser.parse_args()
+
+def _cleaned_output(task, result):
+    file_name, output_dir = task[:2]
+    return [os.path.join(output_dir, os.path.basename(file_name))] if result and result["stats"] else []
+
+def main(workers=1, rebuild=False, proteome_files=None, filters=None):
     # Validate input directories
     validate_directories([RENAMED_PROTEOMES_DIR])
 
     # Create output directory if missing
     os.makedirs(CLEAN_PROTEOMES_DIR, exist_ok=True)
 
-    # List all FASTA files
-    proteome_files = [
-        os.path.join(RENAMED_PROTEOMES_DIR, f)
-        for f in os.listdir(RENAMED_PROTEOMES_DIR)
-        if f.endswith(".fasta")
-    ]
+    # List all FASTA files, unless the caller already knows which ones to filter
+    if proteome_files is None:
+        proteome_files = [
+            os.path.join(RENAMED_PROTEOMES_DIR, f)
+            for f in os.listdir(RENAMED_PROTEOMES_DIR)
+            if f.endswith(".fasta")
+        ]
 
     if not proteome_files:
         raise FileNotFoundError(f"No FASTA files found in {RENAMED_PROTEOMES_DIR}.")
 
-    for file_name in proteome_files:
-        print(f"Processing file: {os.path.basename(file_name)}")
-        sequences = list(SeqIO.parse(file_name, "fasta"))
-        if not sequences:
-            print(f"Warning: No sequences found in {os.path.basename(file_name)}. Skipping this file.")
-            continue
-
-        # Filter by length
-        output_sequences = [
-            seq for seq in sequences
-            if LOWER_LENGTH <= len(seq) <= UPPER_LENGTH
-        ]
+    # Keyed on the renamed file itself, so re-renamed proteomes are filtered again
+    manifest = BuildManifest()
+    if rebuild:
+        manifest.invalidate("cleanup")
+    filters = default_filters() if filters is None else filters
+    tasks = [(f, CLEAN_PROTEOMES_DIR, filters) for f in proteome_files]
+    names = [os.path.basename(f) for f in proteome_files]
+    # Only enabled filters enter the key, so turning none on leaves clean proteomes up to date
+    active = {name: value for name, value in filters.items() if value is not None}
+    keys = [
+        build_key("cleanup", file_fingerprint(f), LOWER_LENGTH, UPPER_LENGTH, *([active] if active else []),
+                  LENGTH_BINS, CLEAN_PROTEOMES_DIR)
+        for f in proteome_files
+    ]
+    results = run_incremental("cleanup", clean_proteome, tasks, names, keys, _cleaned_output, manifest, workers,
+                              on_error=lambda task: {"log": _cleanup_log(task[0], 0, 0, {}), "stats": None})
+    manifest.save()
+
+    log_df = pd.DataFrame([r["log"] for r in results], columns=["file", "total_sequences", "kept_sequences"] + FILTERS)
+    log_df.to_csv(CLEANUP_LOG_PATH, index=False)
+    print(f"📝 Cleanup log saved to: {CLEANUP_LOG_PATH}")
 
-        # Save filtered sequences
-        output_file = os.path.join(CLEAN_PROTEOMES_DIR, os.path.basename(file_name))
-        SeqIO.write(output_sequences, output_file, "fasta")
-        print(f"Successfully filtered {len(sequences)} sequences from {os.path.basename(file_name)} into {len(output_sequences)} sequences saved to {output_file}")
+    # Per-proteome statistics, reused from the manifest for proteomes that were skipped
+    stats_rows = [r["stats"] for r in results if r["stats"]]
+    if stats_rows:
+        stats_path = write_stats_table(stats_rows, PROTEOME_STATS_PATH)
+        print(f"📊 Proteome statistics saved to: {stats_path}")
 
     print("Filtering complete for all proteomes.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    filters = {
+        "max_ambiguous_fraction": args.max_ambiguous_fraction if args.max_ambiguous_fraction is not None and args.max_ambiguous_fraction >= 0 else None,
+        "max_internal_stops": args.max_internal_stops if args.max_internal_stops is not None and args.max_internal_stops >= 0 else None,
+        "min_entropy": args.min_entropy if args.min_entropy is not None and args.min_entropy >= 0 else None,
+    }
+    main(workers=args.workers, rebuild=args.rebuild, filters=filters)
\ No newline at end of file
@@ -0,0 +1,41 @@
+import sys
+import argparse
+import pandas as pd
+from config import (SELECTED_FILES_METADATA_PATH, ALL_FILES_METADATA_PATH, COMPRESSED_PROTEOMES_DIR,
+                    DOWNLOAD_LOG_PATH, DOWNLOAD_WORKERS, JGI_DOWNLOAD_URL)
+from utils.download_utils import download_table, download_files
+from utils.verify_utils import HashCache
+from local_data.credentials import JGI_API_TOKEN
+
+# Authentication headers
+headers = {
+    "Authorization": JGI_API_TOKEN
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download the selected proteome archives from JGI.")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS,
+                        help="Number of archives downloaded at the same time.")
+    parser.add_argument("--url", default=JGI_DOWNLOAD_URL,
+                        help="Download URL template with {file_id}, {_id} or {file_name} placeholders.")
+    return parser.parse_args()
+
+def main(workers=DOWNLOAD_WORKERS, url_template=JGI_DOWNLOAD_URL):
+    files = download_table(SELECTED_FILES_METADATA_PATH, ALL_FILES_METADATA_PATH)
+    hash_cache = HashCache()
+    log_data = download_files(files, COMPRESSED_PROTEOMES_DIR, headers, workers, url_template, hash_cache=hash_cache)
+    hash_cache.save()
+
+    log_df = pd.DataFrame(log_data, columns=["file_name", "status", "bytes", "md5sum"])
+    log_df.to_csv(DOWNLOAD_LOG_PATH, index=False)
+    print(f"📝 Download log saved to: {DOWNLOAD_LOG_PATH}")
+
+    counts = log_df["status"].value_counts()
+    print(f"📦 {counts.get('DOWNLOADED', 0)} downloaded, {counts.get('PRESENT', 0)} already present")
+    failed = log_df[~log_df["status"].isin(["DOWNLOADED", "PRESENT"])]
+    if not failed.empty:
+        sys.exit(f"❌ Could not download: {', '.join(failed['file_name'])}")
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(workers=args.workers, url_template=args.url)
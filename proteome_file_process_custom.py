@@ -1,97 +0,0 @@
-import os
-import pandas as pd
-from Bio import SeqIO
-import re
-from config import PROCESSED_PROTEOMES_PATH, RENAMED_PROTEOMES_DIR, PROTEOME_CUSTOMLOG_PATH
-
-# -----------------------------
-# Configuration
-# -----------------------------
-
-input_csv = PROCESSED_PROTEOMES_PATH
-output_dir = RENAMED_PROTEOMES_DIR
-os.makedirs(output_dir, exist_ok=True)
-
-# -----------------------------
-# Load data
-# -----------------------------
-df = pd.read_csv(input_csv)
-target_portals = {"Altbr1", "Pyrtr1"}
-df = df[df["portal"].isin(target_portals)]
-
-log_data = []
-
-# -----------------------------
-# Custom renaming logic
-# -----------------------------
-for _, row in df.iterrows():
-    portal = row["portal"]
-    input_path = row["renamed_file"]
-
-    if not os.path.isfile(input_path):
-        print(f"❌ File not found: {input_path}")
-        continue
-
-    output_path = os.path.join(output_dir, f"{portal}.fasta")
-    renamed_count = 0
-    total = 0
-    first_before = ""
-    first_after = ""
-
-    try:
-        records = list(SeqIO.parse(input_path, "fasta"))
-        total = len(records)
-
-        for i, record in enumerate(records):
-            original_id = record.id
-
-            if i == 0:
-                first_before = original_id
-
-            if portal == "Altbr1":
-                match = re.match(r"AB0*(\d+)\.\d+", original_id)
-                if match:
-                    new_id = f"Altbr1-{match.group(1)}"
-                    record.id = new_id
-                    record.description = new_id
-                    renamed_count += 1
-            elif portal == "Pyrtr1":
-                match = re.match(r"PTRG_0*(\d+)", original_id)
-                if match:
-                    new_id = f"Pyrtr1-{match.group(1)}"
-                    record.id = new_id
-                    record.description = new_id
-                    renamed_count += 1
-
-            if i == 0:
-                first_after = record.id
-
-        SeqIO.write(records, output_path, "fasta")
-        print(f"✅ {portal}: Renamed {renamed_count}/{total} → {output_path}")
-
-        log_data.append({
-            "portal": portal,
-            "file": os.path.basename(output_path),
-            "total_sequences": total,
-            "renamed_sequences": renamed_count,
-            "first_id_before": first_before,
-            "first_id_after": first_after
-        })
-
-    except Exception as e:
-        print(f"❌ Error processing {portal}: {e}")
-        log_data.append({
-            "portal": portal,
-            "file": os.path.basename(input_path),
-            "total_sequences": 0,
-            "renamed_sequences": 0,
-            "first_id_before": "ERROR",
-            "first_id_after": "ERROR"
-        })
-
-# -----------------------------
-# Save summary log
-# -----------------------------
-log_df = pd.DataFrame(log_data)
-log_df.to_csv(PROTEOME_CUSTOMLOG_PATH, index=False)
-print(f"📝 Custom renaming log saved: {PROTEOME_CUSTOMLOG_PATH}")
\ No newline at end of file
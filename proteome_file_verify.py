@@ -0,0 +1,42 @@
+import sys
+import argparse
+import pandas as pd
+from config import (SELECTED_FILES_METADATA_PATH, ALL_FILES_METADATA_PATH, PROTEOMES_DIR, COMPRESSED_PROTEOMES_DIR,
+                    VERIFY_REPORT_PATH, VERIFY_WORKERS)
+from utils.wrangle_utils import validate_directories
+from utils.build_utils import load_md5sums
+from utils.verify_utils import HashCache, verify_files, mismatched_files
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check the md5sum of the compressed proteomes against the JGI listing.")
+    parser.add_argument("--workers", type=int, default=VERIFY_WORKERS,
+                        help="Number of archives hashed at the same time.")
+    parser.add_argument("--rehash", action="store_true",
+                        help="Ignore the md5 cache and hash every archive again.")
+    return parser.parse_args()
+
+def main(workers=VERIFY_WORKERS, rehash=False):
+    validate_directories([PROTEOMES_DIR, COMPRESSED_PROTEOMES_DIR])
+    selected = pd.read_csv(SELECTED_FILES_METADATA_PATH)
+    files = pd.DataFrame({"file_name": selected["compressed_file"].dropna().astype(str).drop_duplicates()})
+    files["md5sum"] = files["file_name"].map(load_md5sums(ALL_FILES_METADATA_PATH))
+    # Archives whose size and mtime are unchanged since they were last hashed are not read again
+    cache = HashCache()
+    if rehash:
+        cache.entries = {}
+    report = verify_files(files, COMPRESSED_PROTEOMES_DIR, workers, cache)
+    cache.save()
+    report.to_csv(VERIFY_REPORT_PATH, index=False)
+    print(f"📝 Verification report saved to: {VERIFY_REPORT_PATH}")
+
+    counts = report["status"].value_counts()
+    print(f"🔐 {counts.get('OK', 0)} archives match their md5sum, {counts.get('UNLISTED', 0)} have none listed, "
+          f"{counts.get('MISSING', 0)} are missing")
+    mismatched = mismatched_files(report)
+    if mismatched:
+        sys.exit(f"❌ md5 mismatch: {', '.join(mismatched)} (delete them and run proteome_file_download.py)")
+    return report
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(workers=args.workers, rehash=args.rehash)
@@ -0,0 +1,38 @@
+import os
+import argparse
+from config import CLEAN_PROTEOMES_DIR, SHARDS_DIR, SHARD_COUNT
+from utils.wrangle_utils import validate_directories
+from utils.shard_utils import plan_shards, write_shards
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Split the clean proteomes into shards of balanced size.")
+    parser.add_argument("--shards", type=int, default=SHARD_COUNT,
+                        help="Number of shards.")
+    parser.add_argument("--chunk-residues", type=int,
+                        help="Also cut proteomes into chunks of about this many residues.")
+    return parser.parse_args()
+
+def main(shards=SHARD_COUNT, chunk_residues=None):
+    # Validate input directories
+    validate_directories([CLEAN_PROTEOMES_DIR])
+
+    proteome_files = sorted(
+        os.path.join(CLEAN_PROTEOMES_DIR, f)
+        for f in os.listdir(CLEAN_PROTEOMES_DIR)
+        if f.endswith(".fasta")
+    )
+    if not proteome_files:
+        raise FileNotFoundError(f"No FASTA files found in {CLEAN_PROTEOMES_DIR}.")
+
+    plan = plan_shards(proteome_files, shards, chunk_residues)
+    manifest = write_shards(plan, SHARDS_DIR, chunked=bool(chunk_residues))
+
+    loads = manifest.groupby("shard")["residues"].sum().reindex(range(shards), fill_value=0)
+    for shard, residues in loads.items():
+        print(f"📦 shard_{shard:03d}: {residues} residues")
+    print(f"⚖️ Heaviest shard is {loads.max() / loads.mean():.2f}x the mean")
+    print(f"📝 Shard manifest saved to: {os.path.join(SHARDS_DIR, 'manifest.csv')}")
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(shards=args.shards, chunk_residues=args.chunk_residues)
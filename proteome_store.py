@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+from config import CLEAN_PROTEOMES_DIR, PROTEOME_STORE_DIR
+from utils.wrangle_utils import validate_directories
+from utils.proteome_store import build_store, ProteomeStore
+
+def build(store_dir=PROTEOME_STORE_DIR, proteome_dir=CLEAN_PROTEOMES_DIR):
+    validate_directories([proteome_dir])
+    proteome_files = sorted(
+        os.path.join(proteome_dir, f) for f in os.listdir(proteome_dir) if f.endswith(".fasta")
+    )
+    if not proteome_files:
+        raise FileNotFoundError(f"No FASTA files found in {proteome_dir}.")
+    count = build_store(proteome_files, store_dir)
+    print(f"✅ Stored {count} sequences from {len(proteome_files)} proteomes in {store_dir}")
+
+def get(seq_ids, output=None, store_dir=PROTEOME_STORE_DIR):
+    with ProteomeStore(store_dir) as store:
+        if output:
+            with open(output, "wb") as fout:
+                missing = store.write_fasta(fout, seq_ids)
+        else:
+            missing = store.write_fasta(sys.stdout.buffer, seq_ids)
+    if missing:
+        print(f"⚠️ {len(missing)} IDs not found: {', '.join(missing[:10])}", file=sys.stderr)
+    if output:
+        print(f"✅ Wrote {len(seq_ids) - len(missing)} sequences to {output}", file=sys.stderr)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pack the clean proteomes into a store and extract sequences by ID.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="Build the store from the clean proteomes.")
+    get_parser = subparsers.add_parser("get", help="Write the sequences of the given IDs as FASTA.")
+    get_parser.add_argument("ids", nargs="*", help="Sequence IDs, e.g. Dicdi-GtpA.")
+    get_parser.add_argument("-i", "--id-file", help="File with one sequence ID per line.")
+    get_parser.add_argument("-o", "--output", help="Output FASTA file (default: standard output).")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "build":
+        build()
+        return
+    seq_ids = list(args.ids)
+    if args.id_file:
+        with open(args.id_file) as f:
+            seq_ids += [line.strip() for line in f if line.strip()]
+    get(seq_ids, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+import pandas as pd
+from config import TAXONOMY_LINEAGE_PATH
+from utils.taxonomy_tree import TaxonomyTree, RANKS
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Select the portals under some taxa, e.g. --order Pleosporales --genus Aspergillus.")
+    for rank in RANKS:
+        parser.add_argument(f"--{rank}", action="append", default=[],
+                            help=f"Keep the portals of this {rank} (repeatable).")
+    parser.add_argument("--portal", action="append", default=[],
+                        help="Also keep this portal (repeatable).")
+    parser.add_argument("--output", help="CSV to write the lineage of the selected portals to.")
+    parser.add_argument("--newick", help="Newick file to write the guide tree of the selection to.")
+    return parser.parse_args()
+
+def load_tree(lineage_path=TAXONOMY_LINEAGE_PATH):
+    """
+    Rebuild the taxonomy tree from the lineage table written by mycocosm_filelist_wrangle.py.
+    """
+    if not os.path.exists(lineage_path):
+        sys.exit(f"❌ {lineage_path} not found: run mycocosm_filelist_wrangle.py first")
+    lineages = pd.read_csv(lineage_path)
+    return TaxonomyTree.from_frame(lineages, tip_column="portal", rank_columns=RANKS), lineages
+
+def main(args):
+    tree, lineages = load_tree()
+    taxa = {rank: getattr(args, rank) for rank in RANKS if getattr(args, rank)}
+    for rank, names in taxa.items():
+        for name in names:
+            if not tree.find(rank, name):
+                print(f"⚠️ No {rank} named {name}")
+    unknown = [portal for portal in args.portal if portal not in tree.tip_index]
+    if unknown:
+        sys.exit(f"❌ Unknown portals: {', '.join(unknown)}")
+    selected = tree.select(**taxa)
+    chosen = set(selected)
+    selected += [portal for portal in dict.fromkeys(args.portal) if portal not in chosen]
+    if not selected:
+        sys.exit("❌ No portals selected.")
+
+    lca = tree.lca(selected)
+    print(f"🔎 {len(selected)} portals selected, lowest common taxon: {tree.name(lca) or 'root'} ({tree.rank(lca)})")
+    if args.output:
+        selection = lineages.set_index("portal").loc[selected].reset_index()
+        selection.to_csv(args.output, index=False)
+        print(f"📁 Lineages saved to: {args.output}")
+    else:
+        print(", ".join(selected))
+    if args.newick:
+        with open(args.newick, "w") as f:
+            f.write(tree.to_newick(selected) + "\n")
+        print(f"🌳 Guide tree saved to: {args.newick}")
+    return selected
+
+if __name__ == "__main__":
+    main(parse_args())
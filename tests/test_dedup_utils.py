@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from utils.dedup_utils import digest_table, collapse_map, deduplicate
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+def test_collapse_map_points_to_the_first_occurrence(tmp_path):
+    paths = [
+        _write(tmp_path, "A.fasta", b">A-1\nMKV\n>A-2\nMALW\n>A-3\nMKV\n"),
+        _write(tmp_path, "B.fasta", b">B-1\nMALW\n>B-2\nMQ\n>B-3\nMK\nV\n"),
+    ]
+    table = digest_table(paths)
+    assert table["file"].tolist() == [0, 0, 0, 1, 1, 1]
+    assert table["record"].tolist() == [0, 1, 2, 0, 1, 2]
+    # Line breaks do not matter: B-3 is the same sequence as A-1
+    assert collapse_map(table).tolist() == [0, 1, 0, 1, 4, 0]
+
+def test_deduplicate_writes_representatives_and_the_member_map(tmp_path):
+    a = b">A-1 x\nMKV\n>A-2\nMALW\n>A-3\nMKV\n"
+    b = b">B-1\nMALW\n>B-2 kept\nMQ\n>B-3\nMKV\n"
+    paths = [_write(tmp_path, "A.fasta", a), _write(tmp_path, "B.fasta", b)]
+    (tmp_path / "out").mkdir()
+    map_path = str(tmp_path / "map.tsv")
+
+    assert deduplicate(paths, str(tmp_path / "out"), map_path) == (6, 3)
+    assert (tmp_path / "out" / "A.fasta").read_bytes() == b">A-1 x\nMKV\n>A-2\nMALW\n"
+    assert (tmp_path / "out" / "B.fasta").read_bytes() == b">B-2 kept\nMQ\n"
+    collapsed = pd.read_csv(map_path, sep="\t")
+    assert list(map(tuple, collapsed.to_numpy().tolist())) == [("A-1", "A-3"), ("A-1", "B-3"), ("A-2", "B-1")]
+
+def test_empty_input():
+    assert len(collapse_map(digest_table([]))) == 0
+    assert collapse_map(np.empty(0, dtype=digest_table([]).dtype)).dtype == np.int64
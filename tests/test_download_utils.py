@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+import pytest
+from utils.download_utils import download_file, download_files, PARTIAL_SUFFIX
+from utils.web_utils import RateLimiter, create_session
+
+CONTENT = bytes(range(256)) * 4000  # About 1 MB, over one CHUNK_SIZE
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves CONTENT for any path, answering Range requests unless the server says otherwise.
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        self.server.ranges.append(requested)
+        start = int(requested.split("=")[1].split("-")[0]) if requested and self.server.honor_range else 0
+        if start >= len(CONTENT):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(CONTENT)}")
+            self.end_headers()
+            return
+        if requested and self.server.honor_range:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}")
+        else:
+            self.send_response(200)
+        body = CONTENT[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.ranges = []
+    server.honor_range = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _download(server, output_path, md5sum=hashlib.md5(CONTENT).hexdigest()):
+    with create_session({}, pool_size=1) as session:
+        return download_file(session, RateLimiter(), f"http://127.0.0.1:{server.server_port}/file.zip",
+                             str(output_path), md5sum)
+
+def _write_partial(output_path, data):
+    with open(f"{output_path}{PARTIAL_SUFFIX}", "wb") as f:
+        f.write(data)
+
+def test_resumes_a_partial_file_with_a_range_request(tmp_path, stub_server):
+    output_path = tmp_path / "file.zip"
+    _write_partial(output_path, CONTENT[:300000])
+    assert _download(stub_server, output_path) == hashlib.md5(CONTENT).hexdigest()
+    assert stub_server.ranges == ["bytes=300000-"]
+    assert output_path.read_bytes() == CONTENT
+    assert not os.path.exists(f"{output_path}{PARTIAL_SUFFIX}")
+
+def test_restarts_when_the_server_ignores_the_range(tmp_path, stub_server):
+    stub_server.honor_range = False
+    output_path = tmp_path / "file.zip"
+    _write_partial(output_path, CONTENT[:300000])
+    _download(stub_server, output_path)
+    assert stub_server.ranges == ["bytes=300000-"]
+    # The full 200 response replaced the partial file instead of being appended to it
+    assert output_path.read_bytes() == CONTENT
+
+def test_keeps_a_complete_partial_file_on_416(tmp_path, stub_server):
+    output_path = tmp_path / "file.zip"
+    _write_partial(output_path, CONTENT)
+    assert _download(stub_server, output_path) == hashlib.md5(CONTENT).hexdigest()
+    assert stub_server.ranges == [f"bytes={len(CONTENT)}-"]
+    assert output_path.read_bytes() == CONTENT
+
+def test_md5_mismatch_deletes_the_file(tmp_path, stub_server):
+    output_path = tmp_path / "file.zip"
+    with pytest.raises(ValueError, match="md5 mismatch"):
+        _download(stub_server, output_path, md5sum="0" * 32)
+    assert not os.path.exists(output_path)
+    assert not os.path.exists(f"{output_path}{PARTIAL_SUFFIX}")
+
+def test_md5_mismatch_marks_the_download_failed(tmp_path, stub_server):
+    files = pd.DataFrame({"file_name": ["file.zip"], "file_id": ["1"], "_id": [None], "md5sum": ["0" * 32]})
+    logs = download_files(files, str(tmp_path), {}, workers=1,
+                          url_template=f"http://127.0.0.1:{stub_server.server_port}/{{file_id}}/")
+    assert logs[0]["status"] == "ERROR"
+    assert not os.path.exists(tmp_path / "file.zip")
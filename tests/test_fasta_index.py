@@ -0,0 +1,72 @@
+import os
+import numpy as np
+import pytest
+from utils.fasta_utils import read_fasta, write_fasta
+from utils.fasta_index import (INDEX_DTYPE, IndexWriter, index_path, iter_index, iter_scan, load_index,
+                               scan_index, copy_records, RecordCopier)
+
+FASTA = (
+    b">Port1-1 first\nMKVLA\nWR\n"
+    b">Port1-2 empty\n"
+    b">Port1-3 spaced\nMA LW\nQQ\n"
+    + b">Port1-4 long\n" + b"A" * 60 + b"\n" + b"C" * 17 + b"\n"
+    + b">Port1-5 no final newline\nMKV"
+)
+
+@pytest.fixture
+def fasta_path(tmp_path):
+    path = tmp_path / "Port1.fasta"
+    path.write_bytes(FASTA)
+    return str(path)
+
+def test_scan_matches_the_parsed_records(fasta_path):
+    index = scan_index(fasta_path)
+    records = list(read_fasta(fasta_path))
+    assert index["length"].tolist() == [len(record) for record in records]
+    for row, record in zip(index, records):
+        assert FASTA[row["header_offset"] + 1:row["seq_offset"]].rstrip() == record.title
+    assert index["end"][-1] == len(FASTA)
+
+def test_block_scan_matches_a_whole_scan(fasta_path):
+    blocks = np.concatenate(list(iter_scan(fasta_path, block_bytes=5)))
+    assert blocks.tobytes() == scan_index(fasta_path).tobytes()
+
+def test_index_written_with_the_file_matches_a_fresh_scan(tmp_path, fasta_path):
+    output_path = str(tmp_path / "written.fasta")
+    with open(output_path, "wb") as f, IndexWriter(output_path) as writer:
+        write_fasta(f, read_fasta(fasta_path), index=writer)
+    sidecar = np.load(index_path(output_path))
+    assert sidecar.dtype == INDEX_DTYPE
+    assert sidecar.tobytes() == scan_index(output_path).tobytes()
+
+def test_stale_sidecar_is_rebuilt(fasta_path):
+    load_index(fasta_path)
+    with open(fasta_path, "ab") as f:
+        f.write(b"\n>Port1-6\nMQ\n")
+    # Push the FASTA past the sidecar even on coarse file system clocks
+    stat = os.stat(fasta_path)
+    os.utime(fasta_path, ns=(stat.st_atime_ns, os.stat(index_path(fasta_path)).st_mtime_ns + 10**9))
+    assert load_index(fasta_path).tobytes() == scan_index(fasta_path).tobytes()
+    assert np.concatenate(list(iter_index(fasta_path, batch_rows=2))).tobytes() == scan_index(fasta_path).tobytes()
+
+def test_copied_records_are_byte_identical(tmp_path, fasta_path):
+    index = load_index(fasta_path)
+    keep = index[[0, 2, 3]]
+    output_path = str(tmp_path / "copy.fasta")
+    copy_records(fasta_path, keep, output_path)
+    expected = b"".join(FASTA[row["header_offset"]:row["end"]] for row in keep)
+    with open(output_path, "rb") as f:
+        assert f.read() == expected
+    # The index written alongside describes the copy as a fresh scan would
+    assert np.load(index_path(output_path)).tobytes() == scan_index(output_path).tobytes()
+
+def test_record_copier_appends_batches(tmp_path, fasta_path):
+    index = load_index(fasta_path)
+    output_path = str(tmp_path / "batches.fasta")
+    with RecordCopier(fasta_path, output_path) as copier:
+        copier.copy(index[:2])
+        copier.copy(index[2:2])
+        copier.copy(index[3:])
+    with open(output_path, "rb") as f:
+        assert f.read() == FASTA[:index["end"][1]] + FASTA[index["header_offset"][3]:]
+    assert np.load(index_path(output_path)).tobytes() == scan_index(output_path).tobytes()
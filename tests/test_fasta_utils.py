@@ -0,0 +1,51 @@
+import io
+import pytest
+from Bio import SeqIO
+from utils.fasta_utils import read_fasta, write_fasta
+
+FASTA = (
+    b">jgi|Port1|1|gene1 first protein\n"
+    + b"MKV" * 30 + b"\n"  # One 90-residue line
+    + b">jgi|Port1|2|gene2 wrapped at 10\n"
+    + b"MALWMRLLPL\nLALLALWGPD\nPAAA\n"
+    + b">jgi|Port1|3|gene3 empty sequence\n"
+    + b">jgi|Port1|4|gene4 already at 60\n"
+    + b"A" * 60 + b"\n" + b"C" * 60 + b"\n" + b"D" * 7 + b"\n"
+    + b">jgi|Port1|5|gene5 header only, no final newline"
+)
+
+@pytest.fixture
+def fasta_path(tmp_path):
+    path = tmp_path / "Port1.fasta"
+    path.write_bytes(FASTA)
+    return str(path)
+
+def _biopython(path):
+    return [(record.description, str(record.seq)) for record in SeqIO.parse(path, "fasta")]
+
+@pytest.mark.parametrize("source", ["path", "mmap", "stream"])
+def test_read_fasta_matches_biopython(fasta_path, source):
+    if source == "stream":
+        # A tiny chunk size puts chunk boundaries inside headers and sequences
+        records = read_fasta(io.BytesIO(FASTA), chunk_size=7)
+    else:
+        records = read_fasta(fasta_path, use_mmap=source == "mmap")
+    parsed = [(record.title.decode(), record.sequence.decode()) for record in records]
+    assert parsed == _biopython(fasta_path)
+    assert parsed[2][1] == ""
+
+def test_record_id_is_the_first_word(fasta_path):
+    assert [record.id for record in read_fasta(fasta_path)] == [record.id.encode() for record in SeqIO.parse(fasta_path, "fasta")]
+
+def test_write_fasta_matches_biopython(fasta_path, tmp_path):
+    expected = tmp_path / "biopython.fasta"
+    SeqIO.write(SeqIO.parse(fasta_path, "fasta"), str(expected), "fasta")
+    handle = io.BytesIO()
+    assert write_fasta(handle, read_fasta(fasta_path)) == 5
+    assert handle.getvalue() == expected.read_bytes()
+
+def test_write_read_round_trip(fasta_path):
+    handle = io.BytesIO()
+    write_fasta(handle, read_fasta(fasta_path), width=0)
+    handle.seek(0)
+    assert [(r.title, r.sequence) for r in read_fasta(handle)] == [(r.title, r.sequence) for r in read_fasta(fasta_path)]
@@ -0,0 +1,63 @@
+import os
+import sys
+import pandas as pd
+import pytest
+from mycocosm_filelist_wrangle import (iter_files_metadata, scan_files_metadata, categorize_organisms,
+                                       check_organism_counts, NO_FILES)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks")))
+from wrangle_benchmark import make_metadata, legacy
+
+def _categorize(csv_path, chunk_rows, parquet_path=None):
+    all_organisms, missing_organisms, phylogeny_data = scan_files_metadata(
+        iter_files_metadata(chunk_rows, csv_path, parquet_path))
+    categories = categorize_organisms(phylogeny_data, missing_organisms)
+    check_organism_counts(categories, all_organisms)
+    return categories
+
+@pytest.fixture(scope="module")
+def metadata_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("wrangle") / "all_files_metadata.csv")
+    make_metadata(path, 4000, files_per_organism=10, seed=3)
+    return path
+
+@pytest.mark.parametrize("chunk_rows", [37, 1000, 100000])  # Organisms straddle chunk boundaries
+def test_matches_the_groupby_version(metadata_path, chunk_rows):
+    old = legacy(metadata_path)
+    new = _categorize(metadata_path, chunk_rows)
+    assert all(len(old[category]) for category in old)
+    for category in old:
+        assert new[category].to_csv(index=False) == old[category].to_csv(index=False), category
+
+def test_matches_the_groupby_version_from_parquet(metadata_path, tmp_path):
+    pytest.importorskip("pyarrow")
+    parquet_path = str(tmp_path / "all_files_metadata.parquet")
+    pd.read_csv(metadata_path).to_parquet(parquet_path)
+    old = legacy(metadata_path)
+    new = _categorize(metadata_path, 1000, parquet_path)
+    for category in old:
+        assert new[category].to_csv(index=False) == old[category].to_csv(index=False), category
+
+def test_categories(tmp_path):
+    rows = [
+        ("Single", "a.gz", 1, "Order1"),
+        ("Single", "b.gz", 1, "Order1"),
+        ("Double", "c.gz", 2, "Order1"),
+        ("Double", "d.gz", 2, "Order2"),
+        ("Incomplete", "e.gz", None, "Order1"),
+        ("Partial", "f.gz", None, "Order1"),
+        ("Partial", "g.gz", 3, "Order1"),
+        ("Missing", NO_FILES, None, None),
+    ]
+    df = pd.DataFrame(rows, columns=["organism", "file_name", "ncbi_taxon_id", "ncbi_taxon_order"])
+    for column in ("ncbi_taxon_class", "ncbi_taxon_family", "ncbi_taxon_genus", "ncbi_taxon_species"):
+        df[column] = None
+    csv_path = str(tmp_path / "metadata.csv")
+    df.to_csv(csv_path, index=False)
+    categories = _categorize(csv_path, 3)
+    assert {category: rows["organism"].tolist() for category, rows in categories.items()} == {
+        "missing": ["Missing"],
+        "incomplete": ["Incomplete"],
+        "single": ["Single", "Partial"],
+        "double": ["Double", "Double"],
+    }
@@ -0,0 +1,30 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+BENCHMARKS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+sys.path.insert(0, BENCHMARKS_DIR)
+from fasta_benchmark import make_proteomes
+from memory_benchmark import STAGES
+
+PROTEOME_MB = 96
+MAX_GROWTH_MB = 48  # Below the proteome size, so a stage holding the file in memory fails
+
+@pytest.fixture(scope="module")
+def work_dir(tmp_path_factory):
+    work_dir = tmp_path_factory.mktemp("memory")
+    make_proteomes(str(work_dir), PROTEOME_MB, files=1)
+    os.makedirs(work_dir / "renamed")
+    os.makedirs(work_dir / "clean")
+    return str(work_dir)
+
+@pytest.mark.parametrize("stage", STAGES)  # In order: each stage reads the output of the previous one
+def test_stage_runs_in_bounded_memory(stage, work_dir):
+    # A fresh interpreter per stage, so that its peak RSS is its own
+    command = [sys.executable, os.path.join(BENCHMARKS_DIR, "memory_benchmark.py"), "--child", stage, work_dir]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["count"] > 0
+    assert result["peak_rss_mb"] - result["baseline_mb"] < MAX_GROWTH_MB, result
@@ -0,0 +1,35 @@
+import csv
+from contextlib import closing
+import pandas as pd
+from utils.metadata_db import FileTableWriter, open_current, lookup_files
+from utils.web_utils import METADATA_FIELDS
+
+def _write_listing(tmp_path, rows):
+    csv_path, db_path = str(tmp_path / "all_files_metadata.csv"), str(tmp_path / "metadata.sqlite")
+    rows = [{field: row.get(field, "") for field in METADATA_FIELDS} for row in rows]
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=METADATA_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    db_writer = FileTableWriter(METADATA_FIELDS, db_path)
+    db_writer.write(rows)
+    db_writer.commit(csv_path)
+    return csv_path, db_path
+
+def test_lookup_files_keeps_nulls_missing(tmp_path):
+    csv_path, db_path = _write_listing(tmp_path, [
+        {"organism": "Org1", "file_name": "a.zip", "file_id": "f1", "md5sum": "0" * 32, "ncbi_taxon_id": 5},
+        {"organism": "Org2", "file_name": "b.zip"},
+    ])
+    with closing(open_current("files", csv_path, db_path)) as conn:
+        rows = lookup_files(conn, ["b.zip", "a.zip"], ["file_id", "md5sum", "ncbi_taxon_id"])
+    assert list(rows["file_name"]) == ["a.zip", "b.zip"]  # Listing order
+    assert rows.loc[0, "file_id"] == "f1" and rows.loc[0, "ncbi_taxon_id"] == "5"
+    # NULLs must stay missing rather than become the string "None"
+    for column in ("file_id", "md5sum", "ncbi_taxon_id"):
+        assert pd.isna(rows.loc[1, column]), column
+
+def test_lookup_files_of_unknown_names_is_empty(tmp_path):
+    csv_path, db_path = _write_listing(tmp_path, [{"organism": "Org1", "file_name": "a.zip"}])
+    with closing(open_current("files", csv_path, db_path)) as conn:
+        assert lookup_files(conn, ["z.zip"], ["md5sum"]).empty
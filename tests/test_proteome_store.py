@@ -0,0 +1,39 @@
+import io
+import pytest
+from utils.fasta_utils import read_fasta
+from utils.proteome_store import build_store, ProteomeStore
+
+@pytest.fixture
+def store_dir(tmp_path):
+    (tmp_path / "PortB.fasta").write_bytes(b">PortB-2 x\nMALW\nQQ\n>PortB-1\nMKV\n")
+    (tmp_path / "PortA.fasta").write_bytes(b">PortA-1\nMQ\n>PortB-1 duplicate\nWWWW\n>PortA-9\n")
+    store_dir = str(tmp_path / "store")
+    assert build_store([str(tmp_path / "PortB.fasta"), str(tmp_path / "PortA.fasta")], store_dir) == 4
+    return store_dir
+
+def test_lookup_present_and_absent_ids(store_dir):
+    with ProteomeStore(store_dir) as store:
+        # Absent IDs sort before, between and after the stored ones
+        found = store.lookup(["PortB-2", "AAA", b"PortA-1", "PortA-5", "PortB-1", "ZZZ", "PortA-9"])
+        assert [None if s is None else bytes(s) for s in found] == [
+            b"MALWQQ", None, b"MQ", None, b"MKV", None, b""]
+        assert store.get("PortB-1") == b"MKV"  # First occurrence of a duplicated ID
+        assert store.get("missing") is None
+        assert "PortA-1" in store and "PortA-2" not in store
+        assert len(store) == 4
+        del found
+
+def test_write_fasta_reports_missing_ids(store_dir):
+    handle = io.BytesIO()
+    with ProteomeStore(store_dir) as store:
+        assert store.write_fasta(handle, ["PortA-1", "nope", "PortB-2"]) == ["nope"]
+    handle.seek(0)
+    assert [(r.title, r.sequence) for r in read_fasta(handle)] == [(b"PortA-1", b"MQ"), (b"PortB-2", b"MALWQQ")]
+
+def test_empty_store(tmp_path):
+    (tmp_path / "empty.fasta").write_bytes(b"")
+    store_dir = str(tmp_path / "store")
+    build_store([str(tmp_path / "empty.fasta")], store_dir)
+    with ProteomeStore(store_dir) as store:
+        assert len(store) == 0
+        assert store.lookup(["PortA-1"]) == [None]
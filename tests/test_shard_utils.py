@@ -0,0 +1,16 @@
+from utils.fasta_index import load_index, copy_records
+from utils.shard_utils import plan_shards, write_shards
+
+def test_shards_do_not_change_when_the_clean_proteome_is_rewritten(tmp_path):
+    clean = tmp_path / "PortA.fasta"
+    clean.write_bytes(b">PortA-1\nMKV\n>PortA-2\nMALW\n>PortA-3\nMQ\n")
+    write_shards(plan_shards([str(clean)], 1), str(tmp_path / "shards"))
+    shard = tmp_path / "shards" / "shard_000" / "PortA.fasta"
+    before = shard.read_bytes()
+
+    # Cleanup rewrites its outputs in place, as RecordCopier does
+    source = tmp_path / "source.fasta"
+    source.write_bytes(clean.read_bytes())
+    copy_records(str(source), load_index(str(source))[:1], str(clean))
+    assert clean.read_bytes() == b">PortA-1\nMKV\n"
+    assert shard.read_bytes() == before
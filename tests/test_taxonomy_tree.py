@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from utils.taxonomy_tree import TaxonomyTree
+
+ROWS = [
+    # organism, class, order, family, genus, species
+    ("Altbr1", "Dothideomycetes", "Pleosporales", "Pleosporaceae", "Alternaria", "Alternaria brassicicola"),
+    ("Altal1", "Dothideomycetes", "Pleosporales", "Pleosporaceae", "Alternaria", "Alternaria alternata"),
+    ("Pyrtr1", "Dothideomycetes", "Pleosporales", "Pleosporaceae", "Pyrenophora", "Pyrenophora tritici-repentis"),
+    ("Lepma1", "Dothideomycetes", "Pleosporales", None, "Leptosphaeria", "Leptosphaeria maculans"),
+    ("Aspni1", "Eurotiomycetes", "Eurotiales", "Aspergillaceae", "Aspergillus", "Aspergillus niger"),
+    ("Aspni1", "Eurotiomycetes", "Eurotiales", "Trichocomaceae", "Aspergillus", "Aspergillus niger"),
+]
+
+@pytest.fixture
+def tree():
+    df = pd.DataFrame(ROWS, columns=["organism", "ncbi_taxon_class", "ncbi_taxon_order", "ncbi_taxon_family",
+                                     "ncbi_taxon_genus", "ncbi_taxon_species"])
+    return TaxonomyTree.from_frame(df)
+
+def test_tips_and_first_taxonomy_kept(tree):
+    assert sorted(tree.tip_labels) == ["Altal1", "Altbr1", "Aspni1", "Lepma1", "Pyrtr1"]
+    assert dict(tree.lineage(tree.tip_index["Aspni1"]))["family"] == "Aspergillaceae"
+    # A missing family hangs the genus straight from the order
+    assert [rank for rank, _ in tree.lineage(tree.tip_index["Lepma1"])] == ["class", "order", "genus", "species", "portal"]
+
+def _ancestors(tree, node):
+    ancestors = set()
+    while node > 0:
+        node = tree.parents[node]
+        ancestors.add(node)
+    return ancestors
+
+def test_tips_under_matches_the_parent_links(tree):
+    # Preorder numbering makes every subtree a contiguous slice of node IDs
+    for node in range(len(tree)):
+        expected = [tip for tip in tree.tip_labels if tree.tip_index[tip] == node
+                    or node in _ancestors(tree, tree.tip_index[tip])]
+        assert tree.tips_under(node) == expected
+
+def test_select(tree):
+    assert tree.select(genus="Alternaria") == ["Altal1", "Altbr1"]
+    # Nested taxa do not repeat portals
+    assert tree.select(order="Pleosporales", genus=["Alternaria"]) == ["Altal1", "Altbr1", "Pyrtr1", "Lepma1"]
+    assert tree.select(genus="Nope") == []
+    with pytest.raises(ValueError):
+        tree.select(kingdom="Fungi")
+
+def test_lca(tree):
+    assert (tree.rank(tree.lca(["Altal1", "Altbr1"])), tree.name(tree.lca(["Altal1", "Altbr1"]))) == ("genus", "Alternaria")
+    assert tree.name(tree.lca(["Altbr1", "Pyrtr1"])) == "Pleosporaceae"
+    assert tree.name(tree.lca(["Pyrtr1", "Lepma1"])) == "Pleosporales"
+    assert tree.lca(["Altbr1", "Aspni1"]) == 0
+    assert tree.lca(["Pyrtr1"]) == tree.tip_index["Pyrtr1"]
+
+def test_newick(tree):
+    assert tree.to_newick(internal_labels=False) == "((((Altal1,Altbr1),Pyrtr1),Lepma1),Aspni1);"
+    # Unary nodes (the classes, Eurotiales ... Aspergillus niger) are collapsed into their child
+    assert tree.to_newick() == "((((Altal1,Altbr1)Alternaria,Pyrtr1)Pleosporaceae,Lepma1)Pleosporales,Aspni1);"
+    assert tree.to_newick(["Altbr1", "Pyrtr1"]) == "(Altbr1,Pyrtr1)Pleosporaceae;"
+    assert tree.to_newick(["Altbr1"]) == "Altbr1;"
+
+def test_newick_quotes_labels():
+    df = pd.DataFrame([("Org 1", "C", "O", "F", "G", "S p"), ("Org'2", "C", "O", "F", "G", "S q")],
+                      columns=["organism", "ncbi_taxon_class", "ncbi_taxon_order", "ncbi_taxon_family",
+                               "ncbi_taxon_genus", "ncbi_taxon_species"])
+    assert TaxonomyTree.from_frame(df).to_newick() == "('Org 1','Org''2')G;"
+
+def test_lineage_table(tree):
+    table = tree.lineage_table().set_index("portal")
+    assert pd.isna(table.loc["Lepma1", "family"])
+    assert table.loc["Altbr1", "lineage"] == ("Dothideomycetes; Pleosporales; Pleosporaceae; Alternaria; "
+                                              "Alternaria brassicicola")
@@ -0,0 +1,89 @@
+import pytest
+from utils import web_utils, page_store
+from utils.cache_utils import FetchManifest
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+class FakeListing:
+    """
+    Session serving a listing sorted ascending in pages of FILES_PER_PAGE files.
+    """
+    def __init__(self, n_files, announce_total):
+        self.files = [{"file_name": f"f{i:04d}"} for i in range(n_files)]
+        self.announce_total = announce_total
+        self.extra_total = 0  # Files counted by the API but not on any page yet
+        self.pages = []
+        self.closed = False
+
+    def get(self, url, params):
+        page, size = params["p"], params["x"]
+        self.pages.append(page)
+        organism = {"files": self.files[(page - 1) * size:page * size]}
+        if self.announce_total:
+            organism["file_total"] = len(self.files) + self.extra_total
+        return FakeResponse({"organisms": [organism]})
+
+    def close(self):
+        self.closed = True
+
+def _limiter():
+    return web_utils.RateLimiter(rate=1000, burst=1000)
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_utils, "JSON_DIR", str(tmp_path))
+    monkeypatch.setattr(page_store, "JSON_DIR", str(tmp_path))
+    return FetchManifest(str(tmp_path / "manifest.jsonl"))
+
+def _fetch(listing, manifest, revalidate):
+    listing.pages.clear()
+    assert web_utils.fetch_all_files("Org1", {}, session=listing, limiter=_limiter(),
+                                     manifest=manifest, revalidate=revalidate)
+    return list(listing.pages)
+
+@pytest.mark.parametrize("announce_total", [True, False])
+def test_revalidation_keeps_an_unchanged_listing(manifest, announce_total):
+    listing = FakeListing(120, announce_total)
+    _fetch(listing, manifest, False)
+    # Page 1, the last cached page and the empty page after it
+    assert _fetch(listing, manifest, True) == [1, 3, 4]
+
+@pytest.mark.parametrize("announce_total", [True, False])
+@pytest.mark.parametrize("change", ["insert", "delete"])
+def test_revalidation_refetches_after_a_change_on_a_middle_page(manifest, announce_total, change):
+    listing = FakeListing(120, announce_total)
+    _fetch(listing, manifest, False)
+    if change == "insert":
+        listing.files.insert(70, {"file_name": "f0069b"})
+    else:
+        del listing.files[70]
+    pages = _fetch(listing, manifest, True)
+    assert 2 in pages
+    cached = [page for page in page_store.iter_pages("Org1", manifest.get("Org1"))]
+    assert [f for page in cached for f in web_utils._page_files(page)] == listing.files
+
+def test_revalidation_refetches_when_the_file_total_changes(manifest):
+    listing = FakeListing(120, True)
+    _fetch(listing, manifest, False)
+    # Same pages, same page count, one more file announced
+    listing.extra_total = 1
+    assert {2, 3} <= set(_fetch(listing, manifest, True))
+
+def test_fetch_closes_the_session_it_creates(manifest, monkeypatch):
+    listing = FakeListing(10, True)
+    monkeypatch.setattr(web_utils, "create_session", lambda header, pool_size: listing)
+    web_utils.fetch_all_files("Org1", {}, limiter=_limiter(), manifest=manifest)
+    assert listing.closed
+
+def test_fetch_leaves_a_shared_session_open(manifest):
+    listing = FakeListing(10, True)
+    _fetch(listing, manifest, False)
+    assert not listing.closed
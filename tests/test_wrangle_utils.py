@@ -0,0 +1,76 @@
+import gzip
+import zipfile
+import pandas as pd
+import pytest
+from utils import wrangle_utils
+from utils.build_utils import BuildManifest
+
+@pytest.fixture
+def shared_archive(tmp_path):
+    """
+    Two portals whose proteomes come in the same zip archive.
+    """
+    compressed_dir = tmp_path / "compressed"
+    compressed_dir.mkdir()
+    with zipfile.ZipFile(compressed_dir / "bundle.zip", "w") as archive:
+        archive.writestr("PortA/PortA.fasta", ">jgi|PortA|1|x\nMKV\n")
+        archive.writestr("PortB/PortB.fasta", ">jgi|PortB|2|y\nMAL\n")
+    proteome_data = pd.DataFrame({"compressed_file": ["bundle.zip", "bundle.zip"], "portal": ["PortA", "PortB"]})
+    return proteome_data, str(compressed_dir)
+
+def _fail_if_called(*args):
+    raise AssertionError(f"rebuilt an up-to-date proteome: {args}")
+
+def test_process_proteomes_skips_portals_of_a_shared_archive(tmp_path, shared_archive, monkeypatch):
+    proteome_data, compressed_dir = shared_archive
+    renamed_dir = tmp_path / "renamed"
+    renamed_dir.mkdir()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = BuildManifest(manifest_path)
+    first, _ = wrangle_utils.process_proteomes(proteome_data, compressed_dir, str(renamed_dir), manifest=manifest)
+    manifest.save()
+    assert [p.rsplit("/", 1)[-1] for p in first] == ["PortA.fasta", "PortB.fasta"]
+
+    # Both portals have their own entry, so neither is rebuilt on the next run
+    monkeypatch.setattr(wrangle_utils, "process_proteome", _fail_if_called)
+    second, _ = wrangle_utils.process_proteomes(proteome_data, compressed_dir, str(renamed_dir),
+                                                manifest=BuildManifest(manifest_path))
+    assert second == first
+
+def test_extract_files_skips_portals_of_a_shared_archive(tmp_path, shared_archive, monkeypatch):
+    proteome_data, compressed_dir = shared_archive
+    extracted_dir = tmp_path / "extracted"
+    extracted_dir.mkdir()
+    manifest_path = str(tmp_path / "manifest.json")
+
+    manifest = BuildManifest(manifest_path)
+    first = wrangle_utils.extract_files(proteome_data, compressed_dir, str(extracted_dir), manifest=manifest)
+    manifest.save()
+    assert [p.rsplit("/", 1)[-1] for p in first] == ["bundle_PortA.fasta", "bundle_PortB.fasta"]
+
+    monkeypatch.setattr(wrangle_utils, "extract_file", _fail_if_called)
+    second = wrangle_utils.extract_files(proteome_data, compressed_dir, str(extracted_dir),
+                                         manifest=BuildManifest(manifest_path))
+    assert second == first
+
+def test_fused_and_two_step_modes_log_the_same_rows(tmp_path, shared_archive):
+    proteome_data, compressed_dir = shared_archive
+    with gzip.open(f"{compressed_dir}/PortC.fasta.gz", "wb") as f:
+        f.write(b">jgi|PortC|3|z\nMQ\n")
+    proteome_data = pd.concat([proteome_data, pd.DataFrame({
+        "compressed_file": ["PortC.fasta.gz", "gone.fasta.gz", None],
+        "portal": ["PortC", "PortD", "PortE"],
+    })], ignore_index=True)
+    for name in ("extracted", "renamed", "fused"):
+        (tmp_path / name).mkdir()
+
+    proteome_data["extracted_file"] = wrangle_utils.extract_files(proteome_data, compressed_dir, str(tmp_path / "extracted"))
+    two_step_paths, two_step_log = wrangle_utils.rename_fasta_headers(proteome_data, str(tmp_path / "renamed"))
+    fused_paths, fused_log = wrangle_utils.process_proteomes(proteome_data, compressed_dir, str(tmp_path / "fused"))
+
+    assert fused_log == two_step_log
+    assert [bool(path) for path in fused_paths] == [True, True, True, False, False]
+    for two_step_path, fused_path in zip(two_step_paths, fused_paths):
+        if fused_path:
+            assert open(fused_path, "rb").read() == open(two_step_path, "rb").read()
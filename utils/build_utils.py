@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from contextlib import closing
+from config import BUILD_MANIFEST_PATH
+from utils.metadata_db import open_current, file_md5sums
+
+def file_fingerprint(path):
+    """
+    Cheap change detector for a local file: its size and modification time.
+
+    Returns:
+        str or None: Fingerprint, or None if the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def build_key(*parts):
+    """
+    Hash stage inputs and parameters into a build key; None if any input is unknown.
+    """
+    if any(part is None for part in parts):
+        return None
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_md5sums(metadata_path):
+    """
+    Map file names to the md5sum reported by the JGI listing.
+
+    Args:
+        metadata_path (str): CSV written by parse_and_export (read from the metadata database when current).
+
+    Returns:
+        dict: file_name -> md5sum (empty if the metadata is not available).
+    """
+    if not os.path.exists(metadata_path):
+        return {}
+    conn = open_current("files", metadata_path)
+    if conn is not None:
+        with closing(conn):
+            return file_md5sums(conn)
+    metadata = pd.read_csv(metadata_path, usecols=["file_name", "md5sum"]).dropna()
+    return dict(zip(metadata["file_name"], metadata["md5sum"]))
+
+def input_keys(proteome_data, compressed_dir, md5sums=None):
+    """
+    Content key of each compressed proteome: its listing md5sum, or its size and mtime.
+
+    The md5sum makes the key survive copies and touches of an unchanged file;
+    files without one fall back to file_fingerprint.
+
+    Args:
+        proteome_data (pd.DataFrame): DataFrame with a compressed_file column (and optionally md5sum).
+        compressed_dir (str): Directory containing compressed files.
+        md5sums (dict, optional): file_name -> md5sum from the listing metadata.
+
+    Returns:
+        list: One key per row, None where the input file is missing.
+    """
+    md5sums = md5sums or {}
+    keys = []
+    for _, row in proteome_data.iterrows():
+        name = row["compressed_file"]
+        if pd.isna(name):
+            keys.append(None)
+            continue
+        path = os.path.join(compressed_dir, name)
+        md5 = row.get("md5sum")
+        md5 = md5 if isinstance(md5, str) and md5 else md5sums.get(name)
+        if md5 and os.path.exists(path):
+            # The size guards against reusing outputs built from a truncated download
+            keys.append(f"md5:{md5}:{os.path.getsize(path)}")
+        else:
+            keys.append(file_fingerprint(path))
+    return keys
+
+class BuildManifest:
+    """
+    Record, per stage and item, the key each output was built from.
+
+    A key hashes the item's input content together with the stage parameters;
+    a stage skips an item whose key is unchanged and whose outputs still exist.
+    Downstream keys are built from the upstream outputs, so a rebuilt item
+    invalidates what was derived from it.
+
+    Args:
+        path (str): Location of the JSON manifest.
+    """
+    def __init__(self, path=BUILD_MANIFEST_PATH):
+        self.path = path
+        self.stages = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.stages = json.load(f)
+
+    def lookup(self, stage, name, key):
+        """
+        Return the recorded result of an item if it is up to date.
+
+        Args:
+            stage (str): Stage name.
+            name (str): Item identity within the stage.
+            key (str or None): Current build key of the item.
+
+        Returns:
+            Recorded result, or None if the item must be rebuilt.
+        """
+        entry = self.stages.get(stage, {}).get(name)
+        if key is None or entry is None or entry["key"] != key:
+            return None
+        return entry["result"]
+
+    def record(self, stage, name, key, result):
+        """
+        Store the key and result of an item that has just been built.
+        """
+        if key is not None:
+            self.stages.setdefault(stage, {})[name] = {"key": key, "result": result}
+
+    def invalidate(self, stage, name=None):
+        """
+        Forget one item of a stage, or the whole stage.
+        """
+        if name is None:
+            self.stages.pop(stage, None)
+        else:
+            self.stages.get(stage, {}).pop(name, None)
+
+    def save(self):
+        """
+        Write the manifest atomically.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.stages, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import threading
+from config import FETCH_MANIFEST_PATH
+
+PAGE_FILE_PATTERN = re.compile(r"^all_files_(.+)_page_(\d+)\.json$")
+
+class FetchManifest:
+    """
+    Append-only journal of the listing pages cached in JSON_DIR.
+
+    Every saved page and every finished organism appends one line, so a crashed
+    run loses at most the page being written. Replaying the journal gives, per
+    organism: pages fetched, completion flag, fetch timestamp, listing hash,
+    storage format and, for the "ndjson" format, the byte offset of every page.
+
+    Args:
+        path (str): Location of the journal file.
+    """
+    def __init__(self, path=FETCH_MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            torn = False
+            with open(path) as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        torn = True  # Last line cut short by an interrupted run
+                        break
+            if torn:
+                self.compact()
+        elif os.path.isdir(os.path.dirname(path)):
+            self._bootstrap()
+
+    def _apply(self, event):
+        organism_id = event["organism"]
+        if event["event"] == "state":
+            self.entries[organism_id] = event["entry"]
+            return
+        entry = self.entries.setdefault(organism_id, {
+            "pages": 0, "complete": False, "fetched_at": None, "listing_hash": None,
+            "format": "json", "offsets": [], "store_size": 0
+        })
+        if event["event"] == "page":
+            if event["page"] == 1 or "format" in event:
+                entry["format"] = event.get("format", "json")
+                entry["offsets"] = []
+                entry["store_size"] = 0
+            entry["pages"] = event["page"]
+            entry["complete"] = False
+            if event.get("listing_hash"):
+                entry["listing_hash"] = event["listing_hash"]
+            if event.get("offset") is not None:
+                entry["offsets"].append(event["offset"])
+                entry["store_size"] = event["end"]
+        elif event["event"] == "complete":
+            entry["pages"] = event["pages"]
+            entry["complete"] = True
+        entry["fetched_at"] = event["time"]
+
+    def _append(self, event):
+        event["time"] = time.time()
+        with self.lock:
+            self._apply(event)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(event) + "\n")
+
+    def _bootstrap(self):
+        """
+        Index page files written before the manifest existed with a single directory scan.
+
+        Organisms are recorded as incomplete, so the next fetch probes the page after
+        the last contiguous one instead of trusting a possibly truncated listing.
+        """
+        pages = {}
+        for file_name in os.listdir(os.path.dirname(self.path)):
+            match = PAGE_FILE_PATTERN.match(file_name)
+            if match:
+                pages.setdefault(match.group(1), set()).add(int(match.group(2)))
+        for organism_id, saved in pages.items():
+            contiguous = 0
+            while contiguous + 1 in saved:
+                contiguous += 1
+            if contiguous:
+                self._append({"event": "page", "organism": organism_id, "page": contiguous, "format": "json"})
+        if pages:
+            print(f"🗂️ Indexed cached pages of {len(pages)} organisms into {self.path}")
+
+    def get(self, organism_id):
+        """
+        Return the manifest entry of an organism, or None if nothing is cached.
+        """
+        return self.entries.get(organism_id)
+
+    def record_page(self, organism_id, page, listing_hash=None, fmt=None, offset=None, end=None):
+        """
+        Record that a page has been saved for an organism.
+
+        Args:
+            organism_id (str): Organism the page belongs to.
+            page (int): Page number just written to disk.
+            listing_hash (str, optional): Fingerprint of the listing, given with page 1.
+            fmt (str, optional): Storage format of the listing, given with page 1.
+            offset (int, optional): Start of the page in the organism's NDJSON store.
+            end (int, optional): End of the page in the organism's NDJSON store.
+        """
+        event = {"event": "page", "organism": organism_id, "page": page, "listing_hash": listing_hash}
+        if fmt is not None:
+            event["format"] = fmt
+        if offset is not None:
+            event["offset"] = offset
+            event["end"] = end
+        self._append(event)
+
+    def mark_complete(self, organism_id, pages):
+        """
+        Record that the listing of an organism has been fetched up to its last page.
+        """
+        self._append({"event": "complete", "organism": organism_id, "pages": pages})
+
+    def is_stale(self, organism_id, ttl_days):
+        """
+        Check whether a complete listing is older than the revalidation TTL.
+
+        Args:
+            organism_id (str): Organism to check.
+            ttl_days (float or None): Maximum age in days, None to never revalidate.
+
+        Returns:
+            bool: True if the listing should be revalidated against the API.
+        """
+        entry = self.get(organism_id)
+        if ttl_days is None or entry is None or entry["fetched_at"] is None:
+            return False
+        return time.time() - entry["fetched_at"] > ttl_days * 86400
+
+    def compact(self):
+        """
+        Rewrite the journal with only the current state of each organism.
+        """
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                for organism_id, entry in self.entries.items():
+                    f.write(json.dumps({"event": "state", "organism": organism_id, "entry": entry}) + "\n")
+            os.replace(tmp_path, self.path)
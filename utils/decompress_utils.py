@@ -0,0 +1,131 @@
+import gzip
+import shutil
+import signal
+import subprocess
+import tempfile
+from functools import lru_cache
+from contextlib import contextmanager
+from config import DECOMPRESSION_BACKEND
+
+# Optional in-process backends, much faster than zlib on large files
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+try:
+    from zlib_ng import gzip_ng
+except ImportError:
+    gzip_ng = None
+
+BACKENDS = ["isal", "zlib-ng", "pigz", "igzip", "gzip"]  # In order of preference
+PIPE_BACKENDS = ["pigz", "igzip"]  # Command-line tools, run as a subprocess
+
+def available_backends():
+    """
+    List the gzip decompression backends usable here, in order of preference.
+
+    Returns:
+        list: Backend names; "gzip" (the standard library) is always available.
+    """
+    available = []
+    if igzip is not None:
+        available.append("isal")
+    if gzip_ng is not None:
+        available.append("zlib-ng")
+    available += [tool for tool in PIPE_BACKENDS if shutil.which(tool)]
+    available.append("gzip")
+    return available
+
+def resolve_backend(backend=None):
+    """
+    Pick the backend to use: the requested one if available, the fastest one for "auto".
+
+    Args:
+        backend (str, optional): Backend name or "auto"; defaults to DECOMPRESSION_BACKEND.
+
+    Returns:
+        str: Name of an available backend, falling back to "gzip".
+    """
+    return _resolve(backend or DECOMPRESSION_BACKEND)
+
+@lru_cache(maxsize=None)
+def _resolve(backend):
+    available = available_backends()
+    if backend == "auto":
+        return available[0]
+    if backend not in available:
+        print(f"⚠️ Decompression backend {backend} is not available, using gzip.")
+        return "gzip"
+    return backend
+
+@contextmanager
+def _pipe(tool, path):
+    """
+    Stream the output of `tool -d -c path` and check that the tool succeeded.
+
+    The tool's messages go to a temporary file rather than a second pipe, which
+    it could fill and block on while the reader is still waiting for output.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen([shutil.which(tool), "-d", "-c", path],
+                                   stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            yield process.stdout
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        # A reader that stops early closes the pipe, which the tool sees as SIGPIPE
+        if returncode and returncode != -signal.SIGPIPE:
+            stderr.seek(0)
+            error = stderr.read().decode(errors="replace").strip()
+            raise OSError(f"{tool} exited with status {returncode}: {error}")
+
+def open_gzip(path, backend=None):
+    """
+    Open a gzip file for binary reading with the fastest available backend.
+
+    The in-process backends (isal, zlib-ng, gzip) release the GIL while
+    inflating, so several files can be decompressed from threads at once; the
+    pigz and igzip tools run in their own process.
+
+    Args:
+        path (str): Path to the .gz file.
+        backend (str, optional): Backend name or "auto"; defaults to DECOMPRESSION_BACKEND.
+
+    Returns:
+        Context manager yielding a binary handle on the decompressed content.
+    """
+    backend = resolve_backend(backend)
+    if backend in PIPE_BACKENDS:
+        return _pipe(backend, path)
+    if backend == "isal":
+        return igzip.open(path, "rb")
+    if backend == "zlib-ng":
+        return gzip_ng.open(path, "rb")
+    return gzip.open(path, "rb")
+
+def open_gzip_stream(fileobj, backend=None):
+    """
+    Decompress a gzip stream, e.g. a gzipped member of a zip archive.
+
+    Streams cannot be handed to a subprocess, so the pipe backends fall back
+    to the fastest in-process one.
+
+    Args:
+        fileobj (file): Binary handle on the compressed data.
+        backend (str, optional): Backend name or "auto"; defaults to DECOMPRESSION_BACKEND.
+
+    Returns:
+        file: Binary handle on the decompressed content.
+    """
+    backend = resolve_backend(backend)
+    if backend in PIPE_BACKENDS:
+        backend = next(name for name in available_backends() if name not in PIPE_BACKENDS)
+    if backend == "isal":
+        return igzip.GzipFile(fileobj=fileobj, mode="rb")
+    if backend == "zlib-ng":
+        return gzip_ng.GzipFile(fileobj=fileobj, mode="rb")
+    return gzip.GzipFile(fileobj=fileobj, mode="rb")
@@ -0,0 +1,134 @@
+import os
+import mmap
+import hashlib
+import numpy as np
+from utils.fasta_utils import read_fasta, record_id
+from utils.fasta_index import load_index, copy_records
+
+DIGEST_SIZE = 16  # Bytes of blake2b digest kept per sequence
+
+# One row per sequence: its digest split in two integers, its length, and where it comes from
+DIGEST_DTYPE = np.dtype([
+    ("hi", "<u8"),
+    ("lo", "<u8"),
+    ("length", "<i8"),
+    ("file", "<i4"),
+    ("record", "<i4"),
+])
+
+def digest_table(fasta_paths):
+    """
+    Hash every sequence of the given files into a compact digest table.
+
+    Records are streamed one at a time; only the fixed-size row of each
+    sequence is kept, never the sequence or its ID.
+
+    Args:
+        fasta_paths (list): FASTA files, in the order that decides representatives.
+
+    Returns:
+        np.ndarray: One DIGEST_DTYPE row per sequence, in file and record order.
+    """
+    chunks = []
+    for file_number, path in enumerate(fasta_paths):
+        rows = bytearray()
+        lengths = []
+        for record in read_fasta(path):
+            sequence = record.sequence
+            rows += hashlib.blake2b(sequence, digest_size=DIGEST_SIZE).digest()
+            lengths.append(len(sequence))
+        digests = np.frombuffer(bytes(rows), dtype=">u8").reshape(-1, 2)
+        table = np.empty(len(lengths), dtype=DIGEST_DTYPE)
+        table["hi"] = digests[:, 0]
+        table["lo"] = digests[:, 1]
+        table["length"] = lengths
+        table["file"] = file_number
+        table["record"] = np.arange(len(lengths))
+        chunks.append(table)
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=DIGEST_DTYPE)
+
+def collapse_map(table):
+    """
+    Assign every sequence to the representative of its identical-sequence group.
+
+    The representative is the first occurrence in file and record order.
+
+    Args:
+        table (np.ndarray): Digest table from digest_table.
+
+    Returns:
+        np.ndarray: For each row of the table, the row of its representative.
+    """
+    if not len(table):
+        return np.empty(0, dtype=np.int64)
+    # Ties are broken by row, i.e. file and record order, so each group starts with its first occurrence;
+    # the length rides along as a guard against digest collisions
+    order = np.lexsort((np.arange(len(table)), table["length"], table["lo"], table["hi"]))
+    ordered = table[order]
+    new_group = np.ones(len(table), dtype=bool)
+    new_group[1:] = (
+        (ordered["hi"][1:] != ordered["hi"][:-1])
+        | (ordered["lo"][1:] != ordered["lo"][:-1])
+        | (ordered["length"][1:] != ordered["length"][:-1])
+    )
+    group_first = order[np.flatnonzero(new_group)]
+    representative = np.empty(len(table), dtype=np.int64)
+    representative[order] = group_first[np.cumsum(new_group) - 1]
+    return representative
+
+def _record_ids(fasta_path, index, records):
+    """
+    Read the IDs of the given records from their header lines.
+    """
+    if not len(records):
+        return []
+    with open(fasta_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return [
+            record_id(data[start + 1:end]).decode()
+            for start, end in zip(index["header_offset"][records].tolist(), index["seq_offset"][records].tolist())
+        ]
+
+def deduplicate(fasta_paths, output_dir, map_path):
+    """
+    Write the proteomes without repeated sequences and a representative to member map.
+
+    Each output proteome keeps only the sequences whose representative is
+    itself, copied byte for byte. The map is a TSV with one row per collapsed
+    sequence: the ID of the representative and the ID of the member.
+
+    Args:
+        fasta_paths (list): Clean FASTA files, in the order that decides representatives.
+        output_dir (str): Directory to write the reduced proteomes to.
+        map_path (str): TSV file to write the collapse map to.
+
+    Returns:
+        tuple: Number of sequences read and kept.
+    """
+    table = digest_table(fasta_paths)
+    representative = collapse_map(table)
+    kept = representative == np.arange(len(table))
+    duplicated = ~kept
+    duplicated[representative[~kept]] = True
+
+    ids = {}
+    bounds = np.searchsorted(table["file"], np.arange(len(fasta_paths) + 1))
+    for file_number, path in enumerate(fasta_paths):
+        start, end = bounds[file_number], bounds[file_number + 1]
+        index = load_index(path)
+        if len(index) != end - start:
+            raise ValueError(f"index of {path} lists {len(index)} records, {end - start} were read")
+        file_kept = kept[start:end]
+        output_path = os.path.join(output_dir, os.path.basename(path))
+        copy_records(path, index[file_kept], output_path)
+        print(f"✅ {os.path.basename(path)}: kept {int(file_kept.sum())}/{len(file_kept)} sequences")
+        # Only sequences that take part in a collapse need their IDs for the map
+        needed = np.flatnonzero(duplicated[start:end])
+        ids.update(zip((needed + start).tolist(), _record_ids(path, index, needed)))
+
+    members = np.flatnonzero(~kept)
+    members = members[np.argsort(representative[members], kind="stable")]
+    with open(map_path, "w") as f:
+        f.write("representative\tmember\n")
+        for member in members.tolist():
+            f.write(f"{ids[int(representative[member])]}\t{ids[member]}\n")
+    return len(table), int(kept.sum())
@@ -0,0 +1,168 @@
+import os
+import re
+import hashlib
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from config import JGI_DOWNLOAD_URL, DOWNLOAD_WORKERS, DOWNLOAD_RETRIES
+from utils.web_utils import RateLimiter, create_session
+from utils.metadata_db import open_current, lookup_files
+
+CHUNK_SIZE = 1 << 20  # Bytes written and hashed at a time
+PARTIAL_SUFFIX = ".part"
+CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+def download_table(selected_path, metadata_path):
+    """
+    Join the selected proteomes with the file ID and md5sum of their archive in the listing.
+
+    Args:
+        selected_path (str): CSV of the selected proteomes, with a compressed_file column.
+        metadata_path (str): CSV written by parse_and_export (read from the metadata database when current).
+
+    Returns:
+        pd.DataFrame: One row per selected archive with file_name, file_id, _id and md5sum
+            (missing where the listing does not know the file).
+    """
+    selected = pd.read_csv(selected_path)
+    files = selected["compressed_file"].dropna().astype(str).drop_duplicates()
+    conn = open_current("files", metadata_path)
+    if conn is not None:
+        # Indexed lookup of the selected files instead of parsing the whole listing
+        with closing(conn):
+            metadata = lookup_files(conn, files, ["file_id", "_id", "md5sum"])
+    else:
+        metadata = pd.read_csv(metadata_path, usecols=["file_name", "file_id", "_id", "md5sum"], dtype=str)
+    metadata = metadata.dropna(subset=["file_name"]).drop_duplicates("file_name")
+    return pd.DataFrame({"file_name": files}).merge(metadata, on="file_name", how="left")
+
+def _hash_partial(path, md5):
+    """
+    Feed the bytes already downloaded to a partial file into md5 and return their number.
+    """
+    size = 0
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                md5.update(chunk)
+                size += len(chunk)
+    return size
+
+def download_file(session, limiter, url, output_path, md5sum=None):
+    """
+    Download one file, resuming a partial download and checking its md5sum on the fly.
+
+    Data goes to output_path + ".part" and is hashed as it is written, so the
+    finished file is never read back; a partial file left by an interrupted run
+    is hashed once and continued with an HTTP Range request. The file is moved
+    into place only when complete and, if md5sum is given, matching.
+
+    Args:
+        session (requests.Session): Pooled session.
+        limiter (RateLimiter): Token bucket shared between workers.
+        url (str): URL of the file.
+        output_path (str): Where to save the file.
+        md5sum (str, optional): Expected md5 hex digest.
+
+    Returns:
+        str: md5 hex digest of the downloaded file.
+    """
+    part_path = output_path + PARTIAL_SUFFIX
+    md5 = hashlib.md5()
+    offset = _hash_partial(part_path, md5)
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    limiter.acquire()
+    with session.get(url, headers=headers, stream=True, timeout=60) as response:
+        if offset and response.status_code == 416:
+            # Nothing left past the partial file: it already holds the whole content
+            pass
+        else:
+            response.raise_for_status()
+            match = CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if offset and (response.status_code != 206 or not match or int(match.group(1)) != offset):
+                # The server ignored the range: start over
+                print(f"↩️ {os.path.basename(output_path)}: server did not resume, restarting")
+                md5 = hashlib.md5()
+                offset = 0
+            elif offset:
+                print(f"⏯️ Resuming {os.path.basename(output_path)} at {offset} bytes")
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    md5.update(chunk)
+
+    digest = md5.hexdigest()
+    if md5sum and digest != md5sum:
+        os.remove(part_path)
+        raise ValueError(f"md5 mismatch for {os.path.basename(output_path)}: expected {md5sum}, got {digest}")
+    os.replace(part_path, output_path)
+    return digest
+
+def _download_row(session, limiter, row, output_dir, url_template, retries, hash_cache=None):
+    """
+    Download the archive of one row, retrying from the partial file on connection errors.
+    """
+    name = row["file_name"]
+    output_path = os.path.join(output_dir, name)
+    log = {"file_name": name, "status": "", "bytes": 0, "md5sum": ""}
+    if os.path.exists(output_path):
+        log.update(status="PRESENT", bytes=os.path.getsize(output_path))
+        return log
+    if pd.isna(row.get("file_id")) and pd.isna(row.get("_id")):
+        print(f"⚠️ {name} is not in the file listing, cannot download it")
+        log["status"] = "NOT LISTED"
+        return log
+
+    url = url_template.format(**{key: "" if pd.isna(value) else value for key, value in row.items()})
+    md5sum = None if pd.isna(row.get("md5sum")) else row["md5sum"]
+    for attempt in range(1, retries + 1):
+        try:
+            digest = download_file(session, limiter, url, output_path, md5sum)
+            if hash_cache is not None:
+                # The digest was computed while streaming: verification need not read the file again
+                hash_cache.record(output_path, digest)
+            log.update(status="DOWNLOADED", bytes=os.path.getsize(output_path), md5sum=digest)
+            print(f"✅ Downloaded {name} ({log['bytes']} bytes)")
+            return log
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError) as e:
+            print(f"🔁 {name}: attempt {attempt}/{retries} interrupted: {e}")
+        except Exception as e:
+            print(f"❌ Failed to download {name}: {e}")
+            break
+    log["status"] = "ERROR"
+    return log
+
+def download_files(files, output_dir, header, workers=DOWNLOAD_WORKERS, url_template=JGI_DOWNLOAD_URL,
+                   retries=DOWNLOAD_RETRIES, limiter=None, hash_cache=None):
+    """
+    Download the archives that are not in output_dir yet, several at a time.
+
+    Workers share one keep-alive session and one token bucket, so the request
+    rate stays within REQUESTS_PER_SECOND whatever the worker count.
+
+    Args:
+        files (pd.DataFrame): Output of download_table.
+        output_dir (str): Directory of the compressed proteomes.
+        header (dict): Request headers (e.g. authentication).
+        workers (int): Number of files downloaded at the same time.
+        url_template (str): Download URL with {file_id}, {_id} or {file_name} placeholders.
+        retries (int): Attempts per file when the connection breaks.
+        limiter (RateLimiter, optional): Token bucket; a new one by default.
+        hash_cache (HashCache, optional): Receives the md5 of every downloaded file.
+
+    Returns:
+        list: One log row per file (file_name, status, bytes, md5sum), in input order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    limiter = limiter or RateLimiter()
+    rows = [row for _, row in files.iterrows()]
+    with create_session(header, pool_size=workers) as session, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(_download_row, session, limiter, row, output_dir, url_template, retries, hash_cache)
+            for row in rows
+        ]
+        return [future.result() for future in futures]
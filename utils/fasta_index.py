@@ -0,0 +1,295 @@
+import os
+import shutil
+import numpy as np
+from utils.fasta_utils import WHITESPACE
+
+SCAN_BYTES = 1 << 22  # Bytes scanned at a time when indexing a FASTA file
+INDEX_BATCH = 1 << 16  # Index rows held in memory at a time when streaming an index
+COPY_BYTES = 1 << 20  # Bytes read at a time when copying records
+_SPACES = np.frombuffer(WHITESPACE.replace(b"\n", b""), dtype=np.uint8)
+
+# One row per record: where its header and sequence start, where the record ends,
+# its sequence length and the width of its first sequence line
+INDEX_DTYPE = np.dtype([
+    ("header_offset", "<i8"),
+    ("seq_offset", "<i8"),
+    ("end", "<i8"),
+    ("length", "<i8"),
+    ("line_width", "<i4"),
+])
+
+def index_path(fasta_path):
+    """
+    Path of the index sidecar of a FASTA file.
+    """
+    return f"{fasta_path}.idx.npy"
+
+def write_index(fasta_path, entries):
+    """
+    Save index rows next to a FASTA file.
+
+    Args:
+        fasta_path (str): FASTA file the rows describe.
+        entries (list or np.ndarray): Rows as INDEX_DTYPE tuples or array.
+    """
+    np.save(index_path(fasta_path), np.asarray(entries, dtype=INDEX_DTYPE))
+
+class IndexWriter:
+    """
+    Write the index sidecar of a FASTA file row by row with bounded memory.
+
+    Rows are buffered in batches of INDEX_BATCH and spilled to a temporary file;
+    close() writes the .npy header and the rows to the sidecar.
+
+    Args:
+        fasta_path (str): FASTA file the rows describe.
+    """
+    def __init__(self, fasta_path):
+        self.path = index_path(fasta_path)
+        self._tmp = open(f"{self.path}.tmp", "w+b")
+        self._rows = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, row):
+        """
+        Add one (header_offset, seq_offset, end, length, line_width) row.
+        """
+        self._rows.append(row)
+        if len(self._rows) >= INDEX_BATCH:
+            self._flush()
+
+    def extend(self, rows):
+        """
+        Add an INDEX_DTYPE array of rows.
+        """
+        self._flush()
+        self._tmp.write(np.ascontiguousarray(rows, dtype=INDEX_DTYPE).tobytes())
+        self.count += len(rows)
+
+    def _flush(self):
+        if self._rows:
+            self._tmp.write(np.array(self._rows, dtype=INDEX_DTYPE).tobytes())
+            self.count += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        if self._tmp.closed:
+            return
+        self._flush()
+        self._tmp.seek(0)
+        with open(self.path, "wb") as f:
+            header = {"descr": np.lib.format.dtype_to_descr(INDEX_DTYPE), "fortran_order": False, "shape": (self.count,)}
+            np.lib.format.write_array_header_1_0(f, header)
+            shutil.copyfileobj(self._tmp, f, COPY_BYTES)
+        self._tmp.close()
+        os.remove(self._tmp.name)
+
+def _scan_region(arr):
+    """
+    Index a byte array holding whole records, with offsets relative to its start.
+    """
+    size = len(arr)
+    starts = np.flatnonzero(arr == ord(">"))
+    starts = starts[(starts == 0) | (arr[np.maximum(starts - 1, 0)] == ord("\n"))]
+    newlines = np.flatnonzero(arr == ord("\n"))
+    spaces = np.flatnonzero(np.isin(arr, _SPACES))
+
+    index = np.zeros(len(starts), dtype=INDEX_DTYPE)
+    ends = np.append(starts[1:], size)
+    # Sequences start after the newline closing the header, or at the record end if there is none
+    header_nl = np.searchsorted(newlines, starts)
+    seq_offsets = np.minimum(np.append(newlines, size)[header_nl] + 1, ends)
+    first_nl = np.searchsorted(newlines, seq_offsets)
+    line_ends = np.minimum(np.append(newlines, size)[first_nl], ends)
+    n_newlines = np.searchsorted(newlines, ends) - first_nl
+    n_spaces = np.searchsorted(spaces, ends) - np.searchsorted(spaces, seq_offsets)
+
+    index["header_offset"] = starts
+    index["seq_offset"] = seq_offsets
+    index["end"] = ends
+    index["length"] = ends - seq_offsets - n_newlines - n_spaces
+    index["line_width"] = line_ends - seq_offsets
+    return index
+
+def iter_scan(fasta_path, block_bytes=SCAN_BYTES):
+    """
+    Build the index of a FASTA file block by block, by locating its header lines and line breaks.
+
+    The file is read in blocks of about block_bytes cut at record boundaries,
+    and each block is scanned as a NumPy byte array, so no record is parsed and
+    memory stays bounded by the block size (or the largest record). Sequence
+    whitespace is discounted from the lengths as read_fasta drops it.
+
+    Args:
+        fasta_path (str): FASTA file to index.
+        block_bytes (int): Approximate number of bytes scanned at a time.
+
+    Yields:
+        np.ndarray: INDEX_DTYPE rows of the records of each block.
+    """
+    pos = 0
+    pending = b""
+    with open(fasta_path, "rb") as f:
+        while True:
+            chunk = f.read(block_bytes)
+            data = pending + chunk
+            # Cut after the last complete record, unless this is the end of the file
+            cut = data.rfind(b"\n>") + 1 if chunk else len(data)
+            if cut:
+                index = _scan_region(np.frombuffer(data, dtype=np.uint8, count=cut))
+                for field in ("header_offset", "seq_offset", "end"):
+                    index[field] += pos
+                if len(index):
+                    yield index
+                pos += cut
+            pending = data[cut:]
+            if not chunk:
+                return
+
+def scan_index(fasta_path):
+    """
+    Build the index of a whole FASTA file (see iter_scan).
+
+    Args:
+        fasta_path (str): FASTA file to index.
+
+    Returns:
+        np.ndarray: One INDEX_DTYPE row per record.
+    """
+    blocks = list(iter_scan(fasta_path))
+    return np.concatenate(blocks) if blocks else np.empty(0, dtype=INDEX_DTYPE)
+
+def _fresh_rows(fasta_path):
+    """
+    Number of rows of the index sidecar, or None if it is missing or stale.
+
+    The sidecar is trusted when it is newer than the FASTA file and its last
+    record ends at the end of the file.
+    """
+    sidecar = index_path(fasta_path)
+    fasta_stat = os.stat(fasta_path)
+    if not os.path.exists(sidecar) or os.stat(sidecar).st_mtime_ns < fasta_stat.st_mtime_ns:
+        return None
+    try:
+        rows = np.load(sidecar, mmap_mode="r")
+    except ValueError:
+        # np.load cannot memory-map an empty array
+        rows = np.load(sidecar)
+    if rows.dtype != INDEX_DTYPE or (len(rows) and rows[-1]["end"] != fasta_stat.st_size):
+        return None
+    return len(rows)
+
+def load_index(fasta_path):
+    """
+    Return the index of a FASTA file, rebuilding the sidecar if it is missing or stale.
+
+    Args:
+        fasta_path (str): Indexed FASTA file.
+
+    Returns:
+        np.ndarray: One INDEX_DTYPE row per record.
+    """
+    if _fresh_rows(fasta_path) is not None:
+        return np.load(index_path(fasta_path))
+    index = scan_index(fasta_path)
+    write_index(fasta_path, index)
+    return index
+
+def iter_index(fasta_path, batch_rows=INDEX_BATCH):
+    """
+    Read the index of a FASTA file in batches of rows, rebuilding a missing or stale sidecar.
+
+    Unlike load_index, the whole index is never held in memory.
+
+    Args:
+        fasta_path (str): Indexed FASTA file.
+        batch_rows (int): Number of rows per batch.
+
+    Yields:
+        np.ndarray: INDEX_DTYPE rows, in file order.
+    """
+    if _fresh_rows(fasta_path) is None:
+        with IndexWriter(fasta_path) as writer:
+            for rows in iter_scan(fasta_path):
+                writer.extend(rows)
+    with open(index_path(fasta_path), "rb") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, _, _ = read_header(f)
+        for first in range(0, shape[0], batch_rows):
+            yield np.fromfile(f, dtype=INDEX_DTYPE, count=min(batch_rows, shape[0] - first))
+
+class RecordCopier:
+    """
+    Copy records described by index rows from one FASTA file to another, batch by batch.
+
+    Records that are contiguous in the input are copied as one byte range, read
+    COPY_BYTES at a time, and an index of the output is written next to it, so
+    memory does not grow with the size of either file.
+
+    Args:
+        fasta_path (str): Input FASTA file.
+        output_path (str): FASTA file to write.
+    """
+    def __init__(self, fasta_path, output_path):
+        self._fin = open(fasta_path, "rb")
+        self._fout = open(output_path, "wb")
+        self._index = IndexWriter(output_path)
+        self._pos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def copy(self, index):
+        """
+        Append the records of the given index rows, which must follow those copied before in file order.
+        """
+        if not len(index):
+            return
+        starts = index["header_offset"]
+        ends = index["end"]
+        # A run of records breaks wherever a record does not start where the previous one ended
+        breaks = np.flatnonzero(starts[1:] != ends[:-1]) + 1
+        run_starts = starts[np.concatenate(([0], breaks))]
+        run_ends = ends[np.concatenate((breaks - 1, [len(index) - 1]))]
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            self._fin.seek(start)
+            while start < end:
+                data = self._fin.read(min(COPY_BYTES, end - start))
+                self._fout.write(data)
+                start += len(data)
+
+        # Shift every kept record by the bytes dropped before it
+        out_index = index.copy()
+        sizes = ends - starts
+        shift = starts - (self._pos + np.cumsum(sizes) - sizes)
+        for field in ("header_offset", "seq_offset", "end"):
+            out_index[field] -= shift
+        self._index.extend(out_index)
+        self._pos += int(sizes.sum())
+
+    def close(self):
+        self._fin.close()
+        self._fout.close()
+        self._index.close()
+
+def copy_records(fasta_path, index, output_path):
+    """
+    Copy the records described by index rows from one FASTA file to another.
+
+    Args:
+        fasta_path (str): Input FASTA file.
+        index (np.ndarray): Rows of the records to copy, in file order.
+        output_path (str): FASTA file to write.
+    """
+    with RecordCopier(fasta_path, output_path) as copier:
+        copier.copy(index)
@@ -0,0 +1,198 @@
+import os
+import mmap
+
+CHUNK_SIZE = 1 << 22  # Bytes read from a stream at a time
+LINE_WIDTH = 60  # Sequence line width used by Bio.SeqIO's FASTA writer
+WHITESPACE = b" \t\r\n\v\f"
+
+class FastaRecord:
+    """
+    One FASTA record held as raw bytes.
+
+    The sequence lines are kept as read; the sequence without whitespace is only
+    built when asked for, and a record whose lines already have the output width
+    is written back without being re-wrapped.
+
+    Args:
+        title (bytes): Header line without ">".
+        body (bytes, optional): Sequence lines as read from the file.
+        sequence (bytes, optional): Sequence without whitespace.
+    """
+    __slots__ = ("title", "_body", "_sequence")
+
+    def __init__(self, title, body=None, sequence=None):
+        self.title = title
+        self._body = body
+        self._sequence = sequence
+
+    @property
+    def id(self):
+        """
+        Identifier of the record, i.e. the first word of its title.
+        """
+        return record_id(self.title)
+
+    @property
+    def sequence(self):
+        """
+        Sequence with all whitespace removed.
+        """
+        if self._sequence is None:
+            self._sequence = self._body.translate(None, WHITESPACE)
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, value):
+        self._sequence = value
+        self._body = None
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def format(self, width=LINE_WIDTH):
+        """
+        Serialize the record, wrapping the sequence at `width` characters (0 or None for one line).
+
+        Returns:
+            bytes: The record, ending with a newline.
+        """
+        sequence = self.sequence
+        body = self._body
+        if width and body is not None:
+            n_lines = -(-len(sequence) // width)
+            newlines = body[width::width + 1]
+            # Same residues plus exactly one newline per full-width line: reuse the input lines
+            if (len(body) == len(sequence) + n_lines and body[-1:] == b"\n"
+                    and newlines.count(b"\n") == len(newlines)):
+                return b">" + self.title + b"\n" + body
+        return format_record(self.title, sequence, width)
+
+def _iter_region(data, start, end):
+    """
+    Split data[start:end], which begins with ">" and ends at a record boundary, into records.
+    """
+    pos = start
+    while pos < end:
+        nxt = data.find(b"\n>", pos, end)
+        stop = end if nxt == -1 else nxt + 1
+        block = data[pos + 1:stop]
+        newline = block.find(b"\n")
+        if newline == -1:
+            yield FastaRecord(block.rstrip(), sequence=b"")
+        else:
+            yield FastaRecord(block[:newline].rstrip(), block[newline + 1:])
+        pos = stop
+
+def _first_record(data):
+    """
+    Offset of the first header line, or -1 if there is none.
+    """
+    if data[:1] == b">":
+        return 0
+    pos = data.find(b"\n>")
+    return -1 if pos == -1 else pos + 1
+
+def read_fasta(source, use_mmap=False, chunk_size=CHUNK_SIZE):
+    """
+    Stream FASTA records as raw bytes, without building SeqRecord objects.
+
+    Sequence whitespace is dropped as Bio.SeqIO does; text before the first
+    header is skipped rather than rejected.
+
+    Args:
+        source (str or file): Path, or binary handle such as a gzip or zip member stream.
+        use_mmap (bool): Memory-map the file instead of reading it in chunks (paths only).
+        chunk_size (int): Number of bytes read at a time from a stream.
+
+    Yields:
+        FastaRecord: One record per header line.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            if use_mmap and os.fstat(handle.fileno()).st_size:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    start = _first_record(data)
+                    if start != -1:
+                        yield from _iter_region(data, start, len(data))
+            else:
+                yield from read_fasta(handle, chunk_size=chunk_size)
+        return
+
+    pending = b""
+    started = False
+    while True:
+        chunk = source.read(chunk_size)
+        data = pending + chunk
+        if not started:
+            start = _first_record(data)
+            if start == -1:
+                if not chunk:
+                    return
+                # Keep the last partial line, with its newline, in case a header starts on it
+                newline = data.rfind(b"\n")
+                pending = data[newline:] if newline != -1 else data
+                continue
+            data = data[start:]
+            started = True
+        if not chunk:
+            yield from _iter_region(data, 0, len(data))
+            return
+        cut = data.rfind(b"\n>")
+        if cut <= 0:
+            pending = data
+            continue
+        yield from _iter_region(data, 0, cut + 1)
+        pending = data[cut + 1:]
+
+def record_id(title):
+    """
+    Return the identifier of a FASTA title, i.e. its first word.
+    """
+    parts = title.split(None, 1)
+    return parts[0] if parts else b""
+
+def format_record(title, sequence, width=LINE_WIDTH):
+    """
+    Serialize one FASTA record.
+
+    Args:
+        title (bytes): Header line without ">".
+        sequence (bytes): Sequence without line breaks.
+        width (int): Sequence line width, 0 or None for a single line.
+
+    Returns:
+        bytes: The record, ending with a newline.
+    """
+    if not width:
+        return b">" + title + b"\n" + sequence + b"\n"
+    lines = [sequence[i:i + width] for i in range(0, len(sequence), width)]
+    lines.append(b"")
+    return b">" + title + b"\n" + b"\n".join(lines)
+
+def write_fasta(handle, records, width=LINE_WIDTH, index=None):
+    """
+    Write FASTA records to a binary handle.
+
+    Args:
+        handle (file): Binary output handle.
+        records (iterable): FastaRecord objects.
+        width (int): Sequence line width, 0 or None for a single line.
+        index (list or IndexWriter, optional): Receives one (header_offset,
+            seq_offset, end, length, line_width) tuple per record through its
+            append method, offsets counted from the start of the writing.
+
+    Returns:
+        int: Number of records written.
+    """
+    count = 0
+    pos = 0
+    for record in records:
+        data = record.format(width)
+        handle.write(data)
+        if index is not None:
+            length = len(record.sequence)
+            line_width = min(width, length) if width else length
+            index.append((pos, pos + len(record.title) + 2, pos + len(data), length, line_width))
+            pos += len(data)
+        count += 1
+    return count
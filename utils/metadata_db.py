@@ -0,0 +1,222 @@
+import os
+import sqlite3
+import pandas as pd
+from config import METADATA_DB_PATH, METADATA_DB
+
+FILE_INDEXES = [
+    "organism", "file_name", "file_type", "file_date", "ncbi_taxon_id", "ncbi_taxon_class",
+    "ncbi_taxon_order", "ncbi_taxon_family", "ncbi_taxon_genus", "ncbi_taxon_species"
+]
+INTEGER_COLUMNS = {"ncbi_taxon_id"}
+PHYLOGENY_COLUMNS = [
+    "organism", "ncbi_taxon_id", "ncbi_taxon_class", "ncbi_taxon_family",
+    "ncbi_taxon_order", "ncbi_taxon_genus", "ncbi_taxon_species"
+]
+
+def connect(path=METADATA_DB_PATH):
+    """
+    Open the metadata database in autocommit mode, creating its bookkeeping table.
+
+    Writers wrap their changes in BEGIN/COMMIT themselves; in WAL mode readers keep
+    seeing the previous content of a table until the new one is committed.
+    """
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS sources (name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)")
+    return conn
+
+def _record_source(conn, table, csv_path):
+    """
+    Remember which version of the CSV a table was loaded alongside.
+    """
+    stat = os.stat(csv_path)
+    conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (table, stat.st_size, stat.st_mtime_ns))
+
+def _value(value):
+    # Empty strings become NULLs, matching what pandas reads back from the CSV
+    return None if value is None or value == "" else value
+
+class FileTableWriter:
+    """
+    Load file metadata rows into the files table, batch by batch, in one transaction.
+
+    Indexes are built once all rows are in, which is much faster than
+    maintaining them row by row.
+
+    Args:
+        fields (list): Column names, in the order of the CSV.
+        path (str): Database location.
+    """
+    def __init__(self, fields, path=METADATA_DB_PATH):
+        self.fields = fields
+        self.conn = connect(path)
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("BEGIN")
+        self.conn.execute("DROP TABLE IF EXISTS files")
+        columns = ", ".join(f"{field} {'INTEGER' if field in INTEGER_COLUMNS else 'TEXT'}" for field in fields)
+        self.conn.execute(f"CREATE TABLE files ({columns})")
+        self.insert = f"INSERT INTO files VALUES ({', '.join('?' * len(fields))})"
+
+    def write(self, rows):
+        """
+        Insert a batch of row dicts.
+        """
+        self.conn.executemany(self.insert, ([_value(row[field]) for field in self.fields] for row in rows))
+
+    def commit(self, csv_path):
+        """
+        Index the table, tie it to the CSV written in the same pass and make it visible.
+        """
+        for column in FILE_INDEXES:
+            if column in self.fields:
+                self.conn.execute(f"CREATE INDEX files_{column} ON files ({column})")
+        # Row counts for the query planner, so selective filters go through an index
+        self.conn.execute("ANALYZE files")
+        _record_source(self.conn, "files", csv_path)
+        self.conn.execute("COMMIT")
+        self.conn.close()
+
+    def abort(self):
+        """
+        Drop the rows written so far and keep the previous table.
+        """
+        self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+def write_frame(df, table, csv_path, indexes=(), path=METADATA_DB_PATH):
+    """
+    Replace a table with the content of a DataFrame that was just saved as csv_path.
+
+    Args:
+        df (pd.DataFrame): Table content.
+        table (str): Table name.
+        csv_path (str): CSV holding the same data.
+        indexes (iterable): Columns to index.
+        path (str): Database location.
+    """
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN")
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        columns = ", ".join(f'"{column}"' for column in df.columns)
+        conn.execute(f'CREATE TABLE "{table}" ({columns})')
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(df.columns))})',
+                         ([_value(v) for v in row] for row in df.astype(object).itertuples(index=False)))
+        for column in indexes:
+            conn.execute(f'CREATE INDEX "{table}_{column}" ON "{table}" ("{column}")')
+        _record_source(conn, table, csv_path)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def open_current(table, csv_path, path=METADATA_DB_PATH):
+    """
+    Connect to the database if it holds `table` as loaded alongside the current csv_path.
+
+    A CSV rewritten or edited by hand after the database was loaded makes the
+    table stale, and callers fall back to reading the CSV.
+
+    Args:
+        table (str): Table the caller needs.
+        csv_path (str): CSV the table mirrors.
+        path (str): Database location.
+
+    Returns:
+        sqlite3.Connection or None: Open connection, or None if the table is
+            missing, stale or the database is disabled (METADATA_DB).
+    """
+    if not METADATA_DB or not os.path.exists(path) or not os.path.exists(csv_path):
+        return None
+    conn = connect(path)
+    source = conn.execute("SELECT size, mtime_ns FROM sources WHERE name = ?", (table,)).fetchone()
+    stat = os.stat(csv_path)
+    if source != (stat.st_size, stat.st_mtime_ns):
+        conn.close()
+        return None
+    return conn
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+def query_files(columns=None, since=None, until=None, path=METADATA_DB_PATH, **filters):
+    """
+    Select file metadata rows through the indexes, in listing order.
+
+    Example:
+        query_files(ncbi_taxon_order="Pleosporales", file_type="Proteome", since="2025-03-01")
+
+    Args:
+        columns (list, optional): Columns to return; all by default.
+        since (str, optional): Keep files whose file_date is on or after this date.
+        until (str, optional): Keep files whose file_date is before this date.
+        path (str): Database location.
+        **filters: column=value, or column=[values] to accept any of several values.
+
+    Returns:
+        pd.DataFrame: Matching rows.
+
+    Raises:
+        FileNotFoundError: If the database has not been built yet.
+        ValueError: If a column name is not in the files table.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No metadata database at {path}: run mycocosm_filelist_fetch.py first")
+    conn = connect(path)
+    try:
+        known = _columns(conn, "files")
+        unknown = [column for column in list(columns or []) + list(filters) if column not in known]
+        if unknown:
+            raise ValueError(f"Unknown metadata columns: {', '.join(unknown)}")
+        clauses, params = [], []
+        for column, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params += values
+        # file_date is ISO 8601 text, so dates compare as strings
+        if since is not None:
+            clauses.append("file_date >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("file_date < ?")
+            params.append(str(until))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {', '.join(columns or known)} FROM files{where} ORDER BY rowid"
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def file_md5sums(conn):
+    """
+    Map file names to the md5sum reported by the listing (later rows win, as in the CSV).
+    """
+    rows = conn.execute("SELECT file_name, md5sum FROM files "
+                        "WHERE file_name IS NOT NULL AND md5sum IS NOT NULL ORDER BY rowid")
+    return dict(rows)
+
+def lookup_files(conn, file_names, columns):
+    """
+    Fetch the listing rows of the given file names through the file_name index.
+
+    Args:
+        conn (sqlite3.Connection): Connection from open_current.
+        file_names (iterable): Names to look up.
+        columns (list): Columns to return (file_name is always included).
+
+    Returns:
+        pd.DataFrame: Matching rows as text (missing values as NaN), in listing order.
+    """
+    columns = ["file_name"] + [column for column in columns if column != "file_name"]
+    names = list(file_names)
+    frames = []
+    # Stay well under SQLite's limit on bound parameters
+    for start in range(0, len(names), 500):
+        batch = names[start:start + 500]
+        # CAST keeps NULLs as NULL, where dtype=str would turn them into "None"
+        selected = ", ".join(f"CAST({column} AS TEXT) AS {column}" for column in columns)
+        sql = (f"SELECT rowid AS row, {selected} FROM files "
+               f"WHERE file_name IN ({', '.join('?' * len(batch))})")
+        frames.append(pd.read_sql_query(sql, conn, params=batch))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    rows = pd.concat(frames)
+    return rows.sort_values("row")[columns].reset_index(drop=True)
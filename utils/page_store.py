@@ -0,0 +1,117 @@
+import os
+import gzip
+import json
+from config import JSON_DIR
+
+def page_path(organism_id, page):
+    """
+    Path of the indented JSON file holding one listing page ("json" format).
+    """
+    return os.path.join(JSON_DIR, f"all_files_{organism_id}_page_{page}.json")
+
+def store_path(organism_id):
+    """
+    Path of the compressed NDJSON store holding all listing pages of an organism ("ndjson" format).
+    """
+    return os.path.join(JSON_DIR, f"all_files_{organism_id}.ndjson.gz")
+
+def write_page(organism_id, page, data, fmt, store_size=0):
+    """
+    Save one listing page in the given storage format.
+
+    In the "ndjson" format each page is appended to the organism's store as its own
+    gzip member holding one compact JSON line, so any page can be read back by
+    seeking to its offset. Page 1 starts a new store; later pages first cut the
+    store back to store_size, dropping a page torn by an interrupted run.
+
+    Args:
+        organism_id (str): Organism the page belongs to.
+        page (int): Page number.
+        data (dict): Decoded API response.
+        fmt (str): "ndjson" or "json".
+        store_size (int): Size of the store after the previously recorded page.
+
+    Returns:
+        tuple: (offset, end) of the page in the store, (None, None) for the "json" format.
+    """
+    if fmt == "json":
+        with open(page_path(organism_id, page), "w") as f:
+            json.dump(data, f, indent=2)
+        return None, None
+
+    path = store_path(organism_id)
+    with open(path, "r+b" if page > 1 and os.path.exists(path) else "wb") as f:
+        f.truncate(store_size if page > 1 else 0)
+        f.seek(0, os.SEEK_END)
+        offset = f.tell()
+        f.write(gzip.compress(json.dumps(data, separators=(",", ":")).encode() + b"\n", compresslevel=6))
+        return offset, f.tell()
+
+def read_page(organism_id, entry, page):
+    """
+    Read a single listing page using the offsets recorded in the manifest.
+
+    Args:
+        organism_id (str): Organism the page belongs to.
+        entry (dict): Manifest entry of the organism.
+        page (int): Page number to read.
+
+    Returns:
+        dict: Decoded API response.
+    """
+    if entry.get("format", "json") == "json":
+        with open(page_path(organism_id, page)) as f:
+            return json.load(f)
+    offsets = entry["offsets"]
+    end = offsets[page] if page < len(offsets) else entry["store_size"]
+    with open(store_path(organism_id), "rb") as f:
+        f.seek(offsets[page - 1])
+        return json.loads(gzip.decompress(f.read(end - offsets[page - 1])))
+
+def iter_pages(organism_id, entry):
+    """
+    Stream the recorded listing pages of an organism in page order.
+
+    Args:
+        organism_id (str): Organism to read.
+        entry (dict): Manifest entry of the organism.
+
+    Yields:
+        dict: Decoded API response of each page.
+    """
+    if entry.get("format", "json") == "json":
+        for page in range(1, entry["pages"] + 1):
+            with open(page_path(organism_id, page)) as f:
+                yield json.load(f)
+        return
+    with open(store_path(organism_id), "rb") as raw:
+        # Bytes past the last recorded page belong to a torn write and are ignored
+        with gzip.open(_Limited(raw, entry["store_size"])) as f:
+            for _, line in zip(range(entry["pages"]), f):
+                yield json.loads(line)
+
+def remove_pages(organism_id, fmt, first_page, last_page):
+    """
+    Delete cached pages first_page..last_page left over from a longer or older listing.
+    """
+    if fmt == "json":
+        for page in range(first_page, last_page + 1):
+            if os.path.exists(page_path(organism_id, page)):
+                os.remove(page_path(organism_id, page))
+    elif first_page == 1 and os.path.exists(store_path(organism_id)):
+        os.remove(store_path(organism_id))
+
+class _Limited:
+    """
+    Read-only view of the first `size` bytes of a binary file.
+    """
+    def __init__(self, raw, size):
+        self.raw = raw
+        self.remaining = size
+
+    def read(self, n=-1):
+        if n < 0 or n > self.remaining:
+            n = self.remaining
+        data = self.raw.read(n)
+        self.remaining -= len(data)
+        return data
@@ -0,0 +1,162 @@
+import os
+import mmap
+import shutil
+import numpy as np
+from utils.fasta_utils import read_fasta, format_record, LINE_WIDTH
+
+SEQUENCES_FILE = "sequences.bin"
+IDS_FILE = "ids.npy"
+OFFSETS_FILE = "offsets.npy"
+
+def build_store(fasta_paths, store_dir):
+    """
+    Pack FASTA files into a store: one sequence blob and a sorted ID index.
+
+    The blob holds every sequence back to back without line breaks; ids.npy
+    holds the record IDs in sorted order and offsets.npy the (start, end) byte
+    range of each one in the blob. The store is written next to store_dir and
+    swapped in at the end, so readers never see a half-built store.
+
+    Args:
+        fasta_paths (list): FASTA files to pack, e.g. the clean proteomes.
+        store_dir (str): Directory of the store.
+
+    Returns:
+        int: Number of sequences stored.
+    """
+    tmp_dir = f"{store_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    ids = []
+    bounds = []
+    pos = 0
+    with open(os.path.join(tmp_dir, SEQUENCES_FILE), "wb") as blob:
+        for path in fasta_paths:
+            for record in read_fasta(path):
+                sequence = record.sequence
+                blob.write(sequence)
+                ids.append(record.id)
+                bounds.append((pos, pos + len(sequence)))
+                pos += len(sequence)
+
+    ids = np.array(ids, dtype=bytes) if ids else np.empty(0, dtype="S1")
+    bounds = np.array(bounds, dtype=np.int64).reshape(-1, 2)
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    bounds = bounds[order]
+    duplicated = np.flatnonzero(ids[1:] == ids[:-1]) + 1
+    if len(duplicated):
+        print(f"⚠️ {len(duplicated)} duplicate IDs, keeping the first occurrence (e.g. {ids[duplicated[0]].decode()})")
+        keep = np.ones(len(ids), dtype=bool)
+        keep[duplicated] = False
+        ids = ids[keep]
+        bounds = bounds[keep]
+
+    np.save(os.path.join(tmp_dir, IDS_FILE), ids)
+    np.save(os.path.join(tmp_dir, OFFSETS_FILE), bounds)
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return len(ids)
+
+class ProteomeStore:
+    """
+    Read-only view of a store written by build_store.
+
+    The ID index is memory-mapped and looked up with a binary search; sequences
+    are returned as memoryview slices of the memory-mapped blob, without copying.
+    Use as a context manager, or call close() when done.
+
+    Args:
+        store_dir (str): Directory of the store.
+    """
+    def __init__(self, store_dir):
+        self.ids = np.load(os.path.join(store_dir, IDS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(store_dir, OFFSETS_FILE), mmap_mode="r")
+        self._file = open(os.path.join(store_dir, SEQUENCES_FILE), "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._blob)
+        else:
+            self._blob = None
+            self._view = memoryview(b"")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, seq_id):
+        return self.find([seq_id])[0] >= 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._view.release()
+        if self._blob is not None:
+            try:
+                self._blob.close()
+            except BufferError:
+                # Sequences handed out are still alive; the map goes away with the last one
+                pass
+        self._file.close()
+
+    def find(self, seq_ids):
+        """
+        Locate IDs in the index.
+
+        Args:
+            seq_ids (iterable): IDs as str or bytes.
+
+        Returns:
+            np.ndarray: Row of each ID in the index, -1 where it is missing.
+        """
+        queries = np.array([s.encode() if isinstance(s, str) else s for s in seq_ids], dtype=bytes)
+        if not len(queries) or not len(self.ids):
+            return np.full(len(queries), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.ids, queries), len(self.ids) - 1)
+        return np.where(self.ids[rows] == queries, rows, -1)
+
+    def get(self, seq_id):
+        """
+        Return the sequence of one ID as a memoryview, or None if it is not stored.
+        """
+        return self.lookup([seq_id])[0]
+
+    def lookup(self, seq_ids):
+        """
+        Return the sequences of many IDs in one vectorised search.
+
+        Args:
+            seq_ids (list): IDs as str or bytes.
+
+        Returns:
+            list: memoryview of each sequence, None where the ID is not stored.
+        """
+        rows = self.find(seq_ids)
+        found = rows >= 0
+        bounds = iter(self.offsets[rows[found]].tolist())
+        return [self._view[slice(*next(bounds))] if hit else None for hit in found.tolist()]
+
+    def write_fasta(self, handle, seq_ids, width=LINE_WIDTH):
+        """
+        Write the sequences of the given IDs to a binary handle as FASTA.
+
+        Args:
+            handle (file): Binary output handle.
+            seq_ids (list): IDs to extract, written in this order.
+            width (int): Sequence line width, 0 or None for a single line.
+
+        Returns:
+            list: IDs that are not in the store.
+        """
+        missing = []
+        for seq_id, sequence in zip(seq_ids, self.lookup(seq_ids)):
+            title = seq_id.encode() if isinstance(seq_id, str) else seq_id
+            if sequence is None:
+                missing.append(seq_id)
+            else:
+                handle.write(format_record(title, sequence, width))
+        return missing
@@ -0,0 +1,121 @@
+import numpy as np
+from utils.fasta_utils import WHITESPACE
+
+BATCH_BYTES = 1 << 20  # Bytes of sequence data counted per batch of records
+AMBIGUOUS_RESIDUES = b"XBZJxbzj"
+STOP = ord("*")
+
+# Per-record statistics computed from the residue histogram
+STATS_DTYPE = np.dtype([
+    ("ambiguous", "<i8"),
+    ("internal_stops", "<i8"),
+    ("entropy", "<f8"),
+])
+
+_IS_WHITESPACE = np.zeros(256, dtype=bool)
+_IS_WHITESPACE[list(WHITESPACE)] = True
+_AMBIGUOUS_COLUMNS = list(AMBIGUOUS_RESIDUES)
+_UPPER = np.arange(ord("A"), ord("Z") + 1)
+
+def _histograms(values, index):
+    """
+    Count each byte value in the sequences of the given records.
+
+    values holds the file bytes from the first header to the last record end;
+    each byte is labelled with its record, or with a spare row for header
+    lines, and a single bincount gives the histogram of every record at once.
+    """
+    base = int(index["header_offset"][0])
+    seq_starts = index["seq_offset"] - base
+    ends = index["end"] - base
+    # Alternate "header" and "sequence" segments; the header segment also covers any gap
+    previous_ends = np.concatenate(([0], ends[:-1]))
+    n = len(index)
+    segments = np.empty(2 * n, dtype=np.int64)
+    segments[0::2] = seq_starts - previous_ends
+    segments[1::2] = ends - seq_starts
+    labels = np.empty(2 * n, dtype=np.int64)
+    labels[0::2] = n
+    labels[1::2] = np.arange(n)
+    byte_labels = np.repeat(labels, segments)
+    counts = np.bincount(byte_labels * 256 + values, minlength=(n + 1) * 256)
+    return counts.reshape(n + 1, 256)[:n]
+
+def sequence_stats(fasta_path, index, batch_bytes=BATCH_BYTES, composition=None):
+    """
+    Compute quality statistics for every record of a FASTA file without parsing it.
+
+    Records are read in batches of about batch_bytes, each viewed as a NumPy
+    uint8 array and counted with one histogram, so memory is bounded by the
+    batch size (or the largest record) rather than the file size.
+
+    Args:
+        fasta_path (str): FASTA file.
+        index (np.ndarray): Index rows of the records, in file order (see utils.fasta_index).
+        batch_bytes (int): Approximate number of bytes counted at a time.
+        composition (np.ndarray, optional): 256 counters incremented in place with
+            the byte counts of all sequences.
+
+    Returns:
+        np.ndarray: One STATS_DTYPE row per record: the number of ambiguous
+            residues (X, B, Z, J), the number of "*" other than a terminal one,
+            and the Shannon entropy in bits of the residue composition.
+    """
+    stats = np.zeros(len(index), dtype=STATS_DTYPE)
+    if not len(index):
+        return stats
+    with open(fasta_path, "rb") as f:
+        spans = np.cumsum(index["end"] - index["header_offset"])
+        first = 0
+        while first < len(index):
+            done = spans[first - 1] if first else 0
+            last = max(int(np.searchsorted(spans, done + batch_bytes, side="right")), first + 1)
+            rows = index[first:last]
+            base = int(rows["header_offset"][0])
+            f.seek(base)
+            values = np.frombuffer(f.read(int(rows["end"][-1]) - base), dtype=np.uint8)
+            hist = _histograms(values, rows)
+            if composition is not None:
+                composition += hist.sum(axis=0)
+
+            letters = hist[:, _UPPER] + hist[:, _UPPER + 32]
+            residues = letters.sum(axis=1, keepdims=True)
+            share = np.divide(letters, residues, out=np.zeros(letters.shape), where=residues > 0)
+            logs = np.log2(share, out=np.zeros(share.shape), where=share > 0)
+            stats["entropy"][first:last] = -(share * logs).sum(axis=1)
+            stats["ambiguous"][first:last] = hist[:, _AMBIGUOUS_COLUMNS].sum(axis=1)
+            stats["internal_stops"][first:last] = hist[:, STOP]
+
+            # A "*" closing the sequence is the usual stop codon, not an internal one
+            seq_starts = rows["seq_offset"] - base
+            last_byte = rows["end"] - base - 1
+            for _ in range(2):
+                trailing = (last_byte >= seq_starts) & _IS_WHITESPACE[values[last_byte]]
+                last_byte = np.where(trailing, last_byte - 1, last_byte)
+            terminal = (last_byte >= seq_starts) & (values[last_byte] == STOP)
+            stats["internal_stops"][first:last] -= terminal
+            first = last
+    return stats
+
+def quality_masks(index, stats, max_ambiguous_fraction=None, max_internal_stops=None, min_entropy=None):
+    """
+    Flag the records failing each quality filter; a threshold of None disables its filter.
+
+    Args:
+        index (np.ndarray): FASTA index, for the sequence lengths.
+        stats (np.ndarray): Output of sequence_stats.
+        max_ambiguous_fraction (float): Largest share of ambiguous residues allowed.
+        max_internal_stops (int): Largest number of internal "*" allowed.
+        min_entropy (float): Smallest residue composition entropy allowed, in bits.
+
+    Returns:
+        list: (filter name, boolean mask of rejected records) pairs.
+    """
+    masks = []
+    if max_ambiguous_fraction is not None:
+        masks.append(("ambiguous", stats["ambiguous"] > max_ambiguous_fraction * index["length"]))
+    if max_internal_stops is not None:
+        masks.append(("internal_stop", stats["internal_stops"] > max_internal_stops))
+    if min_entropy is not None:
+        masks.append(("low_complexity", stats["entropy"] < min_entropy))
+    return masks
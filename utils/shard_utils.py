@@ -0,0 +1,101 @@
+import os
+import heapq
+import shutil
+import numpy as np
+import pandas as pd
+from utils.fasta_index import load_index, copy_records
+
+def lpt_assign(weights, n_shards):
+    """
+    Assign items to shards with the longest-processing-time-first heuristic.
+
+    Items are taken from the heaviest down and each goes to the currently
+    lightest shard, which keeps the heaviest shard within 4/3 of the optimum.
+
+    Args:
+        weights (list): Weight of each item, e.g. its number of residues.
+        n_shards (int): Number of shards.
+
+    Returns:
+        list: Shard number of each item.
+    """
+    shards = [0] * len(weights)
+    loads = [(0, shard) for shard in range(n_shards)]
+    for item in sorted(range(len(weights)), key=lambda i: weights[i], reverse=True):
+        load, shard = heapq.heappop(loads)
+        shards[item] = shard
+        heapq.heappush(loads, (load + weights[item], shard))
+    return shards
+
+def plan_shards(fasta_paths, n_shards, chunk_residues=None):
+    """
+    Split proteomes into work items and balance them over shards by residue count.
+
+    Args:
+        fasta_paths (list): Clean proteome files.
+        n_shards (int): Number of shards.
+        chunk_residues (int, optional): Cut proteomes into runs of records holding
+            about this many residues each; None keeps every proteome whole.
+
+    Returns:
+        pd.DataFrame: One row per item with its shard, source file, record range
+            [first_record, last_record), sequence and residue counts.
+    """
+    items = []
+    for path in fasta_paths:
+        lengths = load_index(path)["length"]
+        if chunk_residues:
+            # A record belongs to the chunk in which its first residue falls
+            chunk_of = (np.cumsum(lengths) - lengths) // chunk_residues
+            bounds = np.flatnonzero(np.diff(chunk_of)) + 1
+            starts = np.concatenate(([0], bounds)).tolist()
+            ends = np.concatenate((bounds, [len(lengths)])).tolist()
+        else:
+            starts, ends = [0], [len(lengths)]
+        for part, (first, last) in enumerate(zip(starts, ends)):
+            if last > first:
+                items.append({
+                    "portal": os.path.basename(path)[:-len(".fasta")],
+                    "part": part,
+                    "source": path,
+                    "first_record": first,
+                    "last_record": last,
+                    "sequences": last - first,
+                    "residues": int(lengths[first:last].sum()),
+                })
+    plan = pd.DataFrame(items, columns=["portal", "part", "source", "first_record", "last_record", "sequences", "residues"])
+    plan.insert(0, "shard", lpt_assign(plan["residues"].tolist(), n_shards))
+    return plan.sort_values(["shard", "portal", "part"]).reset_index(drop=True)
+
+def write_shards(plan, shards_dir, chunked=False):
+    """
+    Write one directory per shard holding its proteomes, plus a manifest.
+
+    Whole proteomes are copied, not hard-linked: a link would share its inode
+    with the clean proteome, which the next cleanup run rewrites in place.
+    Chunks are copied record by record through the FASTA index.
+
+    Args:
+        plan (pd.DataFrame): Output of plan_shards.
+        shards_dir (str): Directory to (re)create.
+        chunked (bool): Whether the plan splits proteomes into chunks.
+
+    Returns:
+        pd.DataFrame: The manifest that was written, with the path of each item.
+    """
+    shutil.rmtree(shards_dir, ignore_errors=True)
+    files = []
+    for row in plan.itertuples():
+        shard_dir = os.path.join(shards_dir, f"shard_{row.shard:03d}")
+        os.makedirs(shard_dir, exist_ok=True)
+        name = f"{row.portal}.part{row.part:03d}.fasta" if chunked else f"{row.portal}.fasta"
+        output_path = os.path.join(shard_dir, name)
+        if chunked:
+            index = load_index(row.source)
+            copy_records(row.source, index[row.first_record:row.last_record], output_path)
+        else:
+            shutil.copyfile(row.source, output_path)
+        files.append(os.path.relpath(output_path, shards_dir))
+    manifest = plan.drop(columns=["source"]).assign(file=files)
+    manifest.to_csv(os.path.join(shards_dir, "manifest.csv"), index=False)
+    return manifest
@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pandas as pd
+
+LENGTH_BINS = [0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+LENGTH_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+STANDARD_RESIDUES = "ACDEFGHIKLMNPQRSTVWY"
+
+def _bin_label(low, high):
+    return f"len_{low}_{high}" if high is not None else f"len_{low}_plus"
+
+def count_lengths(lengths, counts=None):
+    """
+    Add sequence lengths to a length histogram, one counter per length.
+
+    The histogram is as long as the longest sequence, whatever the number of
+    sequences, so a proteome can be summarised batch by batch.
+
+    Args:
+        lengths (np.ndarray): Sequence lengths.
+        counts (np.ndarray, optional): Histogram to add to.
+
+    Returns:
+        np.ndarray: The updated histogram.
+    """
+    if counts is None:
+        return np.bincount(lengths).astype(np.int64)
+    new = np.bincount(lengths, minlength=len(counts)).astype(np.int64)
+    new[:len(counts)] += counts
+    return new
+
+def _lengths_at(cumulative, ranks):
+    """
+    Length of the sequences at the given 0-based ranks in increasing length order.
+    """
+    return np.searchsorted(cumulative, ranks, side="right")
+
+def quantiles(length_counts, fractions):
+    """
+    Length quantiles from a length histogram, interpolated as np.quantile does.
+    """
+    cumulative = np.cumsum(length_counts)
+    positions = (cumulative[-1] - 1) * np.asarray(fractions, dtype=float)
+    below = np.floor(positions)
+    a = _lengths_at(cumulative, below).astype(float)
+    b = _lengths_at(cumulative, np.minimum(below + 1, cumulative[-1] - 1)).astype(float)
+    t = positions - below
+    # np.quantile interpolates from the upper value past the midpoint
+    return np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+
+def nx(length_counts, fraction):
+    """
+    Return the NX length and count: the length of the shortest sequence among the
+    longest ones that together hold `fraction` of all residues, and how many they are.
+    """
+    lengths = np.flatnonzero(length_counts)[::-1]
+    counts = length_counts[lengths]
+    covered = np.cumsum(lengths * counts)
+    target = fraction * covered[-1]
+    group = int(np.searchsorted(covered, target))
+    # Within the group of sequences of this length, the first one reaching the target
+    before = int(covered[group - 1]) if group else 0
+    length = int(lengths[group])
+    taken = max(int(-(-(target - before) // length)), 1)
+    return length, int(counts[:group].sum()) + taken
+
+def proteome_stats(length_counts, composition):
+    """
+    Summarise one proteome from its length histogram and residue byte counts.
+
+    Args:
+        length_counts (np.ndarray): Number of sequences of each length (see count_lengths).
+        composition (np.ndarray): Count of each byte value over all sequences.
+
+    Returns:
+        dict: Sequence and residue counts, length quantiles and histogram,
+            N50/L50 and N90/L90, and residue composition as fractions.
+    """
+    length_counts = np.asarray(length_counts, dtype=np.int64)
+    present = np.flatnonzero(length_counts)
+    sequences = int(length_counts.sum())
+    residues = int((np.arange(len(length_counts)) * length_counts).sum())
+    stats = {"sequences": sequences, "residues": residues}
+    if sequences:
+        stats["min_length"] = int(present[0])
+        stats["max_length"] = int(present[-1])
+        stats["mean_length"] = residues / sequences
+        for q, value in zip(LENGTH_QUANTILES, quantiles(length_counts, LENGTH_QUANTILES)):
+            stats[f"q{int(q * 100):02d}_length"] = float(value)
+    if residues:
+        stats["n50"], stats["l50"] = nx(length_counts, 0.5)
+        stats["n90"], stats["l90"] = nx(length_counts, 0.9)
+
+    # Number of sequences shorter than each bin edge, differenced into bin counts
+    below = np.concatenate(([0], np.cumsum(length_counts)))[np.minimum(LENGTH_BINS, len(length_counts))]
+    counts = np.diff(np.append(below, sequences))
+    for low, high, count in zip(LENGTH_BINS, LENGTH_BINS[1:] + [None], counts.tolist()):
+        stats[_bin_label(low, high)] = count
+
+    letters = composition[ord("A"):ord("Z") + 1] + composition[ord("a"):ord("z") + 1]
+    total = max(int(letters.sum()), 1)
+    for residue in STANDARD_RESIDUES + "X":
+        stats[f"aa_{residue}"] = float(letters[ord(residue) - ord("A")] / total)
+    standard = sum(letters[ord(r) - ord("A")] for r in STANDARD_RESIDUES + "X")
+    stats["aa_other"] = float((letters.sum() - standard) / total)
+    stats["stops"] = int(composition[ord("*")])
+    return stats
+
+def write_stats_table(rows, path):
+    """
+    Write per-proteome statistics as Parquet, or as CSV next to it when pyarrow is missing.
+
+    Args:
+        rows (list): Dicts from proteome_stats, each with a "portal" key.
+        path (str): Parquet output path.
+
+    Returns:
+        str: Path actually written.
+    """
+    df = pd.DataFrame(rows)
+    df = df[["portal"] + [col for col in df.columns if col != "portal"]].sort_values("portal")
+    try:
+        df.to_parquet(path, index=False)
+        return path
+    except ImportError:
+        csv_path = os.path.splitext(path)[0] + ".csv"
+        print("⚠️ pyarrow is not installed, writing the statistics as CSV.")
+        df.to_csv(csv_path, index=False)
+        return csv_path
@@ -0,0 +1,244 @@
+import re
+import numpy as np
+import pandas as pd
+
+RANKS = ["class", "order", "family", "genus", "species"]
+RANK_COLUMNS = [f"ncbi_taxon_{rank}" for rank in RANKS]
+TIP_RANK = "portal"
+NEWICK_PLAIN = re.compile(r"^[A-Za-z0-9_.\-]+$")
+
+def _newick_label(name):
+    """
+    Quote a label for Newick when it holds spaces or punctuation.
+    """
+    if NEWICK_PLAIN.match(name):
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+class TaxonomyTree:
+    """
+    Taxonomy of the portals as a tree with interned names and integer node IDs.
+
+    Node 0 is the root; below it come the ranks of RANKS and, as tips, the
+    portals. A missing rank is skipped, so a portal without a family hangs
+    straight from its order. Nodes are numbered in preorder, so the nodes of a
+    subtree are the contiguous IDs node..end[node]-1: selecting the portals
+    under any taxon is a slice, and the LCA of a set of tips is the deepest
+    ancestor of its first tip whose range covers the last one.
+
+    Build it with from_frame.
+
+    Attributes:
+        names (list): Interned names; a node refers to its name by index.
+        name_ids (np.ndarray): Name index of each node.
+        ranks (np.ndarray): Rank index of each node (into RANKS + [TIP_RANK], -1 for the root).
+        parents (np.ndarray): Parent of each node (-1 for the root).
+        ends (np.ndarray): One past the last node of each subtree.
+        tip_nodes (np.ndarray): Nodes of the tips, increasing.
+    """
+    def __init__(self, names, name_ids, ranks, parents, ends):
+        self.names = names
+        self.name_ids = np.asarray(name_ids, dtype=np.int32)
+        self.ranks = np.asarray(ranks, dtype=np.int8)
+        self.parents = np.asarray(parents, dtype=np.int32)
+        self.ends = np.asarray(ends, dtype=np.int32)
+        self.rank_names = RANKS + [TIP_RANK]
+        self.tip_nodes = np.flatnonzero(self.ranks == len(RANKS)).astype(np.int32)
+        self.tip_labels = [names[i] for i in self.name_ids[self.tip_nodes]]
+        self.tip_index = {label: int(node) for label, node in zip(self.tip_labels, self.tip_nodes)}
+        self.by_rank_name = {}
+        for node in range(1, len(self.parents)):
+            key = (self.rank_names[self.ranks[node]], names[self.name_ids[node]])
+            self.by_rank_name.setdefault(key, []).append(node)
+
+    @classmethod
+    def from_frame(cls, df, tip_column="organism", rank_columns=RANK_COLUMNS):
+        """
+        Build the tree from flat taxonomy columns, one row per portal.
+
+        A portal listed more than once (e.g. with two taxonomies) keeps its first row.
+
+        Args:
+            df (pd.DataFrame): Portal and rank columns (e.g. build_phylogeny_data).
+            tip_column (str): Column naming the tips.
+            rank_columns (list): Columns of the ranks in RANKS, from class to species.
+
+        Returns:
+            TaxonomyTree: The tree.
+        """
+        rows = df.drop_duplicates(tip_column)
+        names, interned = [""], {"": 0}
+        def intern(name):
+            if name not in interned:
+                interned[name] = len(names)
+                names.append(name)
+            return interned[name]
+
+        # Nested dicts keyed by (rank, name id); tips are stored under the rank after species
+        trie = {}
+        for values in zip(*(rows[col] for col in rank_columns), rows[tip_column]):
+            node = trie
+            for rank, value in enumerate(values):
+                if pd.isna(value) or str(value).strip() == "":
+                    continue
+                node = node.setdefault((rank, intern(str(value).strip())), {})
+
+        name_ids, ranks, parents, ends = [], [], [], []
+        def number(children, parent, rank, name_id):
+            # Preorder numbering, children sorted by rank then name for a stable layout
+            node = len(parents)
+            name_ids.append(name_id)
+            ranks.append(rank)
+            parents.append(parent)
+            ends.append(0)
+            for (child_rank, child_name), grandchildren in sorted(children.items(),
+                                                                  key=lambda item: (item[0][0], names[item[0][1]])):
+                number(grandchildren, node, child_rank, child_name)
+            ends[node] = len(parents)
+        number(trie, -1, -1, 0)
+        return cls(names, name_ids, ranks, parents, ends)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def name(self, node):
+        return self.names[self.name_ids[node]]
+
+    def rank(self, node):
+        return "root" if node == 0 else self.rank_names[self.ranks[node]]
+
+    def find(self, rank, name):
+        """
+        Return the nodes of a taxon (several if the name occurs under different parents).
+        """
+        return self.by_rank_name.get((rank, name), [])
+
+    def tips_under(self, node):
+        """
+        Return the portals below a node, in tree order.
+        """
+        start, stop = np.searchsorted(self.tip_nodes, [node, self.ends[node]])
+        return self.tip_labels[start:stop]
+
+    def select(self, **taxa):
+        """
+        Return the portals under any of the given taxa, in tree order.
+
+        Example:
+            tree.select(order="Pleosporales", genus=["Aspergillus", "Penicillium"])
+
+        Args:
+            **taxa: rank=name or rank=[names], with rank in RANKS.
+
+        Returns:
+            list: Portal names, each once.
+        """
+        unknown = [rank for rank in taxa if rank not in RANKS]
+        if unknown:
+            raise ValueError(f"Unknown ranks: {', '.join(unknown)}")
+        nodes = []
+        for rank, names in taxa.items():
+            for name in [names] if isinstance(names, str) else names:
+                nodes += self.find(rank, name)
+        # Keep the outermost nodes so that nested taxa do not repeat portals
+        selected, covered_until = [], -1
+        for node in sorted(nodes):
+            if node >= covered_until:
+                selected += self.tips_under(node)
+                covered_until = self.ends[node]
+        return selected
+
+    def lca(self, portals):
+        """
+        Return the lowest common ancestor node of a set of portals.
+
+        Args:
+            portals (iterable): Tip names.
+
+        Returns:
+            int: Node ID (0, the root, if they share no rank).
+        """
+        tips = [self.tip_index[portal] for portal in portals]
+        first, last = min(tips), max(tips)
+        node = first
+        while self.ends[node] <= last:
+            node = self.parents[node]
+        return int(node)
+
+    def lineage(self, node):
+        """
+        Return the (rank, name) pairs from the top rank down to a node.
+        """
+        path = []
+        while node > 0:
+            path.append((self.rank(node), self.name(node)))
+            node = self.parents[node]
+        return path[::-1]
+
+    def children(self):
+        """
+        Return the children of every node, in tree order.
+        """
+        children = [[] for _ in range(len(self))]
+        for node in range(1, len(self)):
+            children[self.parents[node]].append(node)
+        return children
+
+    def to_newick(self, portals=None, internal_labels=True):
+        """
+        Write the taxonomy as a Newick guide tree, optionally pruned to some portals.
+
+        Internal nodes with a single child (e.g. an order with one family, or what
+        is left after pruning) are collapsed into it, as tree tools expect.
+
+        Args:
+            portals (iterable, optional): Tips to keep; all by default.
+            internal_labels (bool): Label internal nodes with their taxon name.
+
+        Returns:
+            str: Newick string ending with ";".
+        """
+        keep = None
+        if portals is not None:
+            keep = np.zeros(len(self), dtype=bool)
+            for portal in portals:
+                node = self.tip_index[portal]
+                # Mark the path to the root once
+                while node >= 0 and not keep[node]:
+                    keep[node] = True
+                    node = self.parents[node]
+        children = self.children()
+
+        def write(node):
+            kids = [child for child in children[node] if keep is None or keep[child]]
+            while len(kids) == 1 and children[kids[0]]:
+                # Collapse a unary internal node into its child
+                node = kids[0]
+                kids = [child for child in children[node] if keep is None or keep[child]]
+            if len(kids) == 1:
+                return write(kids[0])
+            label = _newick_label(self.name(node)) if node > 0 and (internal_labels or not kids) else ""
+            if not kids:
+                return label
+            return "(" + ",".join(write(child) for child in kids) + ")" + label
+
+        return write(0) + ";"
+
+    def lineage_table(self):
+        """
+        One row per portal with its node ID, one column per rank and the full lineage.
+
+        Column names match the rank names used by plot-phylogeny-tree.R, so the
+        table joins to the tree tips by portal.
+
+        Returns:
+            pd.DataFrame: portal, node, class ... species and lineage.
+        """
+        rows = []
+        for portal, node in zip(self.tip_labels, self.tip_nodes):
+            path = self.lineage(self.parents[node])
+            row = {"portal": portal, "node": int(node), **dict.fromkeys(RANKS)}
+            row.update(path)
+            row["lineage"] = "; ".join(name for _, name in path)
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["portal", "node"] + RANKS + ["lineage"])
@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from config import HASH_CACHE_PATH, VERIFY_WORKERS
+
+HASH_CHUNK = 1 << 23  # Bytes read and hashed at a time
+VERIFY_COLUMNS = ["file_name", "status", "expected_md5", "actual_md5", "size", "mtime_ns"]
+
+def md5_file(path, chunk_size=HASH_CHUNK):
+    """
+    Return the md5 hex digest of a file, read in large chunks into one reused buffer.
+
+    Both the read and hashlib's update release the GIL on large buffers, so
+    several files can be hashed from threads at disk speed.
+    """
+    md5 = hashlib.md5()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            md5.update(view[:size])
+    return md5.hexdigest()
+
+class HashCache:
+    """
+    Remember the md5 of files by path, size and mtime_ns, so unchanged files are never rehashed.
+
+    Safe to share between threads; call save() once the work is done.
+
+    Args:
+        path (str): Location of the JSON cache.
+    """
+    def __init__(self, path=HASH_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def lookup(self, path, stat):
+        """
+        Return the cached md5 of a file if its size and mtime_ns are unchanged, else None.
+        """
+        with self.lock:
+            entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return entry["md5"]
+
+    def record(self, path, md5, stat=None):
+        """
+        Store the md5 of a file together with its current (or given) size and mtime_ns.
+        """
+        stat = stat or os.stat(path)
+        with self.lock:
+            self.entries[os.path.abspath(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "md5": md5}
+
+    def save(self):
+        """
+        Write the cache atomically.
+        """
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+def _verify_file(name, expected, directory, cache):
+    """
+    Hash one file (unless cached) and compare it with its expected md5sum.
+    """
+    path = os.path.join(directory, name)
+    row = {"file_name": name, "status": "MISSING", "expected_md5": expected or "",
+           "actual_md5": "", "size": None, "mtime_ns": None}
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return row
+    md5 = cache.lookup(path, stat) if cache is not None else None
+    if md5 is None:
+        md5 = md5_file(path)
+        if cache is not None:
+            cache.record(path, md5, stat)
+    if not expected:
+        status = "UNLISTED"
+    else:
+        status = "OK" if md5 == expected else "MISMATCH"
+    row.update(status=status, actual_md5=md5, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    return row
+
+def verify_files(files, directory, workers=VERIFY_WORKERS, cache=None):
+    """
+    Check the md5sum of archives against the listing, hashing several at a time in threads.
+
+    Args:
+        files (pd.DataFrame): Rows with file_name and md5sum (e.g. download_table).
+        directory (str): Directory of the archives.
+        workers (int): Number of files hashed at the same time.
+        cache (HashCache, optional): Digests of files already hashed; updated in place.
+
+    Returns:
+        pd.DataFrame: One row per file with VERIFY_COLUMNS; status is OK, MISMATCH,
+            MISSING or UNLISTED (no md5sum in the listing).
+    """
+    tasks = [
+        (name, None if pd.isna(md5) else md5)
+        for name, md5 in zip(files["file_name"], files["md5sum"])
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        rows = list(executor.map(lambda task: _verify_file(*task, directory, cache), tasks))
+    return pd.DataFrame(rows, columns=VERIFY_COLUMNS)
+
+def load_verification(report_path, directory):
+    """
+    Read a verification report, keeping only the rows that still describe the file on disk.
+
+    A row goes stale when its archive is replaced or removed after verification
+    (e.g. re-downloaded), so its status no longer applies.
+
+    Args:
+        report_path (str): CSV written by verify_files.
+        directory (str): Directory of the archives.
+
+    Returns:
+        pd.DataFrame: Current rows of the report (empty if there is no report).
+    """
+    if not os.path.exists(report_path):
+        return pd.DataFrame(columns=VERIFY_COLUMNS)
+    report = pd.read_csv(report_path, dtype={"file_name": str, "status": str}, keep_default_na=False)
+    current = []
+    for name, size, mtime_ns in zip(report["file_name"], report["size"], report["mtime_ns"]):
+        try:
+            stat = os.stat(os.path.join(directory, name))
+            current.append(str(stat.st_size) == str(size) and str(stat.st_mtime_ns) == str(mtime_ns))
+        except FileNotFoundError:
+            current.append(False)
+    return report[pd.Series(current, index=report.index, dtype=bool)]
+
+def mismatched_files(verification):
+    """
+    Names of the archives whose md5 does not match the listing.
+    """
+    return list(verification.loc[verification["status"] == "MISMATCH", "file_name"])
+
+def verified_md5sums(verification):
+    """
+    Map file names to the md5 actually hashed, for the archives that did not fail their check.
+
+    Unlisted archives thereby get a content key too (see input_keys).
+    """
+    verified = verification[verification["status"].isin(["OK", "UNLISTED"])]
+    return dict(zip(verified["file_name"], verified["actual_md5"]))
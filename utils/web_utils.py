@@ -3,18 +3,98 @@ import json
 import requests
 import time
 import csv
+import hashlib
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-from config import JGI_API_BASE_URL, FILES_PER_PAGE, JSON_DIR, REQUEST_DELAY, ALL_FILES_METADATA_PATH
+from requests.adapters import HTTPAdapter
+from config import (JGI_API_BASE_URL, FILES_PER_PAGE, JSON_DIR, REQUESTS_PER_SECOND, REQUEST_BURST,
+                    FETCH_WORKERS, PAGE_WORKERS, PARSE_WORKERS, ALL_FILES_METADATA_PATH,
+                    ALL_FILES_METADATA_PARQUET_PATH, PAGE_STORE, METADATA_DB, METADATA_DB_PATH)
+from utils.cache_utils import FetchManifest
+from utils.page_store import page_path, store_path, write_page, read_page, iter_pages, remove_pages
+from utils.metadata_db import FileTableWriter, write_frame
 
-def download_mycocosm_fungi_table(url, output_csv_file):
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+METADATA_FIELDS = [
+    "organism", "file_name", "file_id", "_id", "file_status", "md5sum",
+    "file_date", "ncbi_taxon_id", "jat_label", "ncbi_taxon_class",
+    "ncbi_taxon_family", "ncbi_taxon_order", "ncbi_taxon_genus",
+    "ncbi_taxon_species", "file_type", "portal_display_location"
+]
+CATEGORICAL_FIELDS = {
+    "organism", "file_status", "jat_label", "ncbi_taxon_class", "ncbi_taxon_family",
+    "ncbi_taxon_order", "ncbi_taxon_genus", "ncbi_taxon_species", "file_type",
+    "portal_display_location"
+}
+EXPORT_BATCH_SIZE = 50000  # Rows written to each output at a time
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every worker talking to the JGI API.
+
+    Args:
+        rate (float): Tokens added to the bucket per second.
+        burst (int): Maximum number of tokens the bucket can hold.
+    """
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=REQUEST_BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request token is available and consume it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def create_session(header, pool_size=FETCH_WORKERS):
+    """
+    Create a keep-alive HTTP session whose connection pool fits the worker count.
+
+    Args:
+        header (dict): Headers sent with every request (e.g. authentication).
+        pool_size (int): Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: Session ready to be shared between threads.
+    """
+    session = requests.Session()
+    session.headers.update(header)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def download_mycocosm_fungi_table(url, output_csv_file, db_path=METADATA_DB_PATH):
     """
     Downloads the HTML table from the given MycoCosm URL and saves it as a CSV file.
 
+    With METADATA_DB enabled the table is also loaded into the portals table of
+    the metadata database, indexed by portal.
+
     Args:
         url (str): The URL of the web page containing the table.
         output_csv_file (str): The name of the CSV file to save the data to.
+        db_path (str or None): SQLite database to load, None to skip it.
     """
     try:
         # Fetch the HTML content
@@ -65,16 +145,127 @@ def download_mycocosm_fungi_table(url, output_csv_file):
 
         print(f"\n✅ Successfully saved table with links to {output_csv_file}")
 
+        if METADATA_DB and db_path:
+            write_frame(df, "portals", output_csv_file, indexes=["portal"], path=db_path)
+            print(f"✅ Loaded the portal table into {db_path}")
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
-def fetch_all_files(organism_id, header):
+def _page_files(data):
+    return data.get("organisms", [{}])[0].get("files", [])
+
+def _file_total(data):
+    """
+    Read the number of files announced by an api_version=2 response.
+
+    Args:
+        data (dict): Decoded JSON of a listing page.
+
+    Returns:
+        int or None: Number of files, or None if the response carries no file total.
+    """
+    organism = (data.get("organisms") or [{}])[0]
+    for source in (organism, data):
+        for key in ("file_total", "total", "count"):
+            total = source.get(key)
+            if isinstance(total, int) and total > 0:
+                return total
+    return None
+
+def _total_pages(data):
+    """
+    Read the number of listing pages announced by an api_version=2 response.
+
+    Args:
+        data (dict): Decoded JSON of the first page.
+
+    Returns:
+        int or None: Number of pages, or None if the response carries no file total.
+    """
+    total = _file_total(data)
+    return -(-total // FILES_PER_PAGE) if total else None
+
+def _listing_hash(data):
+    """
+    Fingerprint a listing from its first page: the page's files plus the announced file total.
+
+    Files added or changed after page 1 leave the page as is; _cache_current covers them.
+    """
+    payload = json.dumps({"files": _page_files(data), "total": _file_total(data)}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _fetch_page(session, limiter, params, organism_id, page):
+    print(f"Fetching page {page} for {organism_id}...")
+    limiter.acquire()
+    response = session.get(JGI_API_BASE_URL, params={**params, "p": page})
+    response.raise_for_status()
+    return response.json()
+
+def _cache_current(session, limiter, params, organism_id, entry, data):
+    """
+    Check that a complete cached listing whose first page is unchanged still matches the API.
+
+    The cached files must add up to the announced file total, so any insertion
+    or deletion is caught when the response has one. The listing is sorted
+    ascending with a fixed page size, so a change on a middle page also shifts
+    files into or out of the last page; the last cached page must therefore
+    match its fresh copy and the page after it must still be empty. A file
+    replaced by another on a middle page, with no change in count, is only
+    picked up by a full refetch.
+
+    Args:
+        data (dict): Fresh first page.
+
+    Returns:
+        bool: True if the cached listing can be kept.
+    """
+    last_page = entry["pages"]
+    try:
+        cached_pages = list(iter_pages(organism_id, entry))
+    except (OSError, ValueError):
+        return False
+    total = _file_total(data)
+    if total is not None and sum(len(_page_files(page)) for page in cached_pages) != total:
+        return False
+    if last_page > 1:
+        if _page_files(_fetch_page(session, limiter, params, organism_id, last_page)) != _page_files(cached_pages[-1]):
+            return False
+    return not _page_files(_fetch_page(session, limiter, params, organism_id, last_page + 1))
+
+def _save_page(organism_id, page, data, fmt, manifest=None, listing_hash=None):
+    current_files = _page_files(data)
+    print(f"Found {len(current_files)} files on page {page} for {organism_id}.")
+
+    # Save current page to the JSON folder and index it in the manifest
+    store_size = manifest.get(organism_id)["store_size"] if manifest and page > 1 else 0
+    offset, end = write_page(organism_id, page, data, fmt, store_size)
+    if manifest:
+        manifest.record_page(organism_id, page, listing_hash, fmt if page == 1 else None, offset, end)
+    location = page_path(organism_id, page) if fmt == "json" else store_path(organism_id)
+    print(f"✅ Saved page {page} to {location}")
+    return len(current_files)
+
+def fetch_all_files(organism_id, header, session=None, limiter=None, manifest=None, revalidate=False):
     """
     Fetch the json listing of all files for a given organism ID from JGI API.
 
+    Page 1 is fetched first; the remaining pages are then requested concurrently,
+    either all at once when the response announces a file total or PAGE_WORKERS
+    pages ahead otherwise. Pages are still saved in page order.
+
+    With a manifest, an interrupted listing resumes after its last saved page, and
+    revalidation re-downloads a complete listing if its first page, its file
+    count, its last page or the page after it changed (see _cache_current).
+
     Args:
         organism_id (str): The ID of the organism to fetch files for.
+        header (dict): Request headers, used when no session is given.
+        session (requests.Session, optional): Pooled session shared between workers.
+        limiter (RateLimiter, optional): Token bucket shared between workers.
+        manifest (FetchManifest, optional): Cache manifest recording saved pages.
+        revalidate (bool): Check a complete cached listing for changes.
     """
     print(f"Fetching all files for {organism_id} from JGI...")
     params = {
@@ -83,7 +274,6 @@ def fetch_all_files(organism_id, header):
         "a": "false",  # Exclude archived
         "h": "false",  # Exclude hidden
         "d": "asc",    # Sort ascending
-        "p": 1,        # Page number (start at 1)
         "x": FILES_PER_PAGE,  # Files per page
         "t": "simple"
     }
@@ -91,43 +281,82 @@ def fetch_all_files(organism_id, header):
     # Create the JSON folder if it doesn't exist
     os.makedirs(JSON_DIR, exist_ok=True)
 
-    page = 1
+    if limiter is None:
+        limiter = RateLimiter()
+
+    entry = manifest.get(organism_id) if manifest else None
+    cached_pages = entry["pages"] if entry else 0
+    cached_format = entry["format"] if entry else None
+    resume = entry is not None and not entry["complete"] and not revalidate and cached_pages > 0
+    # Pages can only be indexed into a consolidated store when a manifest is kept
+    fmt = cached_format if resume else (PAGE_STORE if manifest else "json")
     total_files = 0
+    last_page = 0
 
+    # A session created here is closed here; a shared one belongs to the caller
+    own_session = session is None
+    if own_session:
+        session = create_session(header, pool_size=PAGE_WORKERS)
     try:
-        while True:
-            params["p"] = page  # Update page number
-            print(f"Fetching page {page} for {organism_id}...")
-            response = requests.get(JGI_API_BASE_URL, params=params, headers=header)
-            response.raise_for_status()
-            data = response.json()
-
-            # Get files from the current page
-            current_files = data.get("organisms", [{}])[0].get("files", [])
-            if not current_files:  # Break if no files are returned
-                print(f"No more files found for {organism_id}. Stopping pagination.")
-                break
-
-            total_files += len(current_files)
-            print(f"Found {len(current_files)} files on page {page} for {organism_id}.")
-
-            # Save current page to a JSON file in the JSON folder
-            page_filename = os.path.join(JSON_DIR, f"all_files_{organism_id}_page_{page}.json")
-            with open(page_filename, "w") as f:
-                json.dump(data, f, indent=2)
-            print(f"✅ Saved page {page} to {page_filename}")
-
-            page += 1
-            time.sleep(REQUEST_DELAY)  # Delay between requests
-
-        if total_files == 0:
+        if resume:
+            print(f"Resuming {organism_id} after cached page {cached_pages}...")
+            data = read_page(organism_id, entry, 1)
+            last_page = cached_pages
+        else:
+            data = _fetch_page(session, limiter, params, organism_id, 1)
+            listing_hash = _listing_hash(data)
+            if (revalidate and entry and listing_hash == entry["listing_hash"]
+                    and _cache_current(session, limiter, params, organism_id, entry, data)):
+                print(f"🗂️ Listing unchanged for {organism_id}, keeping cached JSON.")
+                manifest.mark_complete(organism_id, cached_pages)
+                return cached_pages > 0
+            if _page_files(data):
+                total_files += _save_page(organism_id, 1, data, fmt, manifest, listing_hash)
+                last_page = 1
+
+        if last_page:
+            # Fetch the announced pages all at once, then probe one page past them;
+            # without a total, keep PAGE_WORKERS pages in flight until one comes back empty
+            total_pages = _total_pages(data)
+            page = last_page + 1
+            window = total_pages - last_page if total_pages else PAGE_WORKERS
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                while True:
+                    pages = range(page, page + max(window, 1))
+                    futures = [executor.submit(_fetch_page, session, limiter, params, organism_id, p) for p in pages]
+                    exhausted = False
+                    for p, future in zip(pages, futures):
+                        if exhausted:
+                            future.cancel()
+                            continue
+                        data = future.result()
+                        if not _page_files(data):
+                            exhausted = True
+                            continue
+                        total_files += _save_page(organism_id, p, data, fmt, manifest)
+                        last_page = p
+                    if exhausted:
+                        break
+                    page += len(pages)
+                    window = 1 if total_pages else PAGE_WORKERS
+        print(f"No more files found for {organism_id}. Stopping pagination.")
+
+        # Drop pages left over from a longer cached listing or from another storage format
+        if cached_format and cached_format != fmt:
+            remove_pages(organism_id, cached_format, 1, cached_pages)
+        else:
+            remove_pages(organism_id, fmt, last_page + 1, cached_pages)
+        if manifest:
+            manifest.mark_complete(organism_id, last_page)
+
+        if last_page == 0:
             print(f"❌ No files found for {organism_id} across any pages.")
         else:
             print(f"✅ Total {total_files} files saved for {organism_id}.")
-        return total_files > 0
+        return last_page > 0
 
     except requests.exceptions.HTTPError as e:
-        print(f"HTTP error for {organism_id}: {e} - {response.status_code}: {response.text}")
+        print(f"HTTP error for {organism_id}: {e} - {e.response.status_code}: {e.response.text}")
         return False
     except requests.exceptions.RequestException as e:
         print(f"Request error for {organism_id}: {e}")
@@ -135,106 +364,200 @@ def fetch_all_files(organism_id, header):
     except Exception as e:
         print(f"General error for {organism_id}: {e}")
         return False
+    finally:
+        if own_session:
+            session.close()
+
+def fetch_organisms(organism_ids, header, workers=FETCH_WORKERS, manifest=None, revalidate=()):
+    """
+    Fetch the file listings of several organisms concurrently.
+
+    All workers share one keep-alive session and one token bucket, so the total
+    request rate stays within REQUESTS_PER_SECOND whatever the worker count.
+
+    Args:
+        organism_ids (list): Organism IDs to fetch.
+        header (dict): Request headers (e.g. authentication).
+        workers (int): Number of organisms fetched at the same time.
+        manifest (FetchManifest, optional): Cache manifest recording saved pages.
+        revalidate (iterable): Organisms whose complete cached listing should be checked for changes.
+
+    Returns:
+        dict: Organism ID -> True if any files were saved for it.
+    """
+    limiter = RateLimiter()
+    revalidate = set(revalidate)
+    with create_session(header, pool_size=workers * PAGE_WORKERS) as session, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            organism_id: executor.submit(fetch_all_files, organism_id, header, session, limiter,
+                                         manifest, organism_id in revalidate)
+            for organism_id in organism_ids
+        }
+        return {organism_id: future.result() for organism_id, future in futures.items()}
     
-def parse_and_export(organism_ids):
-    found = []
+def _missing_files_row(organism_id):
+    row = dict.fromkeys(METADATA_FIELDS, "")
+    row["organism"] = organism_id
+    row["file_name"] = "NO FILES FOUND"
+    return row
+
+def _file_row(organism_id, file):
+    metadata = file.get("metadata", {})
+    ncbi_taxon = metadata.get("ncbi_taxon", {})
+    portal = metadata.get("portal", {})
+    return {
+        "organism": organism_id,
+        "file_name": file.get("file_name"),
+        "file_id": file.get("file_id"),
+        "_id": file.get("_id"),
+        "file_status": file.get("file_status"),
+        "md5sum": file.get("md5sum"),
+        "file_date": file.get("file_date"),
+        "ncbi_taxon_id": metadata.get("ncbi_taxon_id", ""),
+        "jat_label": metadata.get("jat_label", ""),
+        "ncbi_taxon_class": ncbi_taxon.get("ncbi_taxon_class", ""),
+        "ncbi_taxon_family": ncbi_taxon.get("ncbi_taxon_family", ""),
+        "ncbi_taxon_order": ncbi_taxon.get("ncbi_taxon_order", ""),
+        "ncbi_taxon_genus": ncbi_taxon.get("ncbi_taxon_genus", ""),
+        "ncbi_taxon_species": ncbi_taxon.get("ncbi_taxon_species", ""),
+        "file_type": file.get("file_type", ""),
+        "portal_display_location": portal.get("display_location", "")
+    }
+
+def _parse_organism(organism_id, entry):
+    """
+    Parse the cached listing pages of one organism into metadata rows.
+
+    Args:
+        organism_id (str): Organism to parse.
+        entry (dict or None): Manifest entry locating the cached pages.
+
+    Returns:
+        list: One dict per file, or a single "NO FILES FOUND" row.
+    """
+    if not entry or not entry["pages"]:
+        print(f"No JSON files found for {organism_id} in {JSON_DIR}. Skipping.")
+        return [_missing_files_row(organism_id)]
+
+    print(f"Processing files for {organism_id}...")
+    rows = []
+    for page, data in enumerate(iter_pages(organism_id, entry), start=1):
+        files = _page_files(data)
+        print(f"Found {len(files)} files on page {page} of {organism_id}.")
+        rows.extend(_file_row(organism_id, file) for file in files)
+
+    # If no match found across all pages
+    if not rows:
+        print(f"⚠️ No files in parsed pages for {organism_id}.")
+        rows.append(_missing_files_row(organism_id))
+    return rows
+
+def iter_file_metadata(organism_ids, manifest=None, workers=PARSE_WORKERS):
+    """
+    Stream the file metadata rows of the cached listings, organism by organism.
+
+    JSON decoding is spread over a process pool; rows are still yielded in the order
+    of organism_ids and, within an organism, in page order.
+
+    Args:
+        organism_ids (list): Organisms to parse.
+        manifest (FetchManifest, optional): Cache manifest giving the pages of each organism.
+        workers (int): Number of processes decoding pages (1 = in-process).
+
+    Yields:
+        dict: One metadata row per file.
+    """
+    manifest = manifest or FetchManifest()
+    entries = [manifest.get(o) for o in organism_ids]
+    if workers <= 1:
+        for organism_id, entry in zip(organism_ids, entries):
+            yield from _parse_organism(organism_id, entry)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(_parse_organism, organism_ids, entries, chunksize=8):
+            yield from rows
+
+def _batches(rows, batch_size=EXPORT_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _parquet_schema():
+    return pa.schema([
+        (field, pa.dictionary(pa.int32(), pa.string()) if field in CATEGORICAL_FIELDS else pa.string())
+        for field in METADATA_FIELDS
+    ])
+
+def _parquet_table(batch, schema):
+    # Empty strings become nulls, matching what pandas reads back from the CSV
+    columns = {
+        field: [None if row[field] in ("", None) else str(row[field]) for row in batch]
+        for field in METADATA_FIELDS
+    }
+    table = pa.table({field: pa.array(values, pa.string()) for field, values in columns.items()})
+    return table.cast(schema)
+
+def parse_and_export(organism_ids, manifest=None, workers=PARSE_WORKERS, parquet_path=ALL_FILES_METADATA_PARQUET_PATH,
+                     db_path=METADATA_DB_PATH):
+    """
+    Parse the cached listings and write ALL_FILES_METADATA_PATH in a single pass.
+
+    Rows are streamed from the page cache straight into the CSV and, when pyarrow
+    is installed, into a Parquet copy with dictionary-encoded categorical columns.
+    With METADATA_DB enabled they are also loaded into the indexed files table
+    of the metadata database, which replaces the previous table only once the
+    CSV is complete.
+
+    Args:
+        organism_ids (list): Organisms to export, in output order.
+        manifest (FetchManifest, optional): Cache manifest giving the pages of each organism.
+        workers (int): Number of processes decoding pages.
+        parquet_path (str or None): Parquet output path, None to only write the CSV.
+        db_path (str or None): SQLite database to load, None to skip it.
+    """
     # Ensure the JSON folder exists
     if not os.path.exists(JSON_DIR):
         print(f"No {JSON_DIR} folder found. Please run fetch_all_files() first.")
         return
+    if parquet_path and pa is None:
+        print("⚠️ pyarrow is not installed, skipping the Parquet export.")
+        parquet_path = None
+    if not METADATA_DB:
+        db_path = None
 
-    for organism_id in organism_ids:
-        json_files = [f for f in os.listdir(JSON_DIR) if f.startswith(f"all_files_{organism_id}_page_") and f.endswith(".json")]
-        if not json_files:
-            print(f"No JSON files found for {organism_id} in {JSON_DIR}. Skipping.")
-            found.append({
-                "organism": organism_id,
-                "file_name": "NO FILES FOUND",
-                "file_id": "",
-                "_id": "",
-                "file_status": "",
-                "md5sum": "",
-                "file_date": "",
-                "ncbi_taxon_id": "",
-                "jat_label": "",
-                "ncbi_taxon_class": "",
-                "ncbi_taxon_family": "",
-                "ncbi_taxon_order": "",
-                "ncbi_taxon_genus": "",
-                "ncbi_taxon_species": "",
-                "file_type": "",
-                "portal_display_location": ""
-            })
-            continue
-
-        print(f"Processing files for {organism_id}...")
-        organism_file_count = 0
-        
-        for json_file in sorted(json_files):  # Sort to process pages in order
-            json_file_path = os.path.join(JSON_DIR, json_file)
-            print(f"Parsing {json_file}...")
-            with open(json_file_path, "r") as f:
-                data = json.load(f)
-
-            files = data.get("organisms", [{}])[0].get("files", [])
-            organism_file_count += len(files)
-            print(f"Found {len(files)} files in {json_file}.")
-
-            for file in files:
-                metadata = file.get("metadata", {})
-                ncbi_taxon = metadata.get("ncbi_taxon", {})
-                portal = metadata.get("portal", {})
-                
-                found.append({
-                    "organism": organism_id,
-                    "file_name": file.get("file_name"),
-                    "file_id": file.get("file_id"),
-                    "_id": file.get("_id"),
-                    "file_status": file.get("file_status"),
-                    "md5sum": file.get("md5sum"),
-                    "file_date": file.get("file_date"),
-                    "ncbi_taxon_id": metadata.get("ncbi_taxon_id", ""),
-                    "jat_label": metadata.get("jat_label", ""),
-                    "ncbi_taxon_class": ncbi_taxon.get("ncbi_taxon_class", ""),
-                    "ncbi_taxon_family": ncbi_taxon.get("ncbi_taxon_family", ""),
-                    "ncbi_taxon_order": ncbi_taxon.get("ncbi_taxon_order", ""),
-                    "ncbi_taxon_genus": ncbi_taxon.get("ncbi_taxon_genus", ""),
-                    "ncbi_taxon_species": ncbi_taxon.get("ncbi_taxon_species", ""),
-                    "file_type": file.get("file_type", ""),
-                    "portal_display_location": portal.get("display_location", "")
-                })
-                    
-        # If no match found across all pages
-        if organism_file_count == 0:
-            print(f"⚠️ No files in parsed pages for {organism_id}.")
-            found.append({
-                "organism": organism_id,
-                "file_name": "NO FILES FOUND",
-                "file_id": "",
-                "_id": "",
-                "file_status": "",
-                "md5sum": "",
-                "file_date": "",
-                "ncbi_taxon_id": "",
-                "jat_label": "",
-                "ncbi_taxon_class": "",
-                "ncbi_taxon_family": "",
-                "ncbi_taxon_order": "",
-                "ncbi_taxon_genus": "",
-                "ncbi_taxon_species": "",
-                "file_type": "",
-                "portal_display_location": ""
-            })
-
-        # Export to CSV
-        output_file = ALL_FILES_METADATA_PATH
-        with open(output_file, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "organism", "file_name", "file_id", "_id", "file_status", "md5sum",
-                "file_date", "ncbi_taxon_id", "jat_label", "ncbi_taxon_class",
-                "ncbi_taxon_family", "ncbi_taxon_order", "ncbi_taxon_genus",
-                "ncbi_taxon_species", "file_type", "portal_display_location"
-            ])
+    rows = iter_file_metadata(organism_ids, manifest, workers)
+    schema = _parquet_schema() if parquet_path else None
+    parquet_writer = None
+    db_writer = FileTableWriter(METADATA_FIELDS, db_path) if db_path else None
+    try:
+        with open(ALL_FILES_METADATA_PATH, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=METADATA_FIELDS)
             writer.writeheader()
-            writer.writerows(found)
-    
\ No newline at end of file
+            for batch in _batches(rows):
+                writer.writerows(batch)
+                if schema is not None:
+                    table = _parquet_table(batch, schema)
+                    if parquet_writer is None:
+                        parquet_writer = pq.ParquetWriter(parquet_path, table.schema)
+                    parquet_writer.write_table(table)
+                if db_writer is not None:
+                    db_writer.write(batch)
+    except BaseException:
+        if db_writer is not None:
+            db_writer.abort()
+        raise
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    print(f"✅ Exported file metadata to {ALL_FILES_METADATA_PATH}")
+    if parquet_writer is not None:
+        print(f"✅ Exported columnar file metadata to {parquet_path}")
+    if db_writer is not None:
+        db_writer.commit(ALL_FILES_METADATA_PATH)
+        print(f"✅ Loaded file metadata into {db_path}")
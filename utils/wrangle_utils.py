@@ -1,9 +1,21 @@
 import os
+import re
 import sys
-import shutil
-import gzip
+import json
+import zipfile
 import pandas as pd
-from Bio import SeqIO
+from itertools import chain
+from contextlib import contextmanager, ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.fasta_utils import read_fasta, write_fasta
+from utils.fasta_index import IndexWriter
+from utils.decompress_utils import open_gzip, open_gzip_stream, resolve_backend
+from utils.build_utils import build_key, input_keys
+from utils.verify_utils import mismatched_files
+from config import RENAME_RULES_PATH
+
+RENAME_SCHEME = "jgi|portal|id -> portal-id"  # Part of the rename build key: change it when the rules change
+FASTA_EXTENSIONS = (".fasta", ".fa", ".faa", ".fas", ".aa")  # Archive members read as proteomes, optionally gzipped
 
 def validate_directories(dirs):
     """
@@ -19,20 +31,166 @@ def validate_directories(dirs):
         if not os.path.isdir(d):
             sys.exit(f"❌ Directory not found: {d}")
 
-def find_missing_files(expected_files, available_files):
+def find_missing_files(expected_files, available_files, verification=None):
     """
     Find files that are expected but not available.
 
     Args:
         expected_files (iterable): List or Series of expected filenames.
         available_files (set): Set of filenames that are present.
+        verification (pd.DataFrame, optional): Report from load_verification; files
+            that failed their md5 check count as missing.
 
     Returns:
         list: Filenames that are missing.
     """
+    if verification is not None:
+        available_files = set(available_files) - set(mismatched_files(verification))
     return [f for f in expected_files if f not in available_files]
 
-def extract_files(proteome_data, compressed_dir, extracted_dir):
+def run_tasks(func, tasks, workers=1, on_error=None, threads=False):
+    """
+    Call func(*task) for every task, fanning out to a process pool when workers > 1.
+
+    Results are returned in task order whatever order the workers finish in, so
+    outputs built from them are identical to a serial run. A task that raises is
+    reported and replaced by on_error(task) instead of aborting the batch.
+
+    Args:
+        func (callable): Module-level function to run for each task.
+        tasks (list): Argument tuples, one per task.
+        workers (int): Number of worker processes (1 = run in this process).
+        on_error (callable, optional): Builds the result of a failed task.
+        threads (bool): Use a thread pool instead, for tasks that spend their time
+            outside the GIL, such as decompression.
+
+    Returns:
+        list: One result per task.
+    """
+    def failed(task, e):
+        print(f"❌ Task {task} failed: {e}")
+        return on_error(task) if on_error else None
+
+    if workers <= 1:
+        results = []
+        for task in tasks:
+            try:
+                results.append(func(*task))
+            except Exception as e:
+                results.append(failed(task, e))
+        return results
+
+    results = []
+    pool = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with pool(max_workers=workers) as executor:
+        futures = [executor.submit(func, *task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(failed(task, e))
+    return results
+
+def run_incremental(stage, func, tasks, names, keys, outputs, manifest=None, workers=1, on_error=None, threads=False):
+    """
+    Run tasks like run_tasks, reusing the recorded result of tasks that are up to date.
+
+    A task is skipped when the build manifest holds a result for its name under
+    the same key and the outputs of that result still exist. Fresh results with
+    outputs are recorded; a task that produced nothing is forgotten so that a
+    stale output is never reused.
+
+    Args:
+        stage (str): Stage name in the build manifest.
+        func (callable): Module-level function to run for each task.
+        tasks (list): Argument tuples, one per task.
+        names (list): Identity of each task within the stage.
+        keys (list): Build key of each task (None = always run).
+        outputs (callable): Maps (task, result) to the paths the task produced.
+        manifest (BuildManifest, optional): Build manifest; None runs every task.
+        workers (int): Number of worker processes.
+        on_error (callable, optional): Builds the result of a failed task.
+        threads (bool): Run the tasks in threads (see run_tasks).
+
+    Returns:
+        list: One result per task.
+    """
+    results = [None] * len(tasks)
+    pending = []
+    for i, task in enumerate(tasks):
+        cached = manifest.lookup(stage, names[i], keys[i]) if manifest else None
+        paths = outputs(task, cached) if cached is not None else []
+        if paths and all(os.path.exists(path) for path in paths):
+            results[i] = cached
+        else:
+            pending.append(i)
+    if manifest and len(pending) < len(tasks):
+        print(f"⏭️ {stage}: {len(tasks) - len(pending)} up-to-date proteomes skipped")
+
+    fresh = run_tasks(func, [tasks[i] for i in pending], workers, on_error, threads)
+    for i, result in zip(pending, fresh):
+        results[i] = result
+        if manifest:
+            if outputs(tasks[i], result):
+                manifest.record(stage, names[i], keys[i], result)
+            else:
+                manifest.invalidate(stage, names[i])
+    return results
+
+def _rename_log(file_name, status):
+    return {
+        "file": file_name,
+        "total_sequences": 0,
+        "renamed_sequences": 0,
+        "first_id_before": status,
+        "first_id_after": status
+    }
+
+def extract_file(compressed_name, compressed_dir, extracted_dir, portal_name=""):
+    """
+    Extract one compressed proteome file (.gz or .zip) to a target directory.
+
+    Only the FASTA members of a .zip archive are written (see open_compressed_fasta),
+    one after the other into a single file.
+
+    Args:
+        compressed_name (str or NaN): File name in compressed_dir.
+        compressed_dir (str): Directory containing compressed files.
+        extracted_dir (str): Directory to extract files to.
+        portal_name (str): Portal of the proteome, to pick its members out of a shared archive.
+
+    Returns:
+        str: Path to the extracted file (empty string if extraction failed).
+    """
+    extracted_path = ""
+    if pd.isna(compressed_name):
+        return extracted_path
+    if not compressed_name.endswith((".gz", ".zip")):
+        print(f"⚠️ Skipping unsupported file: {compressed_name}")
+        return extracted_path
+    compressed_path = os.path.join(compressed_dir, compressed_name)
+    try:
+        with open_compressed_fasta(compressed_path, portal_name) as (output_name, handles):
+            output_path = os.path.join(extracted_dir, output_name)
+            with open(output_path, "wb") as f_out:
+                ends_with_newline = True
+                for handle in handles:
+                    # Keep the next member's first header on a line of its own
+                    if not ends_with_newline:
+                        f_out.write(b"\n")
+                    last = b""
+                    for chunk in iter(lambda: handle.read(1 << 20), b""):
+                        f_out.write(chunk)
+                        last = chunk
+                    ends_with_newline = not last or last.endswith(b"\n")
+        print(f"✅ Extracted {compressed_name} to {output_path}")
+        extracted_path = output_path
+    except Exception as e:
+        print(f"❌ Failed to extract {compressed_name}: {e}")
+    return extracted_path
+
+def extract_files(proteome_data, compressed_dir, extracted_dir, workers=1, manifest=None, md5sums=None,
+                  verification=None):
     """
     Extract compressed proteome files (.gz or .zip) to a target directory.
 
@@ -40,109 +198,357 @@ def extract_files(proteome_data, compressed_dir, extracted_dir):
         proteome_data (pd.DataFrame): DataFrame containing file metadata.
         compressed_dir (str): Directory containing compressed files.
         extracted_dir (str): Directory to extract files to.
+        workers (int): Number of files decompressed concurrently, in threads.
+        manifest (BuildManifest, optional): Skip files already extracted from the same content.
+        md5sums (dict, optional): file_name -> md5sum from the listing metadata.
+        verification (pd.DataFrame, optional): Report from load_verification; archives
+            that failed their md5 check are not extracted.
 
     Returns:
         list: Paths to the extracted files (empty string if extraction failed).
     """
-    extracted_files_column = []
-    for _, row in proteome_data.iterrows():
-        compressed_name = row["compressed_file"]
-        extracted_path = ""
-        if pd.isna(compressed_name):
-            extracted_files_column.append(extracted_path)
-            continue
-        compressed_path = os.path.join(compressed_dir, compressed_name)
-        if compressed_name.endswith(".gz"):
-            output_name = compressed_name[:-3]
-            output_path = os.path.join(extracted_dir, output_name)
-            try:
-                with gzip.open(compressed_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-                print(f"✅ Extracted {compressed_name} to {output_path}")
-                extracted_path = output_path
-            except Exception as e:
-                print(f"❌ Failed to extract {compressed_name}: {e}")
-        elif compressed_name.endswith(".zip"):
-            try:
-                shutil.unpack_archive(compressed_path, extracted_dir)
-                print(f"✅ Extracted {compressed_name} to {extracted_dir}")
-                extracted_path = extracted_dir
-            except Exception as e:
-                print(f"❌ Failed to extract {compressed_name}: {e}")
+    corrupt = set(mismatched_files(verification)) if verification is not None else set()
+    for name in sorted(corrupt & set(proteome_data["compressed_file"].dropna())):
+        print(f"⚠️ Skipping {name}: md5 mismatch")
+    tasks = [
+        (None if row["compressed_file"] in corrupt else row["compressed_file"],
+         compressed_dir, extracted_dir, row.get("portal", "").strip())
+        for _, row in proteome_data.iterrows()
+    ]
+    names = _task_names(proteome_data)
+    keys = [
+        build_key("extract", key, extracted_dir, *_member_key(task[0], task[3]))
+        for key, task in zip(input_keys(proteome_data, compressed_dir, md5sums), tasks)
+    ]
+    resolve_backend()  # Once, before the threads start
+    return run_incremental("extract", extract_file, tasks, names, keys,
+                           lambda task, path: [path] if path else [],
+                           manifest, workers, on_error=lambda task: "", threads=True)
+
+def load_rename_rules(path=RENAME_RULES_PATH):
+    """
+    Load and compile the per-portal header rename rules.
+
+    The file maps a portal to a list of {"pattern", "template"} rules for
+    proteomes whose headers are not in the "jgi|portal|id" format. The first
+    rule whose pattern matches the start of a sequence ID replaces the whole
+    header with the template expanded from the match (e.g. "Altbr1-\\1").
+
+    Args:
+        path (str): JSON rule table.
+
+    Returns:
+        dict: portal -> tuple of (compiled bytes pattern, bytes template).
+
+    Exits:
+        If a pattern does not compile, prints an error and exits the program.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        table = json.load(f)
+    rules = {}
+    for portal, portal_rules in table.items():
+        try:
+            rules[portal] = tuple(
+                (re.compile(rule["pattern"].encode()), rule["template"].encode()) for rule in portal_rules
+            )
+        except (re.error, KeyError) as e:
+            sys.exit(f"❌ Invalid rename rule for {portal}: {e}")
+    return rules
+
+def _rule_key(rules):
+    return [(pattern.pattern.decode(), template.decode()) for pattern, template in rules]
+
+def _rename_records(records, stats, rules=()):
+    """
+    Yield FASTA records with "jgi|portal|id" headers rewritten to "portal-id" and the
+    portal's custom rules applied, tallying stats.
+    """
+    for i, record in enumerate(records):
+        original_id = record.id
+        new_id = None
+        if original_id.startswith(b"jgi|"):
+            parts = original_id.split(b"|")
+            if len(parts) >= 3:
+                new_id = parts[1] + b"-" + parts[2]
+        for pattern, template in rules:
+            match = pattern.match(new_id or original_id)
+            if match:
+                new_id = match.expand(template)
+                break
+        if new_id is not None:
+            record.title = new_id
+            stats["renamed_sequences"] += 1
+        if i == 0:
+            stats["first_id_before"] = original_id.decode()
+            if new_id is not None or not original_id.startswith(b"jgi|"):
+                stats["first_id_after"] = (new_id or original_id).decode()
+        stats["total_sequences"] += 1
+        yield record
+
+def rename_fasta_stream(source, output_path, rules=()):
+    """
+    Rename the headers of a FASTA stream record by record and write the result.
+
+    Args:
+        source (str, file or list): Path or binary handle of the input FASTA, or a
+            list of them read one after the other.
+        output_path (str): Path of the renamed FASTA to write.
+        rules (tuple): Compiled custom rules of the proteome's portal.
+
+    Returns:
+        dict: Renaming summary (total/renamed counts, first ID before and after).
+    """
+    stats = {"total_sequences": 0, "renamed_sequences": 0, "first_id_before": "", "first_id_after": ""}
+    # The offsets come out of the write itself, so the cleanup stage never has to parse the file
+    with open(output_path, "wb") as fout, IndexWriter(output_path) as index:
+        sources = source if isinstance(source, list) else [source]
+        records = chain.from_iterable(read_fasta(s) for s in sources)
+        write_fasta(fout, _rename_records(records, stats, rules), index=index)
+    return stats
+
+def select_fasta_members(names, portal_name=""):
+    """
+    Pick the proteome members of an archive by name.
+
+    Members whose name ends with one of FASTA_EXTENSIONS, optionally followed by
+    .gz, are kept; hidden files and macOS metadata are not. When several are
+    left, those named after the portal (as a folder or a file name prefix) are
+    preferred, so that an archive bundling several portals maps each one to its
+    own files; otherwise all of them are taken as parts of the same proteome.
+
+    Args:
+        names (list): Member names of the archive.
+        portal_name (str): Portal of the proteome.
+
+    Returns:
+        list: Selected member names, sorted.
+    """
+    def is_fasta(name):
+        base = os.path.basename(name)
+        if not base or base.startswith(".") or name.startswith("__MACOSX/"):
+            return False
+        stem = base[:-3] if base.lower().endswith(".gz") else base
+        return stem.lower().endswith(FASTA_EXTENSIONS)
+
+    members = sorted(name for name in names if is_fasta(name))
+    if len(members) > 1 and portal_name:
+        own = re.compile(rf"(^|/){re.escape(portal_name)}([^A-Za-z0-9]|$)")
+        members = [name for name in members if own.search(name)] or members
+    return members
+
+def uncompressed_name(compressed_name, portal_name=""):
+    """
+    Name of the FASTA file a compressed proteome is extracted to.
+
+    Archives may be shared by several portals, so their name includes the portal.
+    """
+    if compressed_name.endswith(".gz"):
+        return compressed_name[:-3]
+    stem = compressed_name[:-len(".zip")]
+    if portal_name:
+        stem = f"{stem}_{portal_name}"
+    return stem if stem.lower().endswith(FASTA_EXTENSIONS) else f"{stem}.fasta"
+
+def _task_names(proteome_data):
+    """
+    Identity of each row in the build manifest.
+
+    Archives may be shared by several portals, so the name pairs the archive
+    with the portal; keyed by the archive alone, the portals of a shared
+    archive would overwrite each other's entry and rebuild on every run.
+    """
+    portals = proteome_data["portal"] if "portal" in proteome_data else [""] * len(proteome_data)
+    return [f"{name}|{str(portal).strip()}" for name, portal in zip(proteome_data["compressed_file"], portals)]
+
+def _member_key(compressed_name, portal_name):
+    """
+    Extra build key parts for archives, whose members are picked by extension and portal.
+    """
+    if isinstance(compressed_name, str) and compressed_name.endswith(".zip"):
+        return [list(FASTA_EXTENSIONS), portal_name]
+    return []
+
+@contextmanager
+def open_compressed_fasta(compressed_path, portal_name=""):
+    """
+    Open a compressed proteome as binary streams without extracting it to disk.
+
+    A .gz file is a single stream, decompressed by the fastest available backend
+    (see utils.decompress_utils). In a .zip archive only the FASTA members are
+    opened (see select_fasta_members), each streamed straight out of the archive
+    and decompressed on the fly if it is itself gzipped.
+
+    Args:
+        compressed_path (str): Path to a .gz file or a .zip archive.
+        portal_name (str): Portal of the proteome, to pick its members out of a shared archive.
+
+    Yields:
+        tuple: Name of the uncompressed file (see uncompressed_name) and a list of
+            binary handles on its content, to be read in order.
+    """
+    name = os.path.basename(compressed_path)
+    with ExitStack() as stack:
+        if name.endswith(".gz"):
+            handles = [stack.enter_context(open_gzip(compressed_path))]
+        elif name.endswith(".zip"):
+            archive = stack.enter_context(zipfile.ZipFile(compressed_path))
+            members = select_fasta_members([m.filename for m in archive.infolist() if not m.is_dir()], portal_name)
+            if not members:
+                raise ValueError("no FASTA member in archive")
+            if len(members) > 1:
+                print(f"ℹ️ Reading {len(members)} FASTA members of {name} as one proteome: {', '.join(members)}")
+            handles = []
+            for member in members:
+                handle = stack.enter_context(archive.open(member))
+                if member.lower().endswith(".gz"):
+                    handle = stack.enter_context(open_gzip_stream(handle))
+                handles.append(handle)
         else:
+            raise ValueError(f"unsupported file type: {name}")
+        yield uncompressed_name(name, portal_name), handles
+
+def process_proteome(compressed_name, portal_name, compressed_dir, renamed_dir, rules=()):
+    """
+    Decompress one proteome file and rename its FASTA headers in a single streaming pass.
+
+    Args:
+        compressed_name (str or NaN): File name in compressed_dir.
+        portal_name (str): Portal used to name the output file.
+        compressed_dir (str): Directory containing compressed files.
+        renamed_dir (str): Directory to save the renamed FASTA file.
+        rules (tuple): Compiled custom rules of the portal.
+
+    Returns:
+        tuple: Path to the renamed FASTA (empty string if processing failed) and its log row.
+    """
+    if pd.isna(compressed_name) or not compressed_name.endswith((".gz", ".zip")):
+        if not pd.isna(compressed_name):
             print(f"⚠️ Skipping unsupported file: {compressed_name}")
-        extracted_files_column.append(extracted_path)
-    return extracted_files_column
+        return "", _rename_log("MISSING", "MISSING")
+    compressed_path = os.path.join(compressed_dir, compressed_name)
+    if not os.path.exists(compressed_path):
+        # Logged as the two-step mode does when extraction finds nothing
+        print(f"❌ Failed to process {compressed_name}: file not found")
+        return "", _rename_log("MISSING", "MISSING")
+    input_name = uncompressed_name(compressed_name, portal_name)
+    try:
+        with open_compressed_fasta(compressed_path, portal_name) as (input_name, handles):
+            output_file_name = f"{portal_name}.fasta" if portal_name else input_name
+            output_path = os.path.join(renamed_dir, output_file_name)
+            stats = rename_fasta_stream(handles, output_path, rules)
+        print(f"✅ Renamed {stats['renamed_sequences']}/{stats['total_sequences']} headers from {compressed_name} in: {output_path}")
+        return output_path, {"file": input_name, **stats}
+    except Exception as e:
+        print(f"❌ Failed to process {compressed_name}: {e}")
+        return "", _rename_log(input_name, "ERROR")
+
+def _rename_keys(proteome_data, compressed_dir, renamed_dir, md5sums, rules):
+    """
+    Name and build key of the renamed output of each row, shared by the fused and two-step modes.
+
+    Only the rules of a row's own portal enter its key, so editing one portal's
+    rules rebuilds that proteome alone.
+    """
+    names = _task_names(proteome_data)
+    keys = []
+    for key, (_, row) in zip(input_keys(proteome_data, compressed_dir, md5sums), proteome_data.iterrows()):
+        portal_name = row.get("portal", "").strip()
+        keys.append(build_key("rename", key, portal_name, renamed_dir, RENAME_SCHEME,
+                              _rule_key(rules.get(portal_name, ())), *_member_key(row["compressed_file"], portal_name)))
+    return names, keys
+
+def _renamed_output(task, result):
+    return [result[0]] if result[0] else []
+
+def process_proteomes(proteome_data, compressed_dir, renamed_dir, workers=1, manifest=None, md5sums=None, rules=None):
+    """
+    Decompress proteome files and rename their FASTA headers in a single streaming pass.
+
+    No extracted copy is written: records are read from the compressed stream,
+    renamed and written straight to the renamed directory.
+
+    Args:
+        proteome_data (pd.DataFrame): DataFrame containing file metadata.
+        compressed_dir (str): Directory containing compressed files.
+        renamed_dir (str): Directory to save renamed FASTA files.
+        workers (int): Number of worker processes.
+        manifest (BuildManifest, optional): Skip proteomes already renamed from the same content.
+        md5sums (dict, optional): file_name -> md5sum from the listing metadata.
+        rules (dict, optional): Compiled custom rules by portal, from load_rename_rules.
+
+    Returns:
+        tuple:
+            list: Paths to renamed FASTA files (empty string if processing failed).
+            list: Log data for each file (dicts with file info and renaming summary).
+    """
+    rules = rules or {}
+    tasks = [
+        (row["compressed_file"], row.get("portal", "").strip(), compressed_dir, renamed_dir,
+         rules.get(row.get("portal", "").strip(), ()))
+        for _, row in proteome_data.iterrows()
+    ]
+    names, keys = _rename_keys(proteome_data, compressed_dir, renamed_dir, md5sums, rules)
+    results = run_incremental("rename", process_proteome, tasks, names, keys, _renamed_output,
+                              manifest, workers,
+                              on_error=lambda task: ("", _rename_log(str(task[0]), "ERROR")))
+    return [path for path, _ in results], [log for _, log in results]
+
+def rename_fasta_file(input_path, portal_name, renamed_dir, rules=()):
+    """
+    Rename the FASTA sequence headers of one extracted proteome file.
 
-def rename_fasta_headers(proteome_data, renamed_dir):
+    Args:
+        input_path (str): Path to the extracted FASTA file.
+        portal_name (str): Portal used to name the output file.
+        renamed_dir (str): Directory to save the renamed FASTA file.
+        rules (tuple): Compiled custom rules of the portal.
+
+    Returns:
+        tuple: Path to the renamed FASTA (empty string if renaming failed) and its log row.
+    """
+    if not input_path or not os.path.isfile(input_path):
+        return "", _rename_log(os.path.basename(input_path) if input_path else "MISSING", "MISSING")
+    output_file_name = f"{portal_name}.fasta" if portal_name else os.path.basename(input_path)
+    output_path = os.path.join(renamed_dir, output_file_name)
+    try:
+        stats = rename_fasta_stream(input_path, output_path, rules)
+        print(f"✅ Renamed {stats['renamed_sequences']}/{stats['total_sequences']} headers in: {output_path}")
+        return output_path, {"file": os.path.basename(input_path), **stats}
+    except Exception as e:
+        print(f"❌ Failed to rename headers in {input_path}: {e}")
+        return "", _rename_log(os.path.basename(input_path), "ERROR")
+
+def rename_fasta_headers(proteome_data, renamed_dir, workers=1, manifest=None, compressed_dir=None, md5sums=None, rules=None):
     """
     Rename FASTA sequence headers for extracted proteome files and log the changes.
 
     Args:
         proteome_data (pd.DataFrame): DataFrame containing file metadata and extracted file paths.
         renamed_dir (str): Directory to save renamed FASTA files.
+        workers (int): Number of worker processes.
+        manifest (BuildManifest, optional): Skip proteomes already renamed from the same content.
+        compressed_dir (str, optional): Directory of the compressed inputs the build keys are taken from.
+        md5sums (dict, optional): file_name -> md5sum from the listing metadata.
+        rules (dict, optional): Compiled custom rules by portal, from load_rename_rules.
 
     Returns:
         tuple:
             list: Paths to renamed FASTA files (empty string if renaming failed).
             list: Log data for each file (dicts with file info and renaming summary).
     """
-    renamed_file_column = []
-    log_data = []
-    for _, row in proteome_data.iterrows():
-        input_path = row.get("extracted_file", "")
-        if not input_path or not os.path.isfile(input_path):
-            renamed_file_column.append("")
-            log_data.append({
-                "file": os.path.basename(input_path) if input_path else "MISSING",
-                "total_sequences": 0,
-                "renamed_sequences": 0,
-                "first_id_before": "MISSING",
-                "first_id_after": "MISSING"
-            })
-            continue
-        portal_name = row.get("portal", "").strip()
-        output_file_name = f"{portal_name}.fasta" if portal_name else os.path.basename(input_path)
-        output_path = os.path.join(renamed_dir, output_file_name)
-        renamed_file_column.append(output_path)
-        try:
-            records = list(SeqIO.parse(input_path, "fasta"))
-            total_seqs = len(records)
-            renamed_count = 0
-            first_original_id = records[0].id if records else ""
-            first_renamed_id = ""
-            for i, record in enumerate(records):
-                original_id = record.id
-                if record.id.startswith("jgi|"):
-                    parts = record.id.split("|")
-                    if len(parts) >= 3:
-                        new_id = f"{parts[1]}-{parts[2]}"
-                        record.id = new_id
-                        record.description = new_id
-                        renamed_count += 1
-                        if i == 0:
-                            first_renamed_id = new_id
-                elif i == 0:
-                    first_renamed_id = original_id
-            with open(output_path, "w") as fout:
-                SeqIO.write(records, fout, "fasta")
-            print(f"✅ Renamed {renamed_count}/{total_seqs} headers in: {output_path}")
-            log_data.append({
-                "file": os.path.basename(input_path),
-                "total_sequences": total_seqs,
-                "renamed_sequences": renamed_count,
-                "first_id_before": first_original_id,
-                "first_id_after": first_renamed_id
-            })
-        except Exception as e:
-            print(f"❌ Failed to rename headers in {input_path}: {e}")
-            renamed_file_column[-1] = ""
-            log_data.append({
-                "file": os.path.basename(input_path),
-                "total_sequences": 0,
-                "renamed_sequences": 0,
-                "first_id_before": "ERROR",
-                "first_id_after": "ERROR"
-            })
-    return renamed_file_column, log_data
-
+    rules = rules or {}
+    tasks = [
+        (row.get("extracted_file", ""), row.get("portal", "").strip(), renamed_dir,
+         rules.get(row.get("portal", "").strip(), ()))
+        for _, row in proteome_data.iterrows()
+    ]
+    if manifest is not None and compressed_dir:
+        names, keys = _rename_keys(proteome_data, compressed_dir, renamed_dir, md5sums, rules)
+    else:
+        names, keys = [""] * len(tasks), [None] * len(tasks)
+    results = run_incremental("rename", rename_fasta_file, tasks, names, keys, _renamed_output,
+                              manifest, workers,
+                              on_error=lambda task: ("", _rename_log(os.path.basename(task[0]), "ERROR")))
+    return [path for path, _ in results], [log for _, log in results]